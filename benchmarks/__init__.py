@@ -0,0 +1,3 @@
+"""
+Benchmarks en loadtests (draaien tegen een lokaal gestarte server of db).
+"""
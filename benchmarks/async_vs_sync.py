@@ -0,0 +1,117 @@
+"""
+Vergelijk de sync en native async notes-views onder uvicorn.
+
+Start twee keer `uvicorn siteproject.asgi:application` (eerst met
+NOTES_ASYNC_VIEWS=false, dan true) en belast telkens de API- en
+publieke routes met N gelijktijdige verbindingen. Resultaat als JSON.
+
+Vereist: `pip install uvicorn` en een gevulde database:
+    python manage.py migrate
+    python manage.py seed_notes --count 2000
+    python benchmarks/async_vs_sync.py --concurrency 500 --duration 20
+
+De API-requests gebruiken een eigen gedeelde sleutel met een praktisch
+onbeperkte rate limit (`--api-rate`), anders meet de API-route vooral 429's.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.loadtest import Request, run_load  # noqa: E402
+
+
+def wait_for_port(port: int, timeout: float = 20.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return
+        time.sleep(0.2)
+    raise RuntimeError(f"server op poort {port} startte niet")
+
+
+def first_note_id() -> int:
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "siteproject.settings.dev")
+    import django
+
+    django.setup()
+    from notes.models import Note
+
+    pk = Note.objects.order_by("pk").values_list("pk", flat=True).first()
+    if pk is None:
+        raise SystemExit("Geen notes: draai eerst `manage.py seed_notes`.")
+    return pk
+
+
+def run_mode(mode: str, args, requests) -> dict:
+    env = {
+        **os.environ,
+        "NOTES_ASYNC_VIEWS": "true" if mode == "async" else "false",
+        "DJANGO_SETTINGS_MODULE": "siteproject.settings.dev",
+        "API_KEY": args.api_key,
+        "NOTES_API_RATE": str(args.api_rate),
+        "NOTES_API_BURST": str(max(1, int(args.api_rate))),
+    }
+    cmd = [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "siteproject.asgi:application",
+        "--port",
+        str(args.port),
+        "--log-level",
+        "warning",
+        "--backlog",
+        str(max(2048, args.concurrency * 2)),
+    ]
+    server = subprocess.Popen(cmd, cwd=ROOT, env=env)
+    try:
+        wait_for_port(args.port)
+        return asyncio.run(
+            run_load(
+                f"http://127.0.0.1:{args.port}",
+                requests,
+                concurrency=args.concurrency,
+                duration=args.duration,
+            )
+        )
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--api-rate", type=float, default=1_000_000)
+    args = parser.parse_args()
+    args.api_key = secrets.token_urlsafe(24)
+
+    pk = first_note_id()
+    requests = [
+        Request(
+            "/notes/api/list/",
+            name="notes:api_list",
+            headers={"X-API-KEY": args.api_key},
+        ),
+        Request(f"/notes/pub/{pk}/", name="notes:public_detail", weight=3),
+    ]
+    results = {mode: run_mode(mode, args, requests) for mode in ("sync", "async")}
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Benchmark van de opstarttijd (imports) met `python -X importtime`.
+
+Elk scenario draait in een vers proces en gaat een stap verder dan het
+vorige:
+- `setup`:     `django.setup()` (apps, models, signals)
+- `urls`:      + de URLconf (alle views)
+- `templates`: + de template-engine met alle templatetag-bibliotheken
+- `render`:    + een eerste Markdown-render (markdown, bleach, pygments)
+
+Per scenario: de mediaan van de totale importtijd (som van de "self"-tijd
+van alle modules) en van de wandkloktijd, het aantal modules, de tijd
+in de render-afhankelijkheden (`RENDER_DEPS`, hoort 0 te zijn vóór
+`render`) en de duurste top-level packages. Wandkloktijden schommelen
+sterk op een gedeelde machine; het aantal modules niet. `--baseline <git-ref>` meet hetzelfde op een andere versie van
+de code (bv. van vóór de lazy imports):
+
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --baseline 8d9e948 --repeat 7
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+SCENARIOS = {
+    "setup": "",
+    "urls": "import siteproject.urls\n",
+    "templates": (
+        "import siteproject.urls\n"
+        "from django.template import engines\n"
+        "engines['django'].engine.template_libraries\n"
+    ),
+    "render": (
+        "import siteproject.urls\n"
+        "from django.template import engines\n"
+        "engines['django'].engine.template_libraries\n"
+        "from notes.templatetags.markdown_extras import _render\n"
+        "_render('# Titel\\n\\n```python\\nx = 1\\n```', '', {})\n"
+    ),
+}
+
+PROLOGUE = (
+    "import time\n"
+    "t0 = time.perf_counter()\n"
+    "import os, django\n"
+    "os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'siteproject.settings.dev')\n"
+    "django.setup()\n"
+)
+EPILOGUE = "print((time.perf_counter() - t0) * 1000)\n"
+
+# enkel nodig om Markdown te renderen (zie notes.templatetags.markdown_extras)
+RENDER_DEPS = ("markdown", "bleach", "pygments", "webencodings", "tinycss2")
+
+_LINE_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def run(code: str, cwd: Path):
+    """(wandklok-ms, {module: (self-µs, cumulatief-µs, diepte)})"""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROLOGUE + code + EPILOGUE],
+        cwd=cwd,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            modules[name] = (int(own), int(cumulative), len(indent) // 2)
+    return float(proc.stdout.strip().splitlines()[-1]), modules
+
+
+def summarize(runs, top):
+    wall = [w for w, _m in runs]
+    totals = [sum(own for own, _c, _d in m.values()) / 1000 for _w, m in runs]
+    # per top-level package: de som van de self-tijden (mediaan over de runs)
+    per_package = defaultdict(list)
+    for _w, modules in runs:
+        sums = defaultdict(int)
+        for name, (own, _c, _d) in modules.items():
+            sums[name.split(".")[0]] += own
+        for package, us in sums.items():
+            per_package[package].append(us / 1000)
+    packages = {p: statistics.median(v) for p, v in per_package.items()}
+    return {
+        "wall_ms": round(statistics.median(wall), 1),
+        "import_ms": round(statistics.median(totals), 1),
+        "modules": len(runs[-1][1]),
+        "render_deps_ms": round(sum(packages.get(p, 0.0) for p in RENDER_DEPS), 1),
+        "top_packages_ms": {
+            p: round(ms, 1)
+            for p, ms in sorted(packages.items(), key=lambda kv: -kv[1])[:top]
+        },
+    }
+
+
+def measure(trees, repeat: int, top: int):
+    """Alle (boom, scenario)-paren om beurten, na één ongetelde ronde."""
+    runs = defaultdict(list)
+    for round_ in range(repeat + 1):
+        for label, cwd in trees.items():
+            for name, code in SCENARIOS.items():
+                result = run(code, cwd)
+                if round_:
+                    runs[label, name].append(result)
+    return {
+        label: {name: summarize(runs[label, name], top) for name in SCENARIOS}
+        for label in trees
+    }
+
+
+def export_tree(ref: str, target: Path) -> Path:
+    archive = subprocess.run(
+        ["git", "-C", str(ROOT), "archive", ref],
+        check=True,
+        capture_output=True,
+    ).stdout
+    subprocess.run(["tar", "-x", "-C", str(target)], input=archive, check=True)
+    return target
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="aantal packages")
+    parser.add_argument("--baseline", help="git-ref om mee te vergelijken")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        trees = {"current": ROOT}
+        if args.baseline:
+            trees["baseline"] = export_tree(args.baseline, Path(tmp))
+        report = measure(trees, args.repeat, args.top)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    os.environ.pop("PYTHONPROFILEIMPORTTIME", None)
+    main()
@@ -0,0 +1,227 @@
+"""
+benchmarks.loadtest
+===================
+
+Kleine asyncio HTTP/1.1-driver voor loadtests tegen een lokaal
+gestarte server (runserver, gunicorn of uvicorn). Geen externe
+dependencies: elke virtuele client houdt één keep-alive verbinding open
+en stuurt requests na elkaar.
+
+Een `Request` kan per verzonden request een ander pad (`paths`, bv.
+verschillende note-id's) en een andere body (`make_body`, bv. unieke
+titels) gebruiken.
+
+Gebruik vanuit andere scripts (zie ook `benchmarks/site_load.py`):
+
+    from benchmarks.loadtest import Request, run_load
+    stats = asyncio.run(run_load("http://127.0.0.1:8000", [Request("/notes/pub/")],
+                                 concurrency=100, duration=10))
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+
+@dataclass
+class Request:
+    path: str
+    method: str = "GET"
+    name: Optional[str] = None
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+    weight: float = 1.0
+    # per request willekeurig een van deze paden (anders `path`)
+    paths: Sequence[str] = ()
+    # per request een nieuwe body (anders `body`)
+    make_body: Optional[Callable[[random.Random], bytes]] = None
+
+    @property
+    def label(self) -> str:
+        return self.name or self.path
+
+    def build(self, rng: random.Random) -> Tuple[str, bytes]:
+        path = rng.choice(self.paths) if self.paths else self.path
+        body = self.make_body(rng) if self.make_body else self.body
+        return path, body
+
+
+class Connection:
+    """Eén keep-alive HTTP/1.1-verbinding."""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader = self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except OSError:
+                pass
+            self.writer = None
+
+    async def request(
+        self, req: Request, path: Optional[str] = None, body: Optional[bytes] = None
+    ) -> int:
+        if self.writer is None:
+            await self.open()
+        path = req.path if path is None else path
+        body = req.body if body is None else body
+        headers = {
+            "Host": f"{self.host}:{self.port}",
+            "Connection": "keep-alive",
+            "Content-Length": str(len(body)),
+            **req.headers,
+        }
+        head = f"{req.method} {path} HTTP/1.1\r\n" + "".join(
+            f"{k}: {v}\r\n" for k, v in headers.items()
+        )
+        self.writer.write(head.encode("latin-1") + b"\r\n" + body)
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("verbinding gesloten")
+        status = int(status_line.split()[1])
+
+        length, chunked, close = None, False, False
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            key, value = key.strip().lower(), value.strip().lower()
+            if key == "content-length":
+                length = int(value)
+            elif key == "transfer-encoding" and "chunked" in value:
+                chunked = True
+            elif key == "connection" and value == "close":
+                close = True
+
+        if chunked:
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                await self.reader.readexactly(size + 2)
+                if size == 0:
+                    break
+        elif length is not None:
+            await self.reader.readexactly(length)
+        else:
+            await self.reader.read()
+            close = True
+
+        if close:
+            await self.close()
+        return status
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Percentiel (nearest-rank) van een gesorteerde lijst."""
+    if not sorted_values:
+        return 0.0
+    rank = max(
+        0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1)
+    )
+    return sorted_values[rank]
+
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> dict:
+    values = sorted(latencies)
+    return {
+        "requests": len(values) + errors,
+        "errors": errors,
+        "error_rate": (
+            round(errors / (len(values) + errors), 4) if values or errors else 0
+        ),
+        "throughput_rps": round(len(values) / elapsed, 1) if elapsed else 0,
+        "p50_ms": round(percentile(values, 50) * 1000, 2),
+        "p95_ms": round(percentile(values, 95) * 1000, 2),
+        "p99_ms": round(percentile(values, 99) * 1000, 2),
+        "max_ms": round(values[-1] * 1000, 2) if values else 0,
+    }
+
+
+async def run_load(
+    base_url: str,
+    requests: List[Request],
+    concurrency: int = 50,
+    duration: float = 10.0,
+    seed: int = 1,
+) -> dict:
+    """
+    Laat `concurrency` clients gedurende `duration` seconden requests
+    sturen (gewogen willekeurige keuze uit `requests`).
+
+    Returns:
+        dict: totaal + per request-label: throughput, p50/p95/p99, fouten
+    """
+    url = urlsplit(base_url)
+    host, port = url.hostname, url.port or 80
+    weights = [r.weight for r in requests]
+    latencies: Dict[str, List[float]] = {r.label: [] for r in requests}
+    errors: Dict[str, int] = {r.label: 0 for r in requests}
+    # per label: HTTP-status of naam van de exceptie -> aantal
+    error_kinds: Dict[str, Counter] = {r.label: Counter() for r in requests}
+    deadline = time.perf_counter() + duration
+
+    async def client(n: int):
+        rng = random.Random(seed + n)
+        conn = Connection(host, port)
+        try:
+            while time.perf_counter() < deadline:
+                req = rng.choices(requests, weights)[0]
+                path, body = req.build(rng)
+                start = time.perf_counter()
+                try:
+                    status = await asyncio.wait_for(
+                        conn.request(req, path, body), timeout=30
+                    )
+                except (
+                    OSError,
+                    ConnectionError,
+                    asyncio.IncompleteReadError,
+                    asyncio.TimeoutError,
+                ) as exc:
+                    errors[req.label] += 1
+                    error_kinds[req.label][type(exc).__name__] += 1
+                    await conn.close()
+                    continue
+                if status >= 400:
+                    errors[req.label] += 1
+                    error_kinds[req.label][str(status)] += 1
+                else:
+                    latencies[req.label].append(time.perf_counter() - start)
+        finally:
+            await conn.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [v for values in latencies.values() for v in values]
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 2),
+        "total": summarize(all_latencies, sum(errors.values()), elapsed),
+        "per_request": {
+            label: {
+                **summarize(latencies[label], errors[label], elapsed),
+                "errors_by_kind": dict(error_kinds[label]),
+            }
+            for label in latencies
+        },
+    }
+
+
+def dump(result: dict) -> str:
+    return json.dumps(result, indent=2)
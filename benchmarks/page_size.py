@@ -0,0 +1,145 @@
+"""
+Benchmark van paginagrootte en rendertijd van de notitiepagina's.
+
+Vult een tijdelijke testdatabase met `seed_notes` en haalt de lijst-,
+publieke lijst- en detailpagina's op via de Django test client:
+- bytes (ongecomprimeerd en gzip)
+- rendertijd met een koude en een warme fragmentcache (mediaan)
+
+telkens voor:
+- `current`:  de templates van de werkboom
+- `minified`: idem met NOTES_MINIFY_HTML
+- `baseline`: (optioneel) de templates van een andere git-ref, bv. de
+  versie met inline styles per tag-chip
+
+    python benchmarks/page_size.py --notes 1000
+    python benchmarks/page_size.py --notes 1000 --baseline 891a327
+"""
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "siteproject.settings.dev")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.core.cache import cache  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    setup_test_environment,
+    teardown_test_environment,
+)
+from django.urls import reverse  # noqa: E402
+
+
+def export_templates(ref: str, target: Path) -> Path:
+    """Pak de map templates/ van git-ref `ref` uit in `target`."""
+    archive = subprocess.run(
+        ["git", "-C", str(ROOT), "archive", ref, "templates"],
+        check=True,
+        capture_output=True,
+    ).stdout
+    subprocess.run(["tar", "-x", "-C", str(target)], input=archive, check=True)
+    return target / "templates"
+
+
+def pages():
+    from notes.models import Note
+
+    note = Note.objects.order_by("pk").first()
+    return {
+        "list": reverse("notes:list"),
+        "list_search": reverse("notes:list") + "?q=release",
+        "public_list": reverse("notes:public_list"),
+        "public_detail": reverse("notes:public_detail", args=[note.pk]),
+    }
+
+
+def measure(urls, repeat):
+    client = Client()
+    result = {}
+    for name, url in urls.items():
+        cache.clear()
+        t0 = time.perf_counter()
+        content = client.get(url).content
+        cold_ms = (time.perf_counter() - t0) * 1000
+        warm = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            client.get(url)
+            warm.append((time.perf_counter() - t0) * 1000)
+        result[name] = {
+            "bytes": len(content),
+            "gzip_bytes": len(gzip.compress(content, 6)),
+            "cold_ms": round(cold_ms, 1),
+            "warm_ms": round(statistics.median(warm), 1),
+        }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--notes", type=int, default=1000)
+    parser.add_argument("--tags-per-note", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--baseline", help="git-ref met de templates om mee te vergelijken"
+    )
+    args = parser.parse_args()
+
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        call_command(
+            "seed_notes",
+            count=args.notes,
+            tags_per_note=args.tags_per_note,
+            stdout=open(os.devnull, "w"),
+        )
+        with tempfile.TemporaryDirectory() as tmp:
+            caches = {
+                "default": {
+                    "BACKEND": "siteproject.sqlite_cache.SQLiteCache",
+                    "LOCATION": str(Path(tmp) / "cache.sqlite3"),
+                }
+            }
+            with override_settings(CACHES=caches):
+                urls = pages()
+                variants = {"current": {}, "minified": {"NOTES_MINIFY_HTML": True}}
+                if args.baseline:
+                    templates = [
+                        {
+                            **settings.TEMPLATES[0],
+                            "DIRS": [export_templates(args.baseline, Path(tmp))],
+                        }
+                    ]
+                    variants["baseline"] = {"TEMPLATES": templates}
+
+                report = {"notes": args.notes}
+                for name, overrides in variants.items():
+                    with override_settings(**overrides):
+                        report[name] = measure(urls, args.repeat)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark van de versiegeschiedenis (notes.revisions).
+
+Simuleert notities met honderden edits (regels wijzigen, toevoegen,
+verwijderen) en vergelijkt:
+- opslag: volledige kopie per versie vs. snapshot om de N + delta's
+- reconstructietijd van willekeurige versies
+
+Draait zonder database; gebruikt enkel make_delta/apply_delta.
+
+    python benchmarks/revisions.py --edits 500 --lines 200 --every 20
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "siteproject.settings.dev")
+
+import django  # noqa: E402
+
+django.setup()
+
+from notes.revisions import apply_delta, make_delta  # noqa: E402
+
+WORDS = "project idee notitie code index cache query release team taak".split()
+
+
+def edit(lines, rng):
+    """Eén realistische edit: een paar regels wijzigen/toevoegen/verwijderen."""
+    lines = list(lines)
+    for _ in range(rng.randint(1, 3)):
+        action = rng.random()
+        pos = rng.randrange(len(lines) + 1)
+        new_line = " ".join(rng.choices(WORDS, k=8)) + "\n"
+        if action < 0.6 and lines:
+            lines[min(pos, len(lines) - 1)] = new_line
+        elif action < 0.85:
+            lines.insert(pos, new_line)
+        elif len(lines) > 1:
+            del lines[min(pos, len(lines) - 1)]
+    return lines
+
+
+def build_history(edits, n_lines, rng):
+    lines = [" ".join(rng.choices(WORDS, k=8)) + "\n" for _ in range(n_lines)]
+    bodies = ["".join(lines)]
+    for _ in range(edits):
+        lines = edit(lines, rng)
+        bodies.append("".join(lines))
+    return bodies
+
+
+def store(bodies, every):
+    rows = []
+    for i, body in enumerate(bodies):
+        if i % every == 0:
+            rows.append((True, body))
+        else:
+            rows.append((False, make_delta(bodies[i - 1], body)))
+    return rows
+
+
+def rebuild(rows, version, every):
+    start = (version // every) * every
+    body = None
+    for is_snapshot, data in rows[start : version + 1]:
+        body = data if is_snapshot else apply_delta(body, data)
+    return body
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--notes", type=int, default=5)
+    parser.add_argument("--edits", type=int, default=300)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--every", type=int, default=20)
+    parser.add_argument("--samples", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    full_bytes = delta_bytes = 0
+    timings = []
+    for _ in range(args.notes):
+        bodies = build_history(args.edits, args.lines, rng)
+        t0 = time.perf_counter()
+        rows = store(bodies, args.every)
+        store_s = time.perf_counter() - t0
+
+        full_bytes += sum(len(b.encode()) for b in bodies)
+        delta_bytes += sum(len(d.encode()) for _s, d in rows)
+
+        for _ in range(args.samples):
+            v = rng.randrange(len(bodies))
+            t0 = time.perf_counter()
+            assert rebuild(rows, v, args.every) == bodies[v]
+            timings.append(time.perf_counter() - t0)
+
+    timings.sort()
+    print(
+        json.dumps(
+            {
+                "notes": args.notes,
+                "versions_per_note": args.edits + 1,
+                "snapshot_every": args.every,
+                "full_copy_bytes": full_bytes,
+                "snapshot_delta_bytes": delta_bytes,
+                "ratio": round(delta_bytes / full_bytes, 4),
+                "store_ms_per_note_last": round(store_s * 1000, 1),
+                "rebuild_p50_ms": round(timings[len(timings) // 2] * 1000, 3),
+                "rebuild_p99_ms": round(timings[int(len(timings) * 0.99)] * 1000, 3),
+            },
+            indent=2,
+        )
+    )
+
+
+if __name__ == "__main__":
+    main()
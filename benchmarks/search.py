@@ -0,0 +1,186 @@
+"""
+Benchmark van de BM25-zoekmachine (notes.search).
+
+Bouwt een index over synthetische notities (zonder database), bewaart en
+herlaadt hem met mmap, en meet de latentie van `SearchEngine.search`
+(rangschikken) en `SearchEngine.candidates` (welke notes de zoekterm
+bevatten).
+
+Met `--db-notes N` daarna ook het echte pad van de lijst en de API:
+`search_notes` plus het ophalen van de note-id's uit een testdatabase
+met N notes, per soort zoekopdracht (één woord, deel van een woord, twee
+woorden na elkaar), voor de "bm25"- en de "db"-backend:
+
+    python benchmarks/search.py --docs 100000 --queries 500
+    python benchmarks/search.py --docs 100000 --db-notes 100000 --db-queries 50
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "siteproject.settings.dev")
+
+import django  # noqa: E402
+import django.utils.timezone  # noqa: E402
+
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    override_settings,
+    setup_test_environment,
+    teardown_test_environment,
+)
+
+from notes import search  # noqa: E402
+from notes.models import Note  # noqa: E402
+from notes.search import SearchEngine, Segment, document  # noqa: E402
+
+
+def vocabulary(size, rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(3, 9))) for _ in range(size)]
+
+
+def summary(latencies):
+    latencies = sorted(latencies)
+    return {
+        "p50_ms": round(latencies[len(latencies) // 2], 2),
+        "p95_ms": round(latencies[int(len(latencies) * 0.95)], 2),
+        "max_ms": round(latencies[-1], 2),
+    }
+
+
+def timed(func, items):
+    latencies, results = [], []
+    for item in items:
+        t0 = time.perf_counter()
+        results.append(func(item))
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies, results
+
+
+def database_path(texts, queries) -> dict:
+    """`search_notes` + id's ophalen over een testdatabase, per backend."""
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0)
+    try:
+        with override_settings(NOTES_SEARCH_INDEX_DIR=None):
+            t0 = time.perf_counter()
+            for start in range(0, len(texts), 1000):
+                Note.objects.bulk_create(
+                    Note(title=title, body=body)
+                    for title, body in texts[start : start + 1000]
+                )
+            seed_s = time.perf_counter() - t0
+            search.reset_engine()
+            search.get_engine()
+
+            def run(query):
+                qs, _ranked = search.search_notes(Note.objects.defer("body"), query)
+                return len(qs.values_list("pk", flat=True))
+
+            report = {"notes": len(texts), "seed_s": round(seed_s, 1)}
+            for kind, items in queries.items():
+                report[kind] = {}
+                for backend in ("bm25", "db"):
+                    with override_settings(NOTES_SEARCH_BACKEND=backend):
+                        latencies, hits = timed(run, items)
+                    report[kind][backend] = {
+                        **summary(latencies),
+                        "hits_avg": round(sum(hits) / len(hits), 1),
+                    }
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=100_000)
+    parser.add_argument("--words", type=int, default=150, help="woorden per body")
+    parser.add_argument("--vocab", type=int, default=50_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument(
+        "--db-notes", type=int, default=0, help="ook het pad via de database"
+    )
+    parser.add_argument("--db-queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary(args.vocab, rng)
+    # Zipf-achtige verdeling: enkele woorden komen heel vaak voor
+    cum_weights = list(itertools.accumulate(1 / (i + 1) for i in range(len(words))))
+
+    def synthetic(count):
+        for _ in range(count):
+            yield (
+                " ".join(rng.choices(words, cum_weights=cum_weights, k=4)),
+                " ".join(rng.choices(words, cum_weights=cum_weights, k=args.words)),
+            )
+
+    t0 = time.perf_counter()
+    docs = (
+        (pk, *document(title, body))
+        for pk, (title, body) in enumerate(synthetic(args.docs), start=1)
+    )
+    engine = SearchEngine(Segment.build(docs))
+    build_s = time.perf_counter() - t0
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine.synced_at = django.utils.timezone.now()
+        engine.save(Path(tmp))
+        t0 = time.perf_counter()
+        engine = SearchEngine.load(Path(tmp))
+        load_ms = (time.perf_counter() - t0) * 1000
+
+        queries = [
+            " ".join(rng.choices(words[:5000], k=rng.randint(1, 3)))
+            for _ in range(args.queries)
+        ]
+        search_ms, _ = timed(lambda q: engine.search(q, 20), queries)
+        candidates_ms, _ = timed(engine.candidates, queries)
+
+    report = {
+        "docs": args.docs,
+        "terms": len(engine.base.vocab),
+        "postings": int(len(engine.base.postings_doc)),
+        "build_s": round(build_s, 1),
+        "load_ms": round(load_ms, 1),
+        "search": summary(search_ms),
+        "candidates": summary(candidates_ms),
+    }
+
+    if args.db_notes:
+        texts = list(synthetic(args.db_notes))
+        phrases = []
+        for _title, body in rng.sample(texts, args.db_queries):
+            body_words = body.split()
+            i = rng.randrange(len(body_words) - 1)
+            phrases.append(" ".join(body_words[i : i + 2]))
+        picked = rng.sample(words[100:5000], args.db_queries)
+        report["database"] = database_path(
+            texts,
+            {
+                "word": picked,
+                "part_of_word": [w[:3] for w in picked],
+                "two_words": phrases,
+            },
+        )
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,277 @@
+"""
+Loadtest van de draaiende site met scenario's, per URL-naam gerapporteerd.
+
+Start een echte server (uvicorn of gunicorn, met `--workers`) op een
+eigen SQLite-database, cache en zoekindex in `--workdir`, gevuld met
+`seed_notes` (zelfde pad als de andere benchmarks), en belast die met
+de asyncio-driver uit `benchmarks.loadtest`:
+
+- `browse`: `notes:public_list` en `notes:public_detail` (willekeurige notes)
+- `search`: `notes:list?q=` met woorden uit de synthetische bodies
+- `write`:  `notes:api_new` (POST JSON met X-API-KEY, unieke titels)
+- `mixed`:  alle drie samen, vooral lezen
+
+Per scenario en per URL-naam: throughput, p50/p95/p99, fouten en
+foutsoorten (HTTP-status of exceptie), als JSON op stdout. Throughput en
+latenties tellen enkel geslaagde requests; de foutratio per scenario en
+URL-naam staat daarom ook apart onder "errors" en gaat naar stderr als
+ze niet nul is. Elke scenario begint met `--warmup` seconden belasting
+die niet meetelt.
+
+    python benchmarks/site_load.py --notes 2000 --scenario browse --scenario write
+    python benchmarks/site_load.py --server gunicorn --workers 4 --concurrency 64
+    python benchmarks/site_load.py --workdir /tmp/load --duration 30   # hergebruikt de data
+
+De API-rate limit staat standaard praktisch uit (`--api-rate`), anders
+meet `write` vooral 429's. De database draait in WAL-modus met
+IMMEDIATE-transacties en een busy timeout (`--db-timeout`), anders
+faalt het merendeel van de writes met "database is locked".
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from urllib.parse import urlencode
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from benchmarks.async_vs_sync import wait_for_port  # noqa: E402
+from benchmarks.loadtest import Request, run_load  # noqa: E402
+
+SCENARIOS = ("browse", "search", "write", "mixed")
+
+
+def configure(args, workdir: Path) -> dict:
+    """Omgeving voor de server én dit proces (vóór `django.setup()`)."""
+    env = {
+        "DJANGO_SETTINGS_MODULE": args.settings,
+        "NOTES_DB_PATH": str(workdir / "db.sqlite3"),
+        "NOTES_CACHE_PATH": str(workdir / "cache.sqlite3"),
+        "NOTES_SEARCH_INDEX_DIR": str(workdir / "search"),
+        "API_KEY": secrets.token_urlsafe(24),
+        "NOTES_API_RATE": str(args.api_rate),
+        "NOTES_API_BURST": str(max(1, int(args.api_rate))),
+        "NOTES_DB_WAL": "true",
+        "NOTES_DB_TIMEOUT": str(args.db_timeout),
+    }
+    os.environ.update(env)
+    return env
+
+
+def seed(args) -> None:
+    import django
+    from django.core.management import call_command
+
+    django.setup()
+    from notes.models import Note
+
+    call_command("migrate", verbosity=0)
+    if not Note.objects.exists():
+        with open(os.devnull, "w") as devnull:
+            call_command(
+                "seed_notes",
+                count=args.notes,
+                tags_per_note=args.tags_per_note,
+                stdout=devnull,
+            )
+            call_command("build_search_index", stdout=devnull)
+
+
+def build_scenarios(args, api_key: str) -> dict:
+    from django.db import connections
+    from django.urls import reverse
+
+    from notes.management.commands.seed_notes import WORDS
+    from notes.models import Note
+
+    ids = list(Note.objects.order_by("?").values_list("pk", flat=True)[: args.paths])
+    connections.close_all()
+
+    list_url = reverse("notes:list")
+    browse = [
+        Request(reverse("notes:public_list"), name="notes:public_list"),
+        Request(
+            "",
+            name="notes:public_detail",
+            paths=[reverse("notes:public_detail", args=[pk]) for pk in ids],
+            weight=4,
+        ),
+    ]
+    search = [
+        Request(
+            "",
+            name="notes:list?q",
+            paths=[f"{list_url}?{urlencode({'q': w})}" for w in WORDS],
+        )
+    ]
+
+    def new_note(rng) -> bytes:
+        words = rng.choices(WORDS, k=20)
+        return json.dumps(
+            {
+                "title": f"Load {rng.getrandbits(48):x}",
+                "body": " ".join(words),
+                "tags": rng.sample(WORDS, 2),
+            }
+        ).encode("utf-8")
+
+    write = [
+        Request(
+            reverse("notes:api_new"),
+            method="POST",
+            name="notes:api_new",
+            headers={"X-API-KEY": api_key, "Content-Type": "application/json"},
+            make_body=new_note,
+        )
+    ]
+
+    def weighted(requests, factor):
+        return [
+            Request(**{**r.__dict__, "weight": r.weight * factor}) for r in requests
+        ]
+
+    return {
+        "browse": browse,
+        "search": search,
+        "write": write,
+        # ongeveer 80% lezen, 15% zoeken, 5% schrijven
+        "mixed": weighted(browse, 16) + weighted(search, 15) + weighted(write, 5),
+    }
+
+
+def error_summary(result: dict) -> dict:
+    """Foutratio van een scenario, totaal en per URL-naam met fouten."""
+    return {
+        "error_rate": result["total"]["error_rate"],
+        "per_request": {
+            label: {
+                "error_rate": stats["error_rate"],
+                "errors_by_kind": stats["errors_by_kind"],
+            }
+            for label, stats in result["per_request"].items()
+            if stats["errors"]
+        },
+    }
+
+
+def server_command(args):
+    if args.server == "gunicorn":
+        return [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            str(ROOT / "gunicorn.conf.py"),
+            "siteproject.wsgi:application",
+        ]
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "siteproject.asgi:application",
+        "--port",
+        str(args.port),
+        "--workers",
+        str(args.workers),
+        "--log-level",
+        "warning",
+        "--backlog",
+        str(max(2048, args.concurrency * 2)),
+    ]
+
+
+def run(args, workdir: Path) -> dict:
+    env = configure(args, workdir)
+    seed(args)
+    scenarios = build_scenarios(args, env["API_KEY"])
+
+    server_env = {
+        **os.environ,
+        **env,
+        "GUNICORN_BIND": f"127.0.0.1:{args.port}",
+        "GUNICORN_WORKERS": str(args.workers),
+    }
+    server = subprocess.Popen(server_command(args), cwd=ROOT, env=server_env)
+    base_url = f"http://127.0.0.1:{args.port}"
+    report = {
+        "server": args.server,
+        "workers": args.workers,
+        "settings": args.settings,
+        "notes": args.notes,
+        "scenarios": {},
+        "errors": {},
+    }
+    try:
+        wait_for_port(args.port)
+        for name in args.scenario or ["mixed"]:
+            requests = scenarios[name]
+            if args.warmup:
+                asyncio.run(run_load(base_url, requests, args.concurrency, args.warmup))
+            result = asyncio.run(
+                run_load(base_url, requests, args.concurrency, args.duration)
+            )
+            report["scenarios"][name] = result
+            report["errors"][name] = errors = error_summary(result)
+            if errors["error_rate"]:
+                print(
+                    f"{name}: {errors['error_rate']:.1%} fouten "
+                    f"{json.dumps(errors['per_request'])}",
+                    file=sys.stderr,
+                )
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=SCENARIOS,
+        help="herhaalbaar; standaard enkel mixed",
+    )
+    parser.add_argument("--server", choices=("uvicorn", "gunicorn"), default="uvicorn")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--warmup", type=float, default=2.0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--notes", type=int, default=2000)
+    parser.add_argument("--tags-per-note", type=int, default=3)
+    parser.add_argument(
+        "--paths", type=int, default=500, help="aantal verschillende detailpagina's"
+    )
+    parser.add_argument("--api-rate", type=float, default=1_000_000)
+    parser.add_argument(
+        "--db-timeout",
+        type=float,
+        default=30.0,
+        help="seconden wachten op de SQLite-schrijflock",
+    )
+    parser.add_argument("--settings", default="siteproject.settings.dev")
+    parser.add_argument(
+        "--workdir", help="database/cache/index bewaren en hergebruiken"
+    )
+    args = parser.parse_args()
+
+    if args.workdir:
+        workdir = Path(args.workdir)
+        workdir.mkdir(parents=True, exist_ok=True)
+        report = run(args, workdir)
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            report = run(args, Path(tmp))
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
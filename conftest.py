@@ -1,3 +1,39 @@
 import os
 
+import pytest
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "siteproject.settings.dev")
+
+
+@pytest.fixture(autouse=True)
+def _fresh_process_state(settings, tmp_path):
+    """
+    De BM25-index, de saved-search-definities, de API-sleutels en de
+    rate-limit-buckets (cache) leven per proces; tests rollen de database
+    terug zonder signals, dus elke test begint leeg. De gedeelde cache
+    is per test een eigen SQLite-bestand (nooit de cache van de
+    ontwikkelomgeving).
+    De index staat dan enkel in het geheugen (nooit de index op schijf
+    van de ontwikkelomgeving).
+    """
+    from django.core.cache import cache
+
+    from notes import api_auth, caching, saved_searches, search
+
+    def reset():
+        search.reset_engine()
+        saved_searches.forget_definitions()
+        api_auth.forget_keys()
+        cache.clear()
+        caching.reset_stats()
+
+    settings.NOTES_SEARCH_INDEX_DIR = None
+    settings.CACHES = {
+        "default": {
+            "BACKEND": "siteproject.sqlite_cache.SQLiteCache",
+            "LOCATION": tmp_path / "cache.sqlite3",
+        }
+    }
+    reset()
+    yield
+    reset()
@@ -0,0 +1,28 @@
+"""
+Gunicorn-configuratie:
+
+    gunicorn -c gunicorn.conf.py siteproject.wsgi
+
+Elke worker warmt zich op (zie `notes.warmup`) nadat hij de applicatie
+geladen heeft en vóór hij requests aanneemt. `post_fork` komt daarvoor
+te vroeg: dan is Django in de worker nog niet geladen.
+"""
+
+import os
+
+bind = os.getenv("GUNICORN_BIND", "127.0.0.1:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+
+
+def post_worker_init(worker):
+    from django.db import connections
+
+    from notes.warmup import warmup
+
+    timings = warmup()
+    worker.log.info(
+        "warmup: %s",
+        ", ".join(f"{name} {ms:.0f} ms" for name, ms in timings.items()),
+    )
+    # geen DB-verbinding van de opwarming meenemen naar de eerste request
+    connections.close_all()
@@ -1,28 +1,14 @@
 from django.shortcuts import render
-from notes.models import Note, Tag
+from notes.dashboard import dashboard_data
 
 
 def home(request):
     """
     Dashboard / startpagina
-    Toont recente notities, tags en een link naar de publieke wikiweergave.
+    Toont recente notities, tags, saved searches en totalen
+    (`notes.dashboard`, gecachet) en een link naar de publieke wikiweergave.
     """
-    # Recentste notities eerst. Als updated_at bestaat gebruiken we die.
-    if hasattr(Note, "updated_at"):
-        recent_notes = Note.objects.order_by("-updated_at")[:5]
-    else:
-        recent_notes = Note.objects.order_by("-created_at")[:5]
-
-    all_tags = Tag.objects.order_by("name")
-
-    return render(
-        request,
-        "home/home.html",
-        {
-            "recent_notes": recent_notes,
-            "all_tags": all_tags,
-        },
-    )
+    return render(request, "home/home.html", dashboard_data())
 
 
 def about(request):
@@ -1,17 +1,241 @@
-from django.contrib import admin
-from .models import Note, Tag
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.views.main import PAGE_VAR
+from django.db import connections
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce, Lower
+from django.template.response import TemplateResponse
+
+from .jobs import enqueue
+from .models import ApiKey, Job, Note, SavedSearch, Tag
+from .paginators import EstimatedCountPaginator
+from . import tag_ops
+
+
+class TagMergeForm(forms.Form):
+    """Keuze van de doeltag bij 'samenvoegen'."""
+
+    target = forms.ModelChoiceField(queryset=Tag.objects.none(), label="Doeltag")
+
+    def __init__(self, *args, tags=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["target"].queryset = tags if tags is not None else Tag.objects
+
+
+class TagRenameForm(forms.Form):
+    """Nieuwe naam bij 'hernoemen'."""
+
+    new_name = forms.CharField(label="Nieuwe naam", max_length=50)
+
+
+class TagDeleteForm(forms.Form):
+    """Bevestiging bij 'verwijderen' (geen velden)."""
 
 
 @admin.register(Tag)
 class TagAdmin(admin.ModelAdmin):
+    """
+    Samenvoegen en verwijderen draaien als job (`tags.merge`,
+    `tags.delete`, zie `notes.tasks`), niet in de request; hernoemen is
+    één UPDATE en gebeurt meteen.
+    """
+
     search_fields = ("name",)
     list_display = ("name",)
+    actions = ("merge_tags", "rename_tag", "delete_tags")
+
+    def get_actions(self, request):
+        # de standaard delete_selected toont alle gelinkte notes op de
+        # bevestigingspagina; wij verwijderen set-based via delete_tags
+        actions = super().get_actions(request)
+        actions.pop("delete_selected", None)
+        return actions
+
+    def _intermediate(self, request, queryset, form, title, action):
+        context = {
+            **self.admin_site.each_context(request),
+            "title": title,
+            "queryset": queryset,
+            "form": form,
+            "action": action,
+            "opts": self.model._meta,
+            "action_checkbox_name": admin.helpers.ACTION_CHECKBOX_NAME,
+        }
+        return TemplateResponse(request, "admin/notes/tag/bulk_action.html", context)
+
+    @admin.action(description="Geselecteerde tags samenvoegen")
+    def merge_tags(self, request, queryset):
+        if "apply" in request.POST:
+            form = TagMergeForm(request.POST, tags=queryset)
+            if form.is_valid():
+                target = form.cleaned_data["target"]
+                enqueue(
+                    "tags.merge",
+                    {
+                        "source_ids": sorted(queryset.values_list("pk", flat=True)),
+                        "target_id": target.pk,
+                    },
+                    unique=True,
+                )
+                self.message_user(
+                    request,
+                    f'Samenvoegen in "{target.name}" is ingepland.',
+                    messages.SUCCESS,
+                )
+                return None
+        else:
+            form = TagMergeForm(tags=queryset)
+        return self._intermediate(
+            request, queryset, form, "Tags samenvoegen", "merge_tags"
+        )
+
+    @admin.action(description="Geselecteerde tag hernoemen")
+    def rename_tag(self, request, queryset):
+        if queryset.count() != 1:
+            self.message_user(
+                request, "Selecteer precies één tag om te hernoemen.", messages.ERROR
+            )
+            return None
+        tag = queryset.get()
+        if "apply" in request.POST:
+            form = TagRenameForm(request.POST)
+            if form.is_valid():
+                old_name = tag.name
+                result = tag_ops.rename_tag(tag, form.cleaned_data["new_name"])
+                self.message_user(
+                    request,
+                    f'Tag "{old_name}" heet nu "{result.name}".',
+                    messages.SUCCESS,
+                )
+                return None
+        else:
+            form = TagRenameForm(initial={"new_name": tag.name})
+        return self._intermediate(
+            request, queryset, form, "Tag hernoemen", "rename_tag"
+        )
+
+    @admin.action(description="Geselecteerde tags verwijderen")
+    def delete_tags(self, request, queryset):
+        if "apply" in request.POST:
+            ids = sorted(queryset.values_list("pk", flat=True))
+            enqueue("tags.delete", {"tag_ids": ids}, unique=True)
+            self.message_user(
+                request,
+                f"Verwijderen van {len(ids)} tag(s) is ingepland.",
+                messages.SUCCESS,
+            )
+            return None
+        return self._intermediate(
+            request, queryset, TagDeleteForm(), "Tags verwijderen", "delete_tags"
+        )
 
 
 @admin.register(Note)
 class NoteAdmin(admin.ModelAdmin):
-    list_display = ("title", "created_at")
-    search_fields = ("title", "body")
-    list_filter = ("created_at", "tags")
-    filter_horizontal = ("tags",)  # makkelijke multi-select
+    """
+    Admin voor grote notitietabellen:
+    - geen volledige COUNT(*) (geschatte/begrensde paginator)
+    - geen tag-zijbalk met alle tags; tags kiezen via autocomplete
+    - zoeken op het begin van de titel (index op `lower(title)`) i.p.v.
+      LIKE over alle bodies; zoeken in de inhoud kan via de site
+    """
+
+    list_display = ("title", "created_at", "tag_count")
+    search_fields = ("title",)  # zie get_search_results
+    search_help_text = (
+        "Zoekt op begin van de titel (hoofdletters maken niet uit) of id."
+    )
+    list_filter = ("created_at",)
+    autocomplete_fields = ("tags",)
     ordering = ("-created_at",)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # gecorreleerde subquery: enkel uitgevoerd voor de rijen op de
+        # pagina, geen GROUP BY over de hele tabel
+        tag_counts = (
+            Note.tags.through.objects.filter(note_id=OuterRef("pk"))
+            .values("note_id")
+            .annotate(c=Count("*"))
+            .values("c")
+        )
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                tag_count=Coalesce(Subquery(tag_counts, output_field=IntegerField()), 0)
+            )
+        )
+
+    @admin.display(description="tags", ordering="tag_count")
+    def tag_count(self, obj):
+        return obj.tag_count
+
+    def get_paginator(self, request, queryset, per_page, *args, **kwargs):
+        try:
+            page = max(int(request.GET.get(PAGE_VAR, 1)), 1)
+        except ValueError:
+            page = 1
+        return self.paginator(queryset, per_page, *args, page_hint=page, **kwargs)
+
+    def get_search_results(self, request, queryset, search_term):
+        """
+        Prefix-zoeken zonder onderscheid in hoofdletters, op `lower(title)`
+        (index `notes_note_title_lower_idx`); een getal zoekt ook op id.
+
+        SQLite vergelijkt tekst binair (BINARY-collatie), daar is het
+        bereik [term, term + U+10FFFF) precies "begint met term" en kan de
+        index gebruikt worden. Onder een taalgevoelige collatie
+        (PostgreSQL) klopt zo'n bereik niet; daar wordt het een LIKE 'term%',
+        waarbij de index alleen helpt als de database C-collatie heeft.
+        """
+        term = search_term.strip()
+        if not term:
+            return queryset, False
+        queryset = queryset.annotate(title_key=Lower("title"))
+        if connections[queryset.db].vendor == "sqlite":
+            # lower() van SQLite verandert enkel ASCII-letters
+            key = "".join(c.lower() if c.isascii() else c for c in term)
+            condition = Q(title_key__gte=key, title_key__lt=key + "\U0010ffff")
+        else:
+            condition = Q(title_key__startswith=term.lower())
+        if term.isdigit():
+            condition |= Q(pk=int(term))
+        return queryset.filter(condition), False
+
+
+@admin.register(SavedSearch)
+class SavedSearchAdmin(admin.ModelAdmin):
+    """Leden worden na opslaan herberekend (job `saved_searches.rebuild`)."""
+
+    list_display = ("name", "tag", "query", "note_count", "updated_at")
+    search_fields = ("name",)
+    prepopulated_fields = {"slug": ("name",)}
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(note_count=Count("members"))
+
+    @admin.display(description="notes", ordering="note_count")
+    def note_count(self, obj):
+        return obj.note_count
+
+
+@admin.register(ApiKey)
+class ApiKeyAdmin(admin.ModelAdmin):
+    """Nieuwe sleutels via `manage.py api_keys create` (enkel de hash staat hier)."""
+
+    list_display = ("name", "prefix", "rate", "burst", "is_active", "created_at")
+    list_filter = ("is_active",)
+    readonly_fields = ("prefix", "created_at")
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_after", "duration_ms")
+    list_filter = ("status", "name")
+    readonly_fields = ("started_at", "finished_at", "duration_ms", "last_error")
+    ordering = ("-pk",)
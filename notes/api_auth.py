@@ -0,0 +1,263 @@
+"""
+notes.api_auth
+==============
+
+API-sleutels en rate limiting voor de JSON-endpoints (`api_new_note`,
+`api_list_notes`, sync en async).
+
+Sleutels:
+- bewaard als SHA-256 (`ApiKey.key_hash`); de sleutels zijn lange
+  willekeurige tokens, dus een trage KDF is niet nodig
+- de actieve sleutels worden per proces in een dict {hash: sleutel}
+  gehouden en hoogstens elke `NOTES_API_KEY_RELOAD_SECONDS` (30 s)
+  opnieuw geladen: een geldige request kost geen databasequery
+- `settings.API_KEY` blijft geldig als gedeelde sleutel en wordt met
+  `hmac.compare_digest` vergeleken (geen timing-lek)
+
+Een meegestuurde sleutel die niet (meer) geldig is geeft altijd 403, ook
+op endpoints die zonder sleutel werken (`api_list_notes`): een client
+met een verkeerde sleutel merkt dat meteen i.p.v. stil anoniem te worden.
+
+Rate limiting (token bucket per sleutel):
+- `NOTES_API_RATE` tokens per seconde, tot `NOTES_API_BURST` opgespaard
+  (per sleutel te overschrijven)
+- requests zonder sleutel zijn enkel begrensd als `NOTES_API_ANON_RATE`
+  gezet is, dan per IP-adres (`NOTES_API_ANON_BURST`); achter een proxy
+  hoort `NOTES_API_TRUSTED_PROXIES` op het aantal proxies te staan, anders
+  delen alle anonieme clients de bucket van het proxy-adres
+- de toestand (tokens, tijdstip) staat in de cache `NOTES_API_CACHE`
+  ("default"), zodat alle workers dezelfde bucket zien; lezen en
+  schrijven gebeurt onder een korte lock per bucket (`cache.add`), zodat
+  gelijktijdige requests nooit dezelfde token nemen
+- wie erover gaat krijgt 429 + `Retry-After`, nog vóór de body gelezen
+  of de database aangesproken wordt
+"""
+
+import functools
+import hashlib
+import hmac
+import math
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+
+from .models import ApiKey
+
+DEFAULT_RATE = 5.0
+DEFAULT_BURST = 20
+DEFAULT_RELOAD_SECONDS = 30.0
+KEY_PREFIX = "nk_"
+# lock per bucket: een gecrasht proces houdt hem hoogstens LOCK_TIMEOUT s
+# vast; wie langer dan LOCK_WAIT s wacht, krijgt een 429
+LOCK_TIMEOUT = 1
+LOCK_WAIT = 0.1
+
+
+@dataclass(frozen=True)
+class Client:
+    """Wie een API-request doet: een sleutel of (anoniem) een IP-adres."""
+
+    bucket: str
+    rate: float
+    burst: int
+    key_id: Optional[int] = None
+
+
+_keys: Optional[Dict[str, Client]] = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+def hash_key(raw: str) -> str:
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def create_key(name: str, rate=None, burst=None) -> Tuple[str, ApiKey]:
+    """Maak een nieuwe sleutel aan; geeft (sleutel, ApiKey) terug."""
+    raw = KEY_PREFIX + secrets.token_urlsafe(32)
+    api_key = ApiKey.objects.create(
+        name=name,
+        prefix=raw[:12],
+        key_hash=hash_key(raw),
+        rate=rate,
+        burst=burst,
+    )
+    return raw, api_key
+
+
+def default_rate() -> float:
+    return float(getattr(settings, "NOTES_API_RATE", DEFAULT_RATE))
+
+
+def default_burst() -> int:
+    return int(getattr(settings, "NOTES_API_BURST", DEFAULT_BURST))
+
+
+def client_ip(request: HttpRequest) -> str:
+    """
+    IP-adres van de client. Achter `NOTES_API_TRUSTED_PROXIES` proxies is
+    dat het adres dat de buitenste proxy aan `X-Forwarded-For` toevoegde;
+    wat de client zelf in die header zet, telt niet mee.
+    """
+    proxies = int(getattr(settings, "NOTES_API_TRUSTED_PROXIES", 0))
+    if proxies > 0:
+        forwarded = [
+            part.strip()
+            for part in request.headers.get("X-Forwarded-For", "").split(",")
+            if part.strip()
+        ]
+        if len(forwarded) >= proxies:
+            return forwarded[-proxies]
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def anonymous_client(request: HttpRequest) -> Optional[Client]:
+    """Bucket per IP-adres, of None als anonieme requests onbegrensd zijn."""
+    rate = float(getattr(settings, "NOTES_API_ANON_RATE", 0) or 0)
+    if rate <= 0:
+        return None
+    burst = getattr(settings, "NOTES_API_ANON_BURST", None)
+    return Client(
+        bucket=f"ip:{client_ip(request)}",
+        rate=rate,
+        burst=int(burst) if burst is not None else default_burst(),
+    )
+
+
+def active_keys() -> Dict[str, Client]:
+    """{sha256: Client} van de actieve sleutels, lokaal gecachet."""
+    global _keys, _loaded_at
+    interval = getattr(settings, "NOTES_API_KEY_RELOAD_SECONDS", DEFAULT_RELOAD_SECONDS)
+    if _keys is None or time.monotonic() - _loaded_at > interval:
+        with _lock:
+            rate, burst = default_rate(), default_burst()
+            _keys = {
+                key_hash: Client(
+                    bucket=f"key:{pk}",
+                    rate=key_rate if key_rate is not None else rate,
+                    burst=key_burst if key_burst is not None else burst,
+                    key_id=pk,
+                )
+                for pk, key_hash, key_rate, key_burst in ApiKey.objects.filter(
+                    is_active=True
+                ).values_list("pk", "key_hash", "rate", "burst")
+            }
+            _loaded_at = time.monotonic()
+    return _keys
+
+
+def forget_keys() -> None:
+    """Laad de sleutels opnieuw bij het volgende gebruik."""
+    global _keys
+    _keys = None
+
+
+def lookup(raw: str) -> Optional[Client]:
+    """Client voor sleutel `raw`, of None als die niet (meer) geldig is."""
+    if not raw:
+        return None
+    shared = getattr(settings, "API_KEY", "")
+    if shared and hmac.compare_digest(raw.encode("utf-8"), shared.encode("utf-8")):
+        return Client(bucket="key:settings", rate=default_rate(), burst=default_burst())
+    return active_keys().get(hash_key(raw))
+
+
+def take_token(client: Client, now: Optional[float] = None) -> float:
+    """
+    Neem één token uit de bucket van `client`. Geeft 0 terug als dat
+    lukte, anders het aantal seconden tot er weer een token is.
+    """
+    now = time.time() if now is None else now
+    cache = caches[getattr(settings, "NOTES_API_CACHE", "default")]
+    cache_key = f"notes:api-bucket:{client.bucket}"
+    lock_key = cache_key + ":lock"
+
+    # lezen en schrijven onder een lock per bucket (`cache.add` is atomair),
+    # anders lezen gelijktijdige requests dezelfde stand en mogen ze allemaal
+    deadline = time.monotonic() + LOCK_WAIT
+    while not cache.add(lock_key, 1, LOCK_TIMEOUT):
+        if time.monotonic() >= deadline:
+            # zo druk op één bucket: weigeren i.p.v. ongeteld doorlaten
+            return 1 / client.rate if client.rate > 0 else 60.0
+        time.sleep(0.001)
+    try:
+        tokens, updated = cache.get(cache_key) or (float(client.burst), now)
+        tokens = min(float(client.burst), tokens + (now - updated) * client.rate)
+        if tokens < 1:
+            return (1 - tokens) / client.rate if client.rate > 0 else 60.0
+        # na een volle bucket hoeft de toestand niet langer bewaard te worden
+        timeout = math.ceil(client.burst / client.rate) + 1 if client.rate > 0 else None
+        cache.set(cache_key, (tokens - 1, now), timeout)
+        return 0.0
+    finally:
+        cache.delete(lock_key)
+
+
+def too_many_requests(wait: float) -> HttpResponse:
+    response = HttpResponse("Too many requests", status=429)
+    response["Retry-After"] = str(max(1, math.ceil(wait)))
+    return response
+
+
+def check_request(request: HttpRequest, require_key: bool) -> Optional[HttpResponse]:
+    """
+    Bepaal de client en neem een token. Geeft een 403/429-antwoord terug,
+    of None (dan staat de client in `request.api_client`; None voor een
+    onbegrensde anonieme request).
+    """
+    raw = request.headers.get("X-API-KEY", "")
+    client = lookup(raw)
+    if client is None:
+        if raw or require_key:
+            return HttpResponseForbidden("Invalid API key")
+        client = anonymous_client(request)
+        if client is None:
+            request.api_client = None
+            return None
+    wait = take_token(client)
+    if wait:
+        return too_many_requests(wait)
+    request.api_client = client
+    return None
+
+
+def api_endpoint(require_key: bool = False):
+    """
+    Decorator voor API-views (sync of async): sleutelcontrole en rate
+    limiting vóór de view zelf iets doet.
+    - require_key=False: ook zonder sleutel toegelaten (per IP-adres
+      begrensd als `NOTES_API_ANON_RATE` gezet is); een ongeldige sleutel
+      blijft een 403
+    """
+
+    def decorator(view):
+        if iscoroutinefunction(view):
+
+            @functools.wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                # cachetoegang (en af en toe het herladen van de sleutels)
+                # is sync code
+                refused = await sync_to_async(check_request)(request, require_key)
+                if refused is not None:
+                    return refused
+                return await view(request, *args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            refused = check_request(request, require_key)
+            if refused is not None:
+                return refused
+            return view(request, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
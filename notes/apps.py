@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class NotesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "notes"
+
+    def ready(self):
+        # registreer signal handlers en achtergrondjobs
+        from . import signals, tasks  # noqa: F401
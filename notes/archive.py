@@ -0,0 +1,129 @@
+"""
+notes.archive
+=============
+
+Bouwt een zip- of tar.gz-archief met één `.md`-bestand per notitie,
+incrementeel: er wordt nooit een volledig archief in het geheugen of in
+een tijdelijk bestand opgebouwd. Elke notitie wordt gecomprimeerd in een
+kleine buffer die meteen weer geleegd wordt (`iter_archive` is een
+generator, bedoeld voor `StreamingHttpResponse`).
+
+Elk bestand begint met front-matter:
+
+    ---
+    title: "Eerste notitie"
+    tags: ["werk", "idee"]
+    created_at: 2025-01-01T12:00:00+00:00
+    updated_at: 2025-01-01T12:00:00+00:00
+    ---
+"""
+
+import io
+import json
+import tarfile
+import zipfile
+from typing import Iterable, Iterator, Tuple
+
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .models import Note
+
+ARCHIVE_FORMATS = {
+    # format -> (content type, bestandsextensie)
+    "zip": ("application/zip", "zip"),
+    "tar.gz": ("application/gzip", "tar.gz"),
+}
+
+ARCHIVE_ROOT = "notes"
+
+
+class _StreamSink:
+    """
+    Minimaal 'bestand' zonder seek: zipfile/tarfile schrijven erin,
+    `drain()` geeft de tot nu toe geschreven bytes terug en leegt de buffer.
+    """
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def write(self, data) -> int:
+        data = bytes(data)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._pos
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _iso(dt) -> str:
+    return dt.isoformat() if dt else ""
+
+
+def note_to_markdown(note: Note) -> Tuple[str, bytes]:
+    """Geef (bestandsnaam, inhoud) van één notitie met front-matter."""
+    tags = [t.name for t in note.tags.all()]
+    front = [
+        "---",
+        f"title: {json.dumps(note.title, ensure_ascii=False)}",
+        f"tags: {json.dumps(tags, ensure_ascii=False)}",
+        f"created_at: {_iso(note.created_at)}",
+        f"updated_at: {_iso(note.updated_at)}",
+        "---",
+        "",
+    ]
+    text = "\n".join(front) + "\n" + (note.body or "")
+    if not text.endswith("\n"):
+        text += "\n"
+    name = f"{ARCHIVE_ROOT}/{note.pk}-{slugify(note.title) or 'notitie'}.md"
+    return name, text.encode("utf-8")
+
+
+def _zip_date_time(dt):
+    dt = timezone.localtime(dt) if dt else timezone.localtime()
+    # zip kent geen datums voor 1980
+    return max(dt.timetuple()[:6], (1980, 1, 1, 0, 0, 0))
+
+
+def iter_archive(notes: Iterable[Note], fmt: str = "zip") -> Iterator[bytes]:
+    """Yield het archief in stukken, één (of enkele) per notitie."""
+    if fmt not in ARCHIVE_FORMATS:
+        raise ValueError(f"Onbekend archiefformaat: {fmt}")
+
+    sink = _StreamSink()
+
+    if fmt == "zip":
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for note in notes:
+                name, data = note_to_markdown(note)
+                info = zipfile.ZipInfo(name, date_time=_zip_date_time(note.updated_at))
+                info.compress_type = zipfile.ZIP_DEFLATED
+                zf.writestr(info, data)
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+    else:
+        with tarfile.open(fileobj=sink, mode="w|gz") as tf:
+            for note in notes:
+                name, data = note_to_markdown(note)
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                if note.updated_at:
+                    info.mtime = int(note.updated_at.timestamp())
+                tf.addfile(info, io.BytesIO(data))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+
+    # centrale directory (zip) of gzip-trailer (tar.gz)
+    yield sink.drain()
@@ -0,0 +1,147 @@
+"""
+notes.async_views
+=================
+
+Native `async def` varianten van de API- en publieke views.
+
+Onder ASGI draait een sync view in een threadpool (`sync_to_async`);
+bij veel trage clients wordt die pool de bottleneck. Deze views
+gebruiken Django's async ORM (`aiterator`, `acreate`, `aget`, ...),
+zodat een wachtende client geen thread bezet houdt.
+
+Welke variant actief is bepaalt `settings.NOTES_ASYNC_VIEWS`
+(zie `notes.urls`). Validatie en JSON-vorm worden gedeeld met
+`notes.views`, zodat beide varianten hetzelfde antwoord geven.
+
+Templates renderen we via `sync_to_async(render)`: context processors
+(messages/sessie) en template filters mogen daar nog sync code raken.
+"""
+
+import asyncio
+import json
+
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (
+    Http404,
+    HttpRequest,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import render
+from django.views.decorators.csrf import csrf_exempt
+
+from .api_auth import api_endpoint
+from .events import hub
+from .links import backlinks
+from .models import Note, Tag
+from .views import (
+    api_list_queryset,
+    in_rank_order,
+    note_summary,
+    parse_new_note_request,
+    public_list_queryset,
+)
+
+arender = sync_to_async(render)
+
+# elke zoveel seconden een SSE-commentaar zodat proxies de verbinding openhouden
+SSE_KEEPALIVE_SECONDS = 15
+
+
+@api_endpoint()
+async def api_list_notes(request: HttpRequest) -> JsonResponse:
+    """Async variant van `notes.views.api_list_notes`."""
+    # zoeken is CPU-werk + af en toe een sync van de index: in een thread
+    qs, ranked = await sync_to_async(api_list_queryset)(request.GET.get("q", ""))
+    notes = [n async for n in qs.aiterator(chunk_size=2000)]
+    if ranked is not None:
+        notes = in_rank_order(notes, ranked)
+    data = [note_summary(n) for n in notes]
+    return JsonResponse(data, safe=False)
+
+
+@csrf_exempt
+@api_endpoint(require_key=True)
+async def api_new_note(request: HttpRequest) -> JsonResponse:
+    """Async variant van `notes.views.api_new_note` (zelfde contract)."""
+    if request.method != "POST":
+        return HttpResponseBadRequest("Use POST")
+
+    parsed = parse_new_note_request(request)
+    if isinstance(parsed, HttpResponse):
+        return parsed
+    title, body, tag_names = parsed
+
+    note = await Note.objects.acreate(title=title, body=body)
+
+    tag_objs = []
+    for name in tag_names:
+        tag_obj, _created = await Tag.objects.aget_or_create(name=name)
+        tag_objs.append(tag_obj)
+    if tag_objs:
+        await note.tags.aset(tag_objs)
+
+    data = {
+        "id": note.id,
+        "title": note.title,
+        # zelfde volgorde als Tag.Meta.ordering, zonder extra query
+        "tags": sorted(t.name for t in tag_objs),
+    }
+    return JsonResponse(data, status=201)
+
+
+async def public_list_notes(request: HttpRequest) -> HttpResponse:
+    """Async variant van `notes.views.public_list_notes`."""
+    notes = [n async for n in public_list_queryset()]
+    return await arender(request, "notes/public_list.html", {"notes": notes})
+
+
+async def public_detail_note(request: HttpRequest, pk: int) -> HttpResponse:
+    """Async variant van `notes.views.public_detail_note`."""
+    try:
+        note = await Note.objects.prefetch_related("tags").aget(pk=pk)
+    except Note.DoesNotExist:
+        raise Http404("Note bestaat niet")
+    linked_from = [n async for n in backlinks(note)]
+    return await arender(
+        request,
+        "notes/public_detail.html",
+        {"note": note, "backlinks": linked_from},
+    )
+
+
+def _sse(event: dict) -> str:
+    return f"event: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+
+
+async def _event_stream():
+    sub = hub.subscribe()
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await sub.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield _sse(event)
+    finally:
+        hub.unsubscribe(sub)
+
+
+async def note_events(request: HttpRequest) -> HttpResponse:
+    """
+    Server-Sent Events met live "note created/updated/deleted" events.
+    Een idle client kost geen databasequeries: hij wacht op zijn queue.
+    Werkt enkel onder ASGI; onder WSGI antwoorden we 204 (EventSource
+    stopt dan met opnieuw verbinden).
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    response = StreamingHttpResponse(_event_stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: niet bufferen
+    return response
@@ -0,0 +1,152 @@
+"""
+notes.bodies
+============
+
+Opslag van grote notitie-bodies, gecomprimeerd in een aparte tabel.
+
+Bodies groter dan `settings.NOTES_BODY_EXTERNAL_THRESHOLD` bytes worden
+niet in `notes_note.body` bewaard maar gecomprimeerd (zlib, of zstd als
+het `zstandard`-pakket er is) in `NoteBody`. De kolom zelf blijft dan
+leeg en `Note.body_external` staat op True.
+
+Voor de rest van de code verandert er niets: `note.body` geeft altijd
+de volledige tekst. `SplitBodyField` installeert een descriptor die de
+gecomprimeerde body pas ophaalt als `note.body` echt gelezen wordt
+(detailpagina's), en `Note.save()` / `Note.objects.bulk_create()`
+schrijven de gecomprimeerde versie weg.
+
+Lijstqueries doen daarnaast `.defer("body")`, zodat ook kleine bodies
+niet meer meekomen waar ze niet getoond worden.
+
+Filteren op de inhoud kan dus niet op de kolom `body`; de database
+zoekt in de platte tekst (`NoteText`, zie `notes.search.text_filter`).
+"""
+
+import zlib
+from typing import Iterable, Tuple
+
+from django.conf import settings
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+try:  # optioneel: zstd comprimeert sneller en beter dan zlib
+    import zstandard
+except ImportError:  # pragma: no cover - afhankelijk van de omgeving
+    zstandard = None
+
+DEFAULT_THRESHOLD = 32 * 1024
+
+
+def external_threshold() -> int:
+    return getattr(settings, "NOTES_BODY_EXTERNAL_THRESHOLD", DEFAULT_THRESHOLD)
+
+
+def is_large(text: str) -> bool:
+    # goedkope eerste check: een str van n tekens is minstens n bytes
+    threshold = external_threshold()
+    if not text or len(text) * 4 <= threshold:
+        return False
+    return len(text) > threshold or len(text.encode("utf-8")) > threshold
+
+
+def compress(text: str) -> Tuple[str, bytes]:
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=6).compress(raw)
+    return "zlib", zlib.compress(raw, 6)
+
+
+def decompress(codec: str, data: bytes) -> str:
+    data = bytes(data)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Body is zstd-gecomprimeerd maar zstandard ontbreekt.")
+        return zstandard.ZstdDecompressor().decompress(data).decode("utf-8")
+    return zlib.decompress(data).decode("utf-8")
+
+
+class SplitBodyDescriptor(DeferredAttribute):
+    """
+    Zoals een gewone (deferrable) veld-descriptor, maar haalt een
+    extern bewaarde body op uit `NoteBody` wanneer de kolom leeg is.
+    """
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if (
+            instance is None
+            or value
+            or instance.__dict__.get("_body_assigned")
+            or not instance.body_external
+        ):
+            return value
+
+        cache = instance._state.fields_cache
+        if "body_blob" in cache:
+            blob = cache["body_blob"]
+        else:
+            from .models import NoteBody
+
+            blob = NoteBody.objects.filter(note_id=instance.pk).first()
+        if blob is None:
+            return value
+
+        text = decompress(blob.codec, blob.data)
+        instance.__dict__[self.field.attname] = text
+        return text
+
+    def __set__(self, instance, value):
+        # data-descriptor, anders zou een lege kolom in __dict__ __get__
+        # omzeilen; een expliciete toewijzing na het laden wint altijd
+        instance.__dict__[self.field.attname] = value
+        if not instance._state.adding:
+            instance.__dict__["_body_assigned"] = True
+
+
+class SplitBodyField(models.TextField):
+    """TextField waarvan grote waarden in `NoteBody` terechtkomen."""
+
+    descriptor_class = SplitBodyDescriptor
+
+    def pre_save(self, model_instance, add):
+        value = super().pre_save(model_instance, add)
+        # de kolom blijft leeg; de tekst staat gecomprimeerd in NoteBody
+        if getattr(model_instance, "body_external", False):
+            return ""
+        return value
+
+
+def mark_external(notes: Iterable) -> None:
+    """Zet `body_external` op basis van de grootte van de body."""
+    for note in notes:
+        note.body_external = is_large(note.body)
+
+
+def store_external(notes: Iterable, previous: dict = None) -> None:
+    """
+    Schrijf (of verwijder) de gecomprimeerde bodies na het opslaan.
+
+    Args:
+        previous: {pk: was_external} van voor de save; notes die niet meer
+            extern zijn verliezen hun NoteBody-rij
+    """
+    from .models import NoteBody
+
+    previous = previous or {}
+    rows, obsolete = [], []
+    for note in notes:
+        if note.body_external:
+            codec, data = compress(note.body)
+            rows.append(NoteBody(note_id=note.pk, codec=codec, data=data))
+        elif previous.get(note.pk):
+            obsolete.append(note.pk)
+
+    if rows:
+        NoteBody.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["note"],
+            update_fields=["codec", "data"],
+        )
+    if obsolete:
+        NoteBody.objects.filter(note_id__in=obsolete).delete()
@@ -0,0 +1,134 @@
+"""
+notes.bulk
+==========
+
+Bulkacties op een selectie notities (vanuit `list_notes`).
+
+Elke actie kost een vast aantal queries, onafhankelijk van het aantal
+geselecteerde notities:
+- delete:    één `DELETE ... WHERE id IN (...)` per tabel (notes en de
+             tabellen die ernaar wijzen), zonder signals per note
+- tag/untag: één bulk insert of delete op de tussentabel
+- duplicate: `bulk_create` van de notes + één bulk insert van alle tag-links;
+             links en een eerste versie in één job (`notes.created`)
+- tag:       enkel voor notes die (nog) bestaan; een verouderde of
+             verzonnen id uit het formulier wordt genegeerd
+"""
+
+from typing import Iterable, List
+
+from django.db import models, transaction
+
+from .models import Note, Tag
+from .fragments import invalidate_tags
+from .jobs import enqueue
+from .signals import notes_deleted
+from .related import schedule_refresh
+from .saved_searches import schedule_rebuild
+
+NoteTag = Note.tags.through
+
+COPY_PREFIX = "Kopie van "
+
+
+def _dependents():
+    """
+    (model, veldnaam, on_delete) van alle tabellen die naar Note wijzen,
+    ook de verborgen (tags-tussentabel, `RelatedNote.related`).
+    """
+    return [
+        (rel.related_model, rel.field.name, rel.on_delete)
+        for rel in Note._meta.get_fields(include_hidden=True)
+        if rel.auto_created and not rel.concrete and (rel.one_to_many or rel.one_to_one)
+    ]
+
+
+def delete_notes(note_ids: Iterable[int]) -> int:
+    """
+    Verwijder notities in bulk. Geeft het aantal verwijderde notes terug.
+
+    Geen `QuerySet.delete()`: dat laadt de notes en stuurt per note de
+    `post_delete`-signals. Hier één statement per afhankelijke tabel en
+    één voor de notes; de gevolgen (zoekindex, live updates, dashboard)
+    één keer voor de hele set via `notes.signals.notes_deleted`.
+    """
+    note_ids = sorted(set(note_ids))
+    if not note_ids:
+        return 0
+    with transaction.atomic():
+        for model, field, on_delete in _dependents():
+            rows = model._base_manager.filter(**{f"{field}__in": note_ids})
+            if on_delete is models.SET_NULL:
+                rows.update(**{field: None})
+            else:
+                rows._raw_delete(rows.db)
+        notes = Note._base_manager.filter(pk__in=note_ids)
+        deleted = notes._raw_delete(notes.db)
+        notes_deleted(note_ids)
+    return deleted
+
+
+def tag_notes(note_ids: Iterable[int], tag: Tag) -> int:
+    """
+    Koppel `tag` aan alle (bestaande) notities in één insert; bestaande
+    links blijven. Geeft het aantal gekoppelde notes terug.
+    """
+    existing = Note.objects.filter(pk__in=list(note_ids)).values_list("pk", flat=True)
+    links = [NoteTag(note_id=pk, tag_id=tag.pk) for pk in existing]
+    if not links:
+        return 0
+    NoteTag.objects.bulk_create(links, ignore_conflicts=True)
+    schedule_refresh(link.note_id for link in links)
+    schedule_rebuild()
+    invalidate_tags()
+    return len(links)
+
+
+def untag_notes(note_ids: Iterable[int], tag: Tag) -> int:
+    """Ontkoppel `tag` van alle notities in één delete."""
+    note_ids = list(note_ids)
+    removed, _ = NoteTag.objects.filter(note_id__in=note_ids, tag_id=tag.pk).delete()
+    if removed:
+        schedule_refresh(note_ids)
+        schedule_rebuild()
+        invalidate_tags()
+    return removed
+
+
+def duplicate_notes(note_ids: Iterable[int]) -> List[Note]:
+    """
+    Maak kopieën (incl. tags) van de gegeven notities.
+
+    Returns:
+        list[Note]: de nieuwe notities, in dezelfde volgorde als de originelen
+    """
+    originals = list(
+        Note.objects.filter(pk__in=list(note_ids))
+        .order_by("pk")
+        .select_related("body_blob")
+    )
+    if not originals:
+        return []
+
+    with transaction.atomic():
+        copies = Note.objects.bulk_create(
+            [
+                Note(title=f"{COPY_PREFIX}{orig.title}"[:120], body=orig.body)
+                for orig in originals
+            ]
+        )
+        new_pk = {orig.pk: copy.pk for orig, copy in zip(originals, copies)}
+
+        links = NoteTag.objects.filter(note_id__in=list(new_pk)).values_list(
+            "note_id", "tag_id"
+        )
+        NoteTag.objects.bulk_create(
+            [
+                NoteTag(note_id=new_pk[note_id], tag_id=tag_id)
+                for note_id, tag_id in links
+            ]
+        )
+        schedule_refresh(new_pk.values())
+        # bulk_create stuurt geen post_save: links en versie zelf inplannen
+        enqueue("notes.created", {"note_ids": sorted(new_pk.values())})
+    return copies
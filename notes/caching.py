@@ -0,0 +1,206 @@
+"""
+notes.caching
+=============
+
+Gedeelde laag boven de Django-cache (`CACHES["default"]`, standaard de
+SQLite-backend uit `siteproject.sqlite_cache`, gedeeld door alle workers).
+
+Sleutels per namespace met een generatie:
+
+    notes:<namespace>:g<generatie>:<delen...>
+
+`bump(namespace)` verhoogt de generatie; alle oude sleutels van die
+namespace worden dan nooit meer gelezen en verlopen vanzelf. Zo is
+ongeldig maken één `incr`, ongeacht het aantal entries.
+
+`get_or_compute` voor dure entries (gerenderde notes, lijstpagina's)
+beschermt tegen een stampede:
+- vlak vóór het verlopen rekent telkens één proces de waarde al opnieuw
+  uit (probabilistisch, "XFetch"); de anderen geven de oude waarde
+- bij een lege cache neemt één proces een lock (`cache.add`), de andere
+  wachten hoogstens `NOTES_CACHE_LOCK_WAIT` seconden op het resultaat
+
+Hits en misses worden per proces geteld en om de
+`NOTES_CACHE_STATS_FLUSH_SECONDS` opgeteld in de gedeelde cache
+(`stats()`, `manage.py cache stats`).
+"""
+
+import hashlib
+import math
+import random
+import threading
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+DEFAULT_LOCK_WAIT = 2.0
+# een lock van een gecrasht proces blokkeert nooit langer dan dit
+LOCK_TIMEOUT = 30
+DEFAULT_STATS_FLUSH_SECONDS = 10.0
+# langere sleutels worden gehasht (memcached e.d. aanvaarden max. 250 tekens)
+MAX_KEY_LENGTH = 200
+STATS_NAMESPACES_KEY = "notes:stats:namespaces"
+
+_counts: Counter = Counter()
+_flushed_at = time.monotonic()
+_stats_lock = threading.Lock()
+
+
+# --- sleutels ---------------------------------------------------------
+
+
+def _generation_key(namespace: str) -> str:
+    return f"notes:gen:{namespace}"
+
+
+def generation(namespace: str) -> int:
+    """Huidige generatie van `namespace`."""
+    key = _generation_key(namespace)
+    value = cache.get(key)
+    if value is None:
+        # start op de klok: na het wegvallen van de sleutel (cull, clear)
+        # kan een oude generatie nooit opnieuw gekozen worden
+        cache.add(key, time.time_ns() // 1_000_000, None)
+        value = cache.get(key)
+    return value
+
+
+def bump(namespace: str) -> None:
+    """Maak alle entries van `namespace` in één keer ongeldig."""
+    try:
+        cache.incr(_generation_key(namespace))
+    except ValueError:
+        generation(namespace)
+
+
+def key_prefix(namespace: str) -> str:
+    """Prefix voor sleutels in `namespace` (één cache-round trip)."""
+    return f"notes:{namespace}:g{generation(namespace)}"
+
+
+def make_key(prefix: str, *parts: Any) -> str:
+    key = ":".join([prefix, *map(str, parts)])
+    if len(key) > MAX_KEY_LENGTH or any(c.isspace() for c in key):
+        digest = hashlib.sha1(key[len(prefix) :].encode("utf-8")).hexdigest()
+        key = f"{prefix}:h{digest}"
+    return key
+
+
+# --- stampedebescherming ---------------------------------------------
+
+
+def get_or_compute(
+    namespace: str,
+    parts: Iterable[Any],
+    compute: Callable[[], Any],
+    timeout: float = 300,
+    beta: float = 1.0,
+) -> Any:
+    """
+    Waarde uit de cache, of `compute()` met stampedebescherming.
+    `beta` > 1 rekent vroeger opnieuw uit, < 1 later.
+    """
+    key = make_key(key_prefix(namespace), *parts)
+    lock_key = key + ":lock"
+    entry = cache.get(key)
+
+    if entry is not None:
+        value, delta, expires_at = entry
+        # XFetch: kans op vroeg herberekenen stijgt naarmate het einde nadert
+        early = time.time() - delta * beta * math.log(1 - random.random())
+        if early < expires_at or not cache.add(lock_key, 1, LOCK_TIMEOUT):
+            record(namespace, "hits")
+            return value
+        record(namespace, "early")
+        locked = True
+    else:
+        record(namespace, "misses")
+        locked = cache.add(lock_key, 1, LOCK_TIMEOUT)
+        if not locked:
+            entry = _wait_for(key)
+            if entry is not None:
+                return entry[0]
+
+    started = time.perf_counter()
+    try:
+        value = compute()
+        delta = time.perf_counter() - started
+        cache.set(key, (value, delta, time.time() + timeout), timeout)
+    finally:
+        if locked:
+            cache.delete(lock_key)
+    return value
+
+
+def _wait_for(key: str):
+    deadline = time.monotonic() + getattr(
+        settings, "NOTES_CACHE_LOCK_WAIT", DEFAULT_LOCK_WAIT
+    )
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+# --- statistieken ------------------------------------------------------
+
+
+def record(namespace: str, kind: str, n: int = 1) -> None:
+    """Tel een hit/miss voor `namespace`; af en toe naar de gedeelde cache."""
+    global _flushed_at
+    with _stats_lock:
+        _counts[(namespace, kind)] += n
+        interval = getattr(
+            settings, "NOTES_CACHE_STATS_FLUSH_SECONDS", DEFAULT_STATS_FLUSH_SECONDS
+        )
+        if time.monotonic() - _flushed_at < interval:
+            return
+        pending = dict(_counts)
+        _counts.clear()
+        _flushed_at = time.monotonic()
+    flush_stats(pending)
+
+
+def flush_stats(pending: Optional[Dict] = None) -> None:
+    """Tel de lokale tellers op bij die in de gedeelde cache."""
+    if pending is None:
+        with _stats_lock:
+            pending = dict(_counts)
+            _counts.clear()
+    known = set(cache.get(STATS_NAMESPACES_KEY) or ())
+    for (namespace, kind), n in pending.items():
+        key = f"notes:stats:{namespace}:{kind}"
+        if not cache.add(key, n, None):
+            cache.incr(key, n)
+    namespaces = {namespace for namespace, _kind in pending}
+    if not namespaces <= known:
+        cache.set(STATS_NAMESPACES_KEY, sorted(known | namespaces), None)
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    """{namespace: {"hits": .., "misses": .., "early": ..}} over alle processen."""
+    flush_stats()
+    result = {}
+    for namespace in cache.get(STATS_NAMESPACES_KEY) or ():
+        keys = {
+            kind: f"notes:stats:{namespace}:{kind}"
+            for kind in ("hits", "misses", "early")
+        }
+        values = cache.get_many(keys.values())
+        result[namespace] = {kind: values.get(key, 0) for kind, key in keys.items()}
+    return result
+
+
+def reset_stats() -> None:
+    with _stats_lock:
+        _counts.clear()
+    for namespace in cache.get(STATS_NAMESPACES_KEY) or ():
+        cache.delete_many(
+            f"notes:stats:{namespace}:{kind}" for kind in ("hits", "misses", "early")
+        )
+    cache.delete(STATS_NAMESPACES_KEY)
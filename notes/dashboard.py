@@ -0,0 +1,94 @@
+"""
+notes.dashboard
+===============
+
+Alle gegevens voor het dashboard (`home.views.home`) in één dict:
+
+- `recent_notes`: de laatst bijgewerkte notes (`NOTES_DASHBOARD_RECENT`)
+- `top_tags`: tags met hun aantal notes, meest gebruikt eerst
+  (`NOTES_DASHBOARD_TAGS`)
+- `saved_searches`: saved searches met hun aantal leden
+- `totals`: aantal notes en tags, en hoeveel notes de laatste
+  `NOTES_DASHBOARD_RECENT_DAYS` dagen aangemaakt en bijgewerkt zijn
+
+Het resultaat staat in de gedeelde cache (namespace "dashboard", zie
+`notes.caching`), met als sleutel ook de generatie "tags" van
+`notes.fragments`: elke tagwijziging (ook de bulkacties en tag_ops, die
+geen signals sturen) maakt het dashboard dus ongeldig. Wijzigingen aan
+notes en saved searches roepen `invalidate()` aan vanuit de signals.
+Een warm dashboard kost zo geen enkele query; de "laatste dagen"-tellers
+lopen hoogstens `NOTES_DASHBOARD_CACHE_SECONDS` achter.
+
+Enkel gewone dicts en lijsten, geen model-instanties in de cache.
+"""
+
+from datetime import timedelta
+from typing import Any, Dict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from .caching import bump, generation, get_or_compute
+from .models import Note, SavedSearch, Tag
+
+NAMESPACE = "dashboard"
+DEFAULT_CACHE_SECONDS = 300
+DEFAULT_RECENT = 5
+DEFAULT_TAGS = 20
+DEFAULT_RECENT_DAYS = 7
+
+
+def invalidate() -> None:
+    """Dashboard opnieuw opbouwen zodra de transactie gecommit is."""
+    transaction.on_commit(lambda: bump(NAMESPACE))
+
+
+def build() -> Dict[str, Any]:
+    """Reken het dashboard uit (zonder cache)."""
+    recent = getattr(settings, "NOTES_DASHBOARD_RECENT", DEFAULT_RECENT)
+    top = getattr(settings, "NOTES_DASHBOARD_TAGS", DEFAULT_TAGS)
+    days = getattr(settings, "NOTES_DASHBOARD_RECENT_DAYS", DEFAULT_RECENT_DAYS)
+    since = timezone.now() - timedelta(days=days)
+
+    recent_notes = list(
+        Note.objects.order_by("-updated_at", "-created_at", "title").values(
+            "pk", "title", "updated_at"
+        )[:recent]
+    )
+    top_tags = list(
+        Tag.objects.annotate(note_count=Count("notes"))
+        .order_by("-note_count", "name")
+        .values("name", "note_count")[:top]
+    )
+    saved_searches = list(
+        SavedSearch.objects.annotate(note_count=Count("members")).values(
+            "name", "slug", "note_count"
+        )
+    )
+    totals = Note.objects.aggregate(
+        notes=Count("pk"),
+        created_recently=Count("pk", filter=Q(created_at__gte=since)),
+        updated_recently=Count("pk", filter=Q(updated_at__gte=since)),
+    )
+    totals["tags"] = Tag.objects.count()
+    totals["recent_days"] = days
+    return {
+        "recent_notes": recent_notes,
+        "top_tags": top_tags,
+        "saved_searches": saved_searches,
+        "totals": totals,
+    }
+
+
+def dashboard_data() -> Dict[str, Any]:
+    """Het dashboard uit de cache, of `build()` (met stampedebescherming)."""
+    return get_or_compute(
+        NAMESPACE,
+        [f"t{generation('tags')}"],
+        build,
+        timeout=getattr(
+            settings, "NOTES_DASHBOARD_CACHE_SECONDS", DEFAULT_CACHE_SECONDS
+        ),
+    )
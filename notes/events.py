@@ -0,0 +1,80 @@
+"""
+notes.events
+============
+
+In-process broadcast hub voor live updates (Server-Sent Events).
+
+- `Note` save/delete signals (zie `notes.signals`) publiceren compacte
+  events: `{"type": "created|updated|deleted", "id": ..., ...}`
+- elke SSE-client (zie `notes.async_views.note_events`) heeft een eigen
+  begrensde `asyncio.Queue`; publiceren gebeurt thread-safe via
+  `loop.call_soon_threadsafe`, want signals vuren in sync code
+- loopt een client te ver achter (queue vol), dan wordt zijn queue
+  geleegd en krijgt hij één `resync`-event: de client herlaadt dan zelf
+
+De hub leeft per proces: met meerdere workers ziet een client enkel de
+wijzigingen die in zijn eigen worker gebeurden.
+"""
+
+import asyncio
+import threading
+from typing import Optional, Set
+
+DEFAULT_QUEUE_SIZE = 100
+RESYNC = {"type": "resync"}
+
+
+class Subscription:
+    """Eén verbonden client: event loop + begrensde queue."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+
+    def offer(self, event: dict) -> None:
+        """Zet een event in de queue (draait in de event loop van de client)."""
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC)
+
+    async def get(self, timeout: Optional[float] = None) -> dict:
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class BroadcastHub:
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> Subscription:
+        """Registreer een client; aan te roepen vanuit zijn event loop."""
+        sub = Subscription(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: dict) -> None:
+        """Stuur een event naar alle clients; veilig vanuit elke thread."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for sub in subscribers:
+            try:
+                sub.loop.call_soon_threadsafe(sub.offer, event)
+            except RuntimeError:
+                # event loop van de client is al gesloten
+                self.unsubscribe(sub)
+
+
+hub = BroadcastHub()
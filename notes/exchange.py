@@ -0,0 +1,250 @@
+"""
+notes.exchange
+==============
+
+Streaming import/export van notities (incl. tags) als NDJSON of CSV.
+
+Gebruikt door `manage.py export_notes` en `manage.py import_notes`.
+Beide kanten werken record per record of per batch, zodat het
+geheugengebruik constant blijft, ook bij een miljoen notities:
+- export leest met `.iterator()` (tags per chunk geprefetcht)
+- import schrijft per batch met `bulk_create` in één transactie;
+  tagnamen worden één keer opgezocht en daarna in een dict gecachet
+
+Recordformaat (NDJSON, één object per regel):
+    {"id": 1, "title": "...", "body": "...", "created_at": "...",
+     "updated_at": "...", "tags": ["werk", "idee"]}
+
+In CSV staan de tags in één kolom, gescheiden door `|`.
+"""
+
+import csv
+import io
+import json
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Note, Tag
+
+FORMATS = ("ndjson", "csv")
+FIELDS = ["id", "title", "body", "created_at", "updated_at", "tags"]
+CSV_TAG_SEPARATOR = "|"
+
+NoteTag = Note.tags.through
+
+
+def guess_format(path: str, default: str = "ndjson") -> str:
+    """Leid het formaat af uit de extensie (.csv of .ndjson/.jsonl)."""
+    return "csv" if str(path).lower().endswith(".csv") else default
+
+
+class Throughput:
+    """Houdt aantallen en snelheid bij voor de voortgangsmeldingen."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.count = 0
+
+    def add(self, n: int) -> None:
+        self.count += n
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    def __str__(self) -> str:
+        rate = self.count / self.elapsed if self.elapsed else 0.0
+        return f"{self.count} notes in {self.elapsed:.1f}s ({rate:.0f}/s)"
+
+
+# ---------------------------------------------------------------------------
+# export
+# ---------------------------------------------------------------------------
+
+
+def iter_note_records(
+    after_id: Optional[int] = None, chunk_size: int = 2000
+) -> Iterator[dict]:
+    """Geef alle notities als dicts, gesorteerd op id (voor hervatten)."""
+    qs = (
+        Note.objects.order_by("pk")
+        .select_related("body_blob")
+        .prefetch_related(Prefetch("tags", queryset=Tag.objects.only("name")))
+    )
+    if after_id:
+        qs = qs.filter(pk__gt=after_id)
+
+    for note in qs.iterator(chunk_size=chunk_size):
+        yield {
+            "id": note.pk,
+            "title": note.title,
+            "body": note.body,
+            "created_at": note.created_at.isoformat() if note.created_at else None,
+            "updated_at": note.updated_at.isoformat() if note.updated_at else None,
+            "tags": [t.name for t in note.tags.all()],
+        }
+
+
+class NdjsonWriter:
+    def __init__(self, fh, write_header: bool = True):
+        self.fh = fh
+
+    def write(self, record: dict) -> None:
+        self.fh.write(json.dumps(record, ensure_ascii=False))
+        self.fh.write("\n")
+
+
+class CsvWriter:
+    def __init__(self, fh, write_header: bool = True):
+        self.writer = csv.DictWriter(fh, fieldnames=FIELDS)
+        if write_header:
+            self.writer.writeheader()
+
+    def write(self, record: dict) -> None:
+        self.writer.writerow({**record, "tags": CSV_TAG_SEPARATOR.join(record["tags"])})
+
+
+WRITERS = {"ndjson": NdjsonWriter, "csv": CsvWriter}
+
+
+# ---------------------------------------------------------------------------
+# import
+# ---------------------------------------------------------------------------
+
+
+def read_ndjson(fh) -> Iterator[dict]:
+    for line in fh:
+        line = line.strip()
+        if line:
+            yield json.loads(line)
+
+
+def read_csv(fh) -> Iterator[dict]:
+    for row in csv.DictReader(fh):
+        tags = row.get("tags") or ""
+        row["tags"] = [t for t in tags.split(CSV_TAG_SEPARATOR) if t]
+        yield row
+
+
+READERS = {"ndjson": read_ndjson, "csv": read_csv}
+
+
+def resume_point(fh, fmt: str) -> Tuple[Optional[int], int]:
+    """
+    (id van het laatste volledige record, byte-offset erna) in een deels
+    geschreven exportbestand, binair geopend.
+
+    Een afgebroken export eindigt vaak midden in een record: zonder
+    regeleinde, met onvolledige JSON of (CSV) in een veld met
+    aanhalingstekens. Dat record en alles erna telt niet mee; de export
+    kapt het bestand af op de offset en schrijft vanaf daar verder.
+    Leest regel per regel, dus constant geheugen.
+    """
+    last_id, offset, pending = None, 0, b""
+    header = None
+    for line in fh:
+        pending += line
+        if not pending.endswith(b"\n"):
+            break
+        # CSV: een oneven aantal aanhalingstekens = veld met een regeleinde
+        if fmt == "csv" and pending.count(b'"') % 2:
+            continue
+        try:
+            text = pending.decode("utf-8")
+            if fmt == "csv":
+                row = next(csv.reader(io.StringIO(text, newline="")), None)
+                if header is None:
+                    header = row
+                    record = {}
+                elif row is None or len(row) != len(header):
+                    break
+                else:
+                    record = dict(zip(header, row))
+            else:
+                record = json.loads(text) if text.strip() else {}
+        except (UnicodeDecodeError, ValueError, csv.Error):
+            break
+        if record.get("id"):
+            last_id = int(record["id"])
+        offset += len(pending)
+        pending = b""
+    return last_id, offset
+
+
+def _parse_dt(value):
+    if not value:
+        return None
+    dt = parse_datetime(str(value))
+    if dt is not None and timezone.is_naive(dt):
+        dt = timezone.make_aware(dt)
+    return dt
+
+
+class NoteImporter:
+    """
+    Importeert batches van records.
+
+    Tags worden opgezocht via een in-memory cache `naam -> id`; enkel
+    onbekende namen kosten een extra (bulk) query.
+    """
+
+    def __init__(self):
+        self.tag_ids: Dict[str, int] = dict(
+            Tag.objects.values_list("name", "pk").iterator()
+        )
+
+    def _resolve_tags(self, names: Iterable[str]) -> None:
+        missing = {n for n in names if n not in self.tag_ids}
+        if not missing:
+            return
+        Tag.objects.bulk_create([Tag(name=n) for n in missing], ignore_conflicts=True)
+        self.tag_ids.update(
+            Tag.objects.filter(name__in=missing).values_list("name", "pk")
+        )
+
+    def import_batch(self, records: List[dict]) -> int:
+        """Schrijf één batch in één transactie. Geeft het aantal notes terug."""
+        if not records:
+            return 0
+
+        tag_names = []
+        for r in records:
+            r["tags"] = [" ".join(str(t).split()) for t in r.get("tags") or []]
+            tag_names.extend(t for t in r["tags"] if t)
+
+        with transaction.atomic():
+            self._resolve_tags(tag_names)
+
+            notes = [
+                Note(title=r.get("title") or "", body=r.get("body") or "")
+                for r in records
+            ]
+            Note.objects.bulk_create(notes)
+
+            # auto_now(_add) overschrijft de tijdstempels bij insert;
+            # zet de originele waarden terug met één bulk_update
+            stamped = []
+            for note, r in zip(notes, records):
+                created = _parse_dt(r.get("created_at"))
+                updated = _parse_dt(r.get("updated_at"))
+                if created or updated:
+                    note.created_at = created or note.created_at
+                    note.updated_at = updated or note.updated_at
+                    stamped.append(note)
+            if stamped:
+                Note.objects.bulk_update(stamped, ["created_at", "updated_at"])
+
+            NoteTag.objects.bulk_create(
+                [
+                    NoteTag(note_id=note.pk, tag_id=self.tag_ids[name])
+                    for note, r in zip(notes, records)
+                    for name in dict.fromkeys(r["tags"])
+                    if name
+                ]
+            )
+        return len(notes)
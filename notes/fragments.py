@@ -0,0 +1,96 @@
+"""
+notes.fragments
+===============
+
+Gecachete HTML per lijstitem (`list.html`, `public_list.html`).
+
+Elk item wordt één keer gerenderd en in de gedeelde cache bewaard onder
+
+    (template + hash van de bron, note.pk, note.updated_at, tag-generatie
+     [, fragment])
+
+- een gewijzigd itemtemplate (deploy) krijgt een nieuwe sleutel
+- een gewijzigde note krijgt een nieuwe `updated_at`, dus een nieuwe
+  sleutel; oude items verlopen vanzelf
+- tags wijzigen `updated_at` niet: elke tagwijziging verhoogt daarom de
+  generatie "tags" (`invalidate_tags`, na commit)
+- per lijst één `get_many` voor alle items en één `set_many` voor de
+  ontbrekende; enkel voor die ontbrekende notes worden de tags opgehaald
+  (één query), een warme lijst kost dus geen tag-query
+
+Gebruik in een template (zie `notes.templatetags.note_fragments`):
+
+    {% note_items notes "notes/_list_item.html" as items %}
+    {% for item in items %}{{ item }}{% endfor %}
+"""
+
+import hashlib
+from functools import lru_cache
+from typing import List, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.template.loader import get_template
+from django.utils.safestring import SafeString, mark_safe
+
+from .caching import bump, generation, make_key, record
+from .models import Tag
+
+NAMESPACE = "fragments"
+DEFAULT_TIMEOUT = 24 * 3600
+
+
+def invalidate_tags() -> None:
+    """Alle lijstitems opnieuw renderen zodra de transactie gecommit is."""
+    transaction.on_commit(lambda: bump("tags"))
+
+
+@lru_cache(maxsize=None)
+def template_version(template_name: str) -> str:
+    source = get_template(template_name).template.source
+    return hashlib.sha1(source.encode("utf-8")).hexdigest()[:8]
+
+
+def item_key(prefix: str, note) -> str:
+    parts = [note.pk, note.updated_at.timestamp() if note.updated_at else ""]
+    snippet = getattr(note, "snippet", "")
+    if snippet:
+        parts.append(hashlib.sha1(str(snippet).encode("utf-8")).hexdigest()[:16])
+    return make_key(prefix, *parts)
+
+
+def render_items(notes: Sequence, template_name: str) -> List[SafeString]:
+    """HTML per note (in volgorde), uit de cache waar mogelijk."""
+    notes = list(notes)
+    if not notes:
+        return []
+    prefix = make_key(
+        f"notes:{NAMESPACE}:t{generation('tags')}",
+        template_name.replace("/", "."),
+        template_version(template_name),
+    )
+    keys = [item_key(prefix, n) for n in notes]
+    found = cache.get_many(keys)
+    record(NAMESPACE, "hits", len(found))
+
+    missing = [(key, n) for key, n in zip(keys, notes) if key not in found]
+    if missing:
+        record(NAMESPACE, "misses", len(missing))
+        to_fetch = [
+            n
+            for _key, n in missing
+            if "tags" not in getattr(n, "_prefetched_objects_cache", {})
+        ]
+        prefetch_related_objects(
+            to_fetch, Prefetch("tags", queryset=Tag.objects.order_by("name"))
+        )
+        template = get_template(template_name)
+        rendered = {key: template.render({"n": n}) for key, n in missing}
+        cache.set_many(
+            rendered,
+            getattr(settings, "NOTES_FRAGMENT_CACHE_SECONDS", DEFAULT_TIMEOUT),
+        )
+        found.update(rendered)
+    return [mark_safe(found[key]) for key in keys]
@@ -0,0 +1,199 @@
+"""
+notes.jobs
+==========
+
+Kleine database-gebaseerde jobqueue voor zwaar werk buiten de request.
+
+- taken registreren met de decorator `@job("naam")` (zie `notes.tasks`)
+- `enqueue("naam", {"sleutel": waarde})` zet een `Job`-rij in de
+  wachtrij; de payload-dict wordt de keyword-argumenten van de taak
+- `manage.py run_worker` pikt jobs op en voert ze uit
+
+Met `NOTES_JOBS_EAGER` (standaard aan in dev, dus ook in de tests) voert
+`enqueue` de taak meteen uit, zonder `Job`-rij en zonder worker.
+
+Oppikken (`claim_next`):
+- PostgreSQL: `SELECT ... FOR UPDATE SKIP LOCKED`, zodat workers
+  elkaar niet blokkeren
+- SQLite (geen row locks): compare-and-set met
+  `UPDATE ... WHERE id = x AND status = 'queued'`; enkel de worker
+  waarvoor dat 1 rij raakt, krijgt de job
+
+Mislukte jobs worden opnieuw ingepland met exponentiële backoff tot
+`max_attempts`; daarna krijgen ze status `failed`. Per job worden start,
+einde en duur (ms) bewaard.
+
+Elke save plant enkele jobs in, dus afgewerkte rijen worden opgeruimd
+(`purge_finished`, door `run_worker`): `done` na
+`NOTES_JOBS_KEEP_DONE_SECONDS` (1 dag), `failed` na
+`NOTES_JOBS_KEEP_FAILED_SECONDS` (7 dagen).
+"""
+
+import logging
+import os
+import socket
+import threading
+import time
+import traceback
+from datetime import timedelta
+from typing import Callable, Dict, Optional
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+JOBS: Dict[str, Callable] = {}
+
+# jobs die langer dan dit 'running' staan, horen bij een gecrashte worker
+STALE_AFTER = timedelta(minutes=15)
+DEFAULT_KEEP_DONE_SECONDS = 24 * 3600
+DEFAULT_KEEP_FAILED_SECONDS = 7 * 24 * 3600
+
+
+def job(name: str):
+    """Registreer een functie als job: `@job("tags.merge")`."""
+
+    def decorator(func):
+        JOBS[name] = func
+        return func
+
+    return decorator
+
+
+def enqueue(
+    name: str,
+    payload: Optional[dict] = None,
+    delay: float = 0,
+    unique: bool = False,
+    max_attempts: int = 3,
+) -> Optional[Job]:
+    """
+    Zet een job in de wachtrij.
+
+    Args:
+        unique: sla over als dezelfde job (naam + payload) al wacht
+    """
+    if name not in JOBS:
+        raise KeyError(f"Onbekende job: {name}")
+    payload = payload or {}
+    if getattr(settings, "NOTES_JOBS_EAGER", False):
+        JOBS[name](**payload)
+        return None
+    if (
+        unique
+        and Job.objects.filter(name=name, payload=payload, status=Job.QUEUED).exists()
+    ):
+        return None
+    return Job.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts,
+        run_after=timezone.now() + timedelta(seconds=delay),
+    )
+
+
+def worker_id() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}:{threading.get_ident()}"
+
+
+def claim_next(worker: Optional[str] = None) -> Optional[Job]:
+    """Pik de volgende klare job op en zet hem op 'running'."""
+    worker = worker or worker_id()
+    now = timezone.now()
+    ready = Job.objects.filter(status=Job.QUEUED, run_after__lte=now).order_by(
+        "run_after", "pk"
+    )
+    claim = {"status": Job.RUNNING, "locked_by": worker, "locked_at": now}
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job_obj = ready.select_for_update(skip_locked=True).first()
+            if job_obj is None:
+                return None
+            Job.objects.filter(pk=job_obj.pk).update(**claim)
+    else:
+        for pk in ready.values_list("pk", flat=True)[:10]:
+            if Job.objects.filter(pk=pk, status=Job.QUEUED).update(**claim):
+                break
+        else:
+            return None
+        job_obj = Job(pk=pk)
+
+    job_obj.refresh_from_db()
+    return job_obj
+
+
+def run_job(job_obj: Job) -> bool:
+    """Voer een opgepikte job uit. Geeft True terug bij succes."""
+    func = JOBS.get(job_obj.name)
+    started = timezone.now()
+    t0 = time.perf_counter()
+    error = ""
+
+    try:
+        if func is None:
+            raise KeyError(f"Onbekende job: {job_obj.name}")
+        func(**job_obj.payload)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("job %s #%s mislukt", job_obj.name, job_obj.pk)
+
+    attempts = job_obj.attempts + 1
+    fields = {
+        "attempts": attempts,
+        "started_at": started,
+        "finished_at": timezone.now(),
+        "duration_ms": (time.perf_counter() - t0) * 1000,
+        "locked_by": "",
+        "locked_at": None,
+        "last_error": error,
+    }
+    if not error:
+        fields["status"] = Job.DONE
+    elif attempts < job_obj.max_attempts:
+        fields["status"] = Job.QUEUED
+        fields["run_after"] = timezone.now() + timedelta(seconds=2**attempts)
+    else:
+        fields["status"] = Job.FAILED
+    Job.objects.filter(pk=job_obj.pk).update(**fields)
+    return not error
+
+
+def requeue_stale(older_than: timedelta = STALE_AFTER) -> int:
+    """Zet 'running' jobs van verdwenen workers terug in de wachtrij."""
+    return Job.objects.filter(
+        status=Job.RUNNING, locked_at__lt=timezone.now() - older_than
+    ).update(status=Job.QUEUED, locked_by="", locked_at=None)
+
+
+def purge_finished(now=None) -> int:
+    """Verwijder afgewerkte jobs die lang genoeg bewaard zijn."""
+    now = now or timezone.now()
+    keep_done = getattr(
+        settings, "NOTES_JOBS_KEEP_DONE_SECONDS", DEFAULT_KEEP_DONE_SECONDS
+    )
+    keep_failed = getattr(
+        settings, "NOTES_JOBS_KEEP_FAILED_SECONDS", DEFAULT_KEEP_FAILED_SECONDS
+    )
+    deleted, _ = Job.objects.filter(
+        Q(status=Job.DONE, finished_at__lt=now - timedelta(seconds=keep_done))
+        | Q(status=Job.FAILED, finished_at__lt=now - timedelta(seconds=keep_failed))
+    ).delete()
+    return deleted
+
+
+def run_pending(limit: Optional[int] = None, worker: Optional[str] = None) -> int:
+    """Werk klare jobs af tot de wachtrij leeg is (of `limit` bereikt)."""
+    done = 0
+    while limit is None or done < limit:
+        job_obj = claim_next(worker)
+        if job_obj is None:
+            break
+        run_job(job_obj)
+        done += 1
+    return done
@@ -0,0 +1,147 @@
+"""
+notes.links
+===========
+
+Wiki-links tussen notities: `[[Titel]]` of `[[Titel|tekst]]` in de body.
+
+- het renderen gebeurt door `WikiLinkExtension` in
+  `notes.templatetags.markdown_extras`
+- welke note naar welke linkt, staat in de edge-tabel `NoteLink`; die
+  wordt bij elke save incrementeel bijgewerkt (`sync_links`): enkel de
+  links die erbij kwamen of verdwenen worden geschreven
+- backlinks van een note = één query op de geïndexeerde `target`-kolom
+
+Titels worden exact vergeleken (zoals de index op `Note.title`); zijn er
+meerdere notes met dezelfde titel, dan wint de oudste (laagste id).
+"""
+
+import re
+from typing import Dict, Iterable, List
+
+from django.db import transaction
+
+from .models import Note, NoteLink
+
+TITLE_MAX_LENGTH = Note._meta.get_field("title").max_length
+
+# [[Titel]] of [[Titel|getoonde tekst]]
+WIKILINK_RE = r"\[\[([^\[\]\|\n]+?)(?:\|([^\[\]\n]+?))?\]\]"
+_wikilink = re.compile(WIKILINK_RE)
+
+
+def normalize_title(title: str) -> str:
+    return " ".join(title.split())[:TITLE_MAX_LENGTH]
+
+
+def extract_link_titles(text: str) -> List[str]:
+    """Alle (unieke) doeltitels in `text`, in volgorde van voorkomen."""
+    seen = {}
+    for match in _wikilink.finditer(text or ""):
+        title = normalize_title(match.group(1))
+        if title:
+            seen.setdefault(title, None)
+    return list(seen)
+
+
+def resolve_titles(titles: Iterable[str]) -> Dict[str, int]:
+    """{titel: note-id} voor de titels die bestaan (één query)."""
+    titles = set(titles)
+    if not titles:
+        return {}
+    resolved: Dict[str, int] = {}
+    for title, pk in (
+        Note.objects.filter(title__in=titles).order_by("-pk").values_list("title", "pk")
+    ):
+        resolved[title] = pk  # laatste = laagste id
+    return resolved
+
+
+def sync_links(note: Note) -> None:
+    """Werk de uitgaande links van `note` bij t.o.v. wat er al bewaard is."""
+    wanted = set(extract_link_titles(note.body))
+    existing = dict(
+        NoteLink.objects.filter(source_id=note.pk).values_list("target_title", "pk")
+    )
+
+    removed = [pk for title, pk in existing.items() if title not in wanted]
+    added = wanted - existing.keys()
+    if not removed and not added:
+        return
+
+    with transaction.atomic():
+        if removed:
+            NoteLink.objects.filter(pk__in=removed).delete()
+        if added:
+            targets = resolve_titles(added)
+            NoteLink.objects.bulk_create(
+                [
+                    NoteLink(
+                        source_id=note.pk, target_id=targets.get(t), target_title=t
+                    )
+                    for t in sorted(added)
+                ],
+                ignore_conflicts=True,
+            )
+
+
+def sync_incoming(note: Note) -> None:
+    """
+    Na aanmaken of hernoemen: links die naar de oude titel wezen loskoppelen
+    (of naar een andere note met die titel laten wijzen) en openstaande
+    links naar de huidige titel aan `note` hangen.
+    """
+    stale = dict(
+        NoteLink.objects.filter(target_id=note.pk)
+        .exclude(target_title=note.title)
+        .values_list("pk", "target_title")
+    )
+    if stale:
+        targets = resolve_titles(set(stale.values()))
+        for title in set(stale.values()):
+            NoteLink.objects.filter(
+                pk__in=[pk for pk, t in stale.items() if t == title]
+            ).update(target_id=targets.get(title))
+
+    NoteLink.objects.filter(target__isnull=True, target_title=note.title).update(
+        target_id=note.pk
+    )
+
+
+def backlinks(note: Note):
+    """Notes die naar `note` linken (één query op de index van `target`)."""
+    return (
+        Note.objects.filter(outgoing_links__target_id=note.pk)
+        .only("pk", "title")
+        .order_by("title", "pk")
+    )
+
+
+def rebuild_links(batch_size: int = 500) -> int:
+    """
+    Bouw de volledige linkindex opnieuw op, bv. na een import via
+    `bulk_create` (die geen signals stuurt). Geeft het aantal links terug.
+    """
+    total = 0
+    batch: List[NoteLink] = []
+
+    def flush():
+        targets = resolve_titles(link.target_title for link in batch)
+        for link in batch:
+            link.target_id = targets.get(link.target_title)
+        NoteLink.objects.bulk_create(batch)
+        return len(batch)
+
+    with transaction.atomic():
+        NoteLink.objects.all().delete()
+        notes = Note.objects.order_by("pk").select_related("body_blob")
+        for note in notes.iterator(chunk_size=batch_size):
+            batch.extend(
+                NoteLink(source_id=note.pk, target_title=title)
+                for title in extract_link_titles(note.body)
+            )
+            if len(batch) >= batch_size:
+                total += flush()
+                batch = []
+        if batch:
+            total += flush()
+    return total
@@ -0,0 +1,60 @@
+"""
+manage.py api_keys
+==================
+
+API-sleutels beheren (zie `notes.api_auth`). De sleutel zelf wordt
+enkel bij `create` getoond; daarna staat alleen de hash nog in de
+database.
+
+Voorbeelden:
+    python manage.py api_keys create "sync-client" --rate 2 --burst 10
+    python manage.py api_keys list
+    python manage.py api_keys revoke nk_AbCdEfGh
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notes.api_auth import create_key
+from notes.models import ApiKey
+
+
+class Command(BaseCommand):
+    help = "API-sleutels aanmaken, tonen of intrekken."
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        create = sub.add_parser("create", help="Maak een nieuwe sleutel aan.")
+        create.add_argument("name")
+        create.add_argument("--rate", type=float, help="Requests per seconde.")
+        create.add_argument("--burst", type=int, help="Maximale burst.")
+
+        sub.add_parser("list", help="Toon alle sleutels (enkel het begin).")
+
+        revoke = sub.add_parser("revoke", help="Zet een sleutel op inactief.")
+        revoke.add_argument("prefix", help="Begin van de sleutel (zie list).")
+
+    def handle(self, *args, **options):
+        action = options["action"]
+
+        if action == "create":
+            raw, api_key = create_key(
+                options["name"], rate=options["rate"], burst=options["burst"]
+            )
+            self.stdout.write(self.style.SUCCESS(f'Sleutel "{api_key.name}":'))
+            self.stdout.write(raw)
+            return
+
+        if action == "list":
+            for api_key in ApiKey.objects.all():
+                status = "actief" if api_key.is_active else "ingetrokken"
+                self.stdout.write(f"{api_key.prefix}  {api_key.name}  ({status})")
+            return
+
+        # revoke: save() i.p.v. update() zodat de signal de cache leegmaakt
+        keys = list(ApiKey.objects.filter(prefix=options["prefix"], is_active=True))
+        if len(keys) != 1:
+            raise CommandError("Geen (unieke) actieve sleutel met dat begin.")
+        keys[0].is_active = False
+        keys[0].save(update_fields=["is_active"])
+        self.stdout.write(self.style.SUCCESS(f'Sleutel "{keys[0].name}" ingetrokken.'))
@@ -0,0 +1,46 @@
+"""
+manage.py build_search_index
+============================
+
+Bouw de BM25-zoekindex (zie `notes.search`) uit de database en schrijf
+hem naar `NOTES_SEARCH_INDEX_DIR`. Workers laden die bestanden met mmap
+bij het opstarten en halen daarna enkel de wijzigingen in.
+
+Voorbeeld:
+    python manage.py build_search_index
+    python manage.py build_search_index --path /var/lib/notes/search
+"""
+
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notes import search
+
+
+class Command(BaseCommand):
+    help = "Bouw de BM25-zoekindex en bewaar hem op schijf."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path", help="Doelmap (standaard NOTES_SEARCH_INDEX_DIR)."
+        )
+
+    def handle(self, *args, **options):
+        if search.load_numpy() is None:
+            raise CommandError("numpy is vereist voor de zoekindex.")
+        path = Path(options["path"]) if options["path"] else search.index_dir()
+        if path is None:
+            raise CommandError("Geen --path en geen NOTES_SEARCH_INDEX_DIR ingesteld.")
+
+        t0 = time.perf_counter()
+        engine = search.SearchEngine.from_database()
+        engine.save(path)
+        search.reset_engine()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{engine.doc_count} notes, {len(engine.base.vocab)} termen "
+                f"geïndexeerd in {time.perf_counter() - t0:.1f}s -> {path}"
+            )
+        )
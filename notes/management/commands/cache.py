@@ -0,0 +1,57 @@
+"""
+manage.py cache
+===============
+
+De gedeelde cache (zie `notes.caching`) bekijken en ongeldig maken.
+
+Voorbeelden:
+    python manage.py cache stats
+    python manage.py cache bump markdown
+    python manage.py cache clear
+"""
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+
+from notes import caching
+
+
+class Command(BaseCommand):
+    help = "Statistieken van de gedeelde cache, namespaces ongeldig maken."
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        stats = sub.add_parser("stats", help="Hits/misses per namespace.")
+        stats.add_argument(
+            "--reset", action="store_true", help="Zet de tellers daarna op nul."
+        )
+
+        bump = sub.add_parser("bump", help="Maak een namespace ongeldig.")
+        bump.add_argument("namespaces", nargs="+")
+
+        sub.add_parser("clear", help="Leeg de volledige cache.")
+
+    def handle(self, *args, **options):
+        action = options["action"]
+
+        if action == "stats":
+            for namespace, counts in sorted(caching.stats().items()):
+                total = counts["hits"] + counts["misses"]
+                ratio = counts["hits"] / total if total else 0.0
+                self.stdout.write(
+                    f"{namespace}: {counts['hits']} hits, {counts['misses']} misses, "
+                    f"{counts['early']} vroeg herberekend ({ratio:.0%} hits)"
+                )
+            if options["reset"]:
+                caching.reset_stats()
+            return
+
+        if action == "bump":
+            for namespace in options["namespaces"]:
+                caching.bump(namespace)
+            self.stdout.write(self.style.SUCCESS("Namespace(s) ongeldig gemaakt."))
+            return
+
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS("Cache geleegd."))
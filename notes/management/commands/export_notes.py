@@ -0,0 +1,79 @@
+"""
+manage.py export_notes
+======================
+
+Stream alle notities (incl. tags) naar NDJSON of CSV.
+
+Voorbeelden:
+    python manage.py export_notes notes.ndjson
+    python manage.py export_notes notes.csv --batch-size 5000
+    python manage.py export_notes notes.ndjson --resume   # ga verder na onderbreking
+    python manage.py export_notes - > notes.ndjson        # naar stdout
+"""
+
+import os
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notes import exchange
+
+
+class Command(BaseCommand):
+    help = "Exporteer notities streamend naar NDJSON of CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Doelbestand, of '-' voor stdout.")
+        parser.add_argument("--format", choices=exchange.FORMATS)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=2000,
+            help="Chunkgrootte van de iterator en interval van voortgangsmeldingen.",
+        )
+        parser.add_argument(
+            "--after-id", type=int, help="Exporteer enkel notes met een hoger id."
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Vul een bestaand bestand aan vanaf het laatste geëxporteerde id.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        fmt = options["format"] or exchange.guess_format(path)
+        after_id = options["after_id"]
+        to_stdout = path == "-"
+
+        appending = False
+        if options["resume"]:
+            if to_stdout:
+                raise CommandError("--resume werkt niet met stdout.")
+            if os.path.exists(path) and os.path.getsize(path):
+                # een half geschreven laatste record weghalen
+                with open(path, "r+b") as fh:
+                    after_id, offset = exchange.resume_point(fh, fmt)
+                    fh.truncate(offset)
+                appending = offset > 0
+
+        fh = (
+            sys.stdout
+            if to_stdout
+            else open(path, "a" if appending else "w", encoding="utf-8", newline="")
+        )
+        writer = exchange.WRITERS[fmt](fh, write_header=not appending)
+        progress = exchange.Throughput()
+        batch_size = options["batch_size"]
+
+        try:
+            for record in exchange.iter_note_records(after_id, chunk_size=batch_size):
+                writer.write(record)
+                progress.add(1)
+                if progress.count % batch_size == 0:
+                    self.stderr.write(f"export: {progress}")
+        finally:
+            if not to_stdout:
+                fh.close()
+
+        self.stderr.write(self.style.SUCCESS(f"export klaar: {progress}"))
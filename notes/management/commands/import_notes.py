@@ -0,0 +1,82 @@
+"""
+manage.py import_notes
+======================
+
+Importeer notities (incl. tags) uit NDJSON of CSV, in batches.
+
+Elke batch is één transactie met `bulk_create`. Na elke batch wordt het
+aantal verwerkte records in een checkpointbestand gezet, zodat een
+onderbroken import met `--resume` verdergaat waar hij stopte.
+
+Voorbeelden:
+    python manage.py import_notes notes.ndjson
+    python manage.py import_notes notes.csv --batch-size 5000 --resume
+"""
+
+import os
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notes import exchange
+
+
+def _read_checkpoint(path: str) -> int:
+    try:
+        with open(path, encoding="ascii") as fh:
+            return int(fh.read().strip() or 0)
+    except FileNotFoundError:
+        return 0
+
+
+def _write_checkpoint(path: str, done: int) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="ascii") as fh:
+        fh.write(str(done))
+    os.replace(tmp, path)
+
+
+class Command(BaseCommand):
+    help = "Importeer notities streamend uit NDJSON of CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Bronbestand (.ndjson/.jsonl of .csv).")
+        parser.add_argument("--format", choices=exchange.FORMATS)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument(
+            "--checkpoint",
+            help="Checkpointbestand (standaard: <path>.checkpoint).",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Sla de records over die volgens het checkpoint al binnen zijn.",
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        if not os.path.exists(path):
+            raise CommandError(f"Bestand niet gevonden: {path}")
+
+        fmt = options["format"] or exchange.guess_format(path)
+        batch_size = options["batch_size"]
+        checkpoint = options["checkpoint"] or f"{path}.checkpoint"
+        done = _read_checkpoint(checkpoint) if options["resume"] else 0
+
+        importer = exchange.NoteImporter()
+        progress = exchange.Throughput()
+
+        with open(path, encoding="utf-8", newline="") as fh:
+            records = islice(exchange.READERS[fmt](fh), done, None)
+            if done:
+                self.stderr.write(f"import: hervat na {done} records")
+
+            while True:
+                batch = list(islice(records, batch_size))
+                if not batch:
+                    break
+                progress.add(importer.import_batch(batch))
+                _write_checkpoint(checkpoint, done + progress.count)
+                self.stderr.write(f"import: {progress}")
+
+        self.stderr.write(self.style.SUCCESS(f"import klaar: {progress}"))
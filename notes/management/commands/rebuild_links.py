@@ -0,0 +1,26 @@
+"""
+manage.py rebuild_links
+=======================
+
+Bouw de index van wiki-links (`NoteLink`) volledig opnieuw op.
+Nodig na imports via `bulk_create` (import_notes, seed_notes), want die
+sturen geen signals; gewone saves houden de index zelf bij.
+
+Voorbeeld:
+    python manage.py rebuild_links --batch-size 1000
+"""
+
+from django.core.management.base import BaseCommand
+
+from notes.links import rebuild_links
+
+
+class Command(BaseCommand):
+    help = "Bouw de index van [[wiki-links]] tussen notities opnieuw op."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        total = rebuild_links(batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"{total} links geïndexeerd."))
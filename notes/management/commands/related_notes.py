@@ -0,0 +1,34 @@
+"""
+manage.py related_notes
+=======================
+
+Bereken de verwante notities (gedeelde tags) voor alle notes opnieuw,
+rechtstreeks in plaats van via de jobqueue. Handig na een import.
+
+Voorbeelden:
+    python manage.py related_notes
+    python manage.py related_notes --top-k 10 --batch-size 1000
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from notes.similarity import refresh_related
+
+
+class Command(BaseCommand):
+    help = "Herbereken de verwante notities op basis van gedeelde tags."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--top-k", type=int, default=None)
+        parser.add_argument("--batch-size", type=int, default=500)
+
+    def handle(self, *args, **options):
+        t0 = time.perf_counter()
+        written = refresh_related(batch_size=options["batch_size"], k=options["top_k"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{written} verwante notes bewaard in {time.perf_counter() - t0:.1f}s."
+            )
+        )
@@ -0,0 +1,121 @@
+"""
+manage.py run_worker
+====================
+
+Voer jobs uit de database-queue uit (zie `notes.jobs`).
+
+Voorbeelden:
+    python manage.py run_worker                 # 1 thread, blijft draaien
+    python manage.py run_worker --threads 4
+    python manage.py run_worker --once          # wachtrij leegmaken en stoppen
+
+Bij het starten en daarna hoogstens elke `PURGE_EVERY` seconden (als de
+wachtrij leeg is) ruimt de worker oude afgewerkte jobs op
+(`jobs.purge_finished`).
+"""
+
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from notes import jobs
+
+PURGE_EVERY = 600
+
+
+class Command(BaseCommand):
+    help = "Start een worker die jobs uit de queue uitvoert."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=1)
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconden wachten als de queue leeg is.",
+        )
+        parser.add_argument(
+            "--once", action="store_true", help="Stop zodra de queue leeg is."
+        )
+
+    def handle(self, *args, **options):
+        self.stop = threading.Event()
+        self.processed = 0
+        self.lock = threading.Lock()
+
+        requeued = jobs.requeue_stale()
+        if requeued:
+            self.stderr.write(f"worker: {requeued} vastgelopen job(s) opnieuw gepland")
+        self.purged_at = None
+        self.purge()
+
+        try:
+            if options["threads"] <= 1:
+                self.loop(options)
+            else:
+                self.run_threads(options)
+        except KeyboardInterrupt:
+            self.stop.set()
+
+        self.stdout.write(
+            self.style.SUCCESS(f"worker gestopt: {self.processed} job(s) verwerkt")
+        )
+
+    def run_threads(self, options):
+        threads = [
+            threading.Thread(target=self.thread_loop, args=(options,), daemon=True)
+            for _ in range(options["threads"])
+        ]
+        for t in threads:
+            t.start()
+        try:
+            for t in threads:
+                while t.is_alive():
+                    t.join(0.5)
+        finally:
+            self.stop.set()
+            for t in threads:
+                t.join()
+
+    def purge(self):
+        with self.lock:
+            if (
+                self.purged_at is not None
+                and time.monotonic() - self.purged_at < PURGE_EVERY
+            ):
+                return
+            self.purged_at = time.monotonic()
+        purged = jobs.purge_finished()
+        if purged:
+            self.stderr.write(f"worker: {purged} afgewerkte job(s) opgeruimd")
+
+    def thread_loop(self, options):
+        try:
+            self.loop(options)
+        finally:
+            # elke thread heeft een eigen databaseverbinding
+            connection.close()
+
+    def loop(self, options):
+        worker = jobs.worker_id()
+        while not self.stop.is_set():
+            close_old_connections()
+            job_obj = jobs.claim_next(worker)
+            if job_obj is None:
+                if options["once"]:
+                    return
+                self.purge()
+                self.stop.wait(options["poll_interval"])
+                continue
+
+            t0 = time.perf_counter()
+            ok = jobs.run_job(job_obj)
+            with self.lock:
+                self.processed += 1
+            elapsed_ms = (time.perf_counter() - t0) * 1000
+            self.stderr.write(
+                f"{job_obj.name} #{job_obj.pk}: {'ok' if ok else 'fout'} "
+                f"in {elapsed_ms:.0f} ms"
+            )
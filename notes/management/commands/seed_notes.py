@@ -0,0 +1,84 @@
+"""
+manage.py seed_notes
+====================
+
+Vul de database met synthetische notities (voor benchmarks en
+loadtests). Gebruikt hetzelfde batch-importpad als `import_notes`.
+
+Voorbeelden:
+    python manage.py seed_notes --count 10000
+    python manage.py seed_notes --count 100000 --tags 200 --clear
+"""
+
+import random
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from notes import exchange
+from notes.models import Note, Tag
+
+WORDS = (
+    "project planning vergadering idee werk thuis boek recept reis code "
+    "python django database index query cache server deploy release bug "
+    "fix notitie lijst taak klant team budget agenda markdown wiki zoek"
+).split()
+
+
+def synthetic_records(count, tags, tags_per_note, body_words, rng):
+    """Genereer `count` records in het formaat van `notes.exchange`."""
+    tag_names = [f"tag{i:03d}" for i in range(tags)]
+    now = timezone.now()
+    for i in range(count):
+        words = rng.choices(WORDS, k=body_words)
+        created = now - timedelta(minutes=rng.randint(0, 60 * 24 * 365))
+        updated = created + timedelta(minutes=rng.randint(0, 60 * 24 * 30))
+        yield {
+            "title": f"{' '.join(rng.choices(WORDS, k=3)).capitalize()} {i}",
+            "body": f"# Notitie {i}\n\n" + " ".join(words),
+            "created_at": created.isoformat(),
+            "updated_at": min(updated, now).isoformat(),
+            "tags": rng.sample(tag_names, k=min(tags_per_note, len(tag_names))),
+        }
+
+
+class Command(BaseCommand):
+    help = "Maak synthetische notities aan (benchmarks/loadtests)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=1000)
+        parser.add_argument("--tags", type=int, default=50)
+        parser.add_argument("--tags-per-note", type=int, default=3)
+        parser.add_argument("--body-words", type=int, default=80)
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=1)
+        parser.add_argument(
+            "--clear", action="store_true", help="Verwijder eerst alle notes en tags."
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            Note.objects.all().delete()
+            Tag.objects.all().delete()
+
+        rng = random.Random(options["seed"])
+        records = synthetic_records(
+            options["count"],
+            options["tags"],
+            options["tags_per_note"],
+            options["body_words"],
+            rng,
+        )
+
+        importer = exchange.NoteImporter()
+        progress = exchange.Throughput()
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) >= options["batch_size"]:
+                progress.add(importer.import_batch(batch))
+                batch = []
+        progress.add(importer.import_batch(batch))
+
+        self.stdout.write(self.style.SUCCESS(f"seed klaar: {progress}"))
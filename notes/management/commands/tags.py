@@ -0,0 +1,107 @@
+"""
+manage.py tags
+==============
+
+Bulkbewerkingen op tags vanaf de command line.
+
+Voorbeelden:
+    python manage.py tags merge Werk WERK --into werk
+    python manage.py tags rename oud nieuw
+    python manage.py tags delete tijdelijk test
+    python manage.py tags delete tijdelijk --queue   # als job voor run_worker
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from notes import tag_ops
+from notes.jobs import enqueue
+from notes.models import Tag
+
+
+class Command(BaseCommand):
+    help = "Tags samenvoegen, hernoemen of verwijderen (set-based)."
+
+    def add_arguments(self, parser):
+        sub = parser.add_subparsers(dest="action", required=True)
+
+        merge = sub.add_parser("merge", help="Voeg tags samen in één doeltag.")
+        merge.add_argument("sources", nargs="+", help="Namen van de bron-tags.")
+        merge.add_argument("--into", required=True, help="Naam van de doeltag.")
+        merge.add_argument(
+            "--create",
+            action="store_true",
+            help="Maak de doeltag aan als die nog niet bestaat.",
+        )
+
+        rename = sub.add_parser("rename", help="Hernoem een tag.")
+        rename.add_argument("old")
+        rename.add_argument("new")
+
+        delete = sub.add_parser("delete", help="Verwijder tags en hun links.")
+        delete.add_argument("names", nargs="+")
+
+        for command in (merge, delete):
+            command.add_argument(
+                "--queue",
+                action="store_true",
+                help="Plan in als job (manage.py run_worker) i.p.v. meteen uit te voeren.",
+            )
+
+    def _get_tags(self, names):
+        tags = list(Tag.objects.filter(name__in=names))
+        missing = set(names) - {t.name for t in tags}
+        if missing:
+            raise CommandError(f"Onbekende tag(s): {', '.join(sorted(missing))}")
+        return tags
+
+    def handle(self, *args, **options):
+        action = options["action"]
+
+        if action == "merge":
+            if options["create"]:
+                target, _ = Tag.objects.get_or_create(name=options["into"])
+            else:
+                (target,) = self._get_tags([options["into"]])
+            sources = self._get_tags(options["sources"])
+            if options["queue"]:
+                enqueue(
+                    "tags.merge",
+                    {
+                        "source_ids": sorted(t.pk for t in sources),
+                        "target_id": target.pk,
+                    },
+                    unique=True,
+                )
+                self.stdout.write(f'Samenvoegen in "{target.name}" ingepland.')
+                return
+            moved = tag_ops.merge_tags(sources, target)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f'Samengevoegd in "{target.name}": {moved} links omgezet.'
+                )
+            )
+
+        elif action == "rename":
+            (tag,) = self._get_tags([options["old"]])
+            try:
+                result = tag_ops.rename_tag(tag, options["new"])
+            except ValueError as exc:
+                raise CommandError(str(exc)) from exc
+            self.stdout.write(
+                self.style.SUCCESS(f'"{options["old"]}" heet nu "{result.name}".')
+            )
+
+        elif action == "delete":
+            tags = self._get_tags(options["names"])
+            if options["queue"]:
+                enqueue(
+                    "tags.delete", {"tag_ids": sorted(t.pk for t in tags)}, unique=True
+                )
+                self.stdout.write(f"Verwijderen van {len(tags)} tag(s) ingepland.")
+                return
+            removed = tag_ops.delete_tags(tags)
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"{len(tags)} tag(s) verwijderd, {removed} links weg."
+                )
+            )
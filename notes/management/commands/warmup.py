@@ -0,0 +1,36 @@
+"""
+manage.py warmup
+================
+
+Laadt URLconf, templates, markdown/bleach/pygments en de zoekindex, en
+toont hoelang elke stap duurde (zie `notes.warmup`). Handig om de
+opstartkosten te bekijken; in productie doet `gunicorn.conf.py` hetzelfde
+in elke worker.
+
+Voorbeelden:
+    python manage.py warmup
+    python manage.py warmup --skip search
+"""
+
+from django.core.management.base import BaseCommand
+
+from notes.warmup import STEPS, warmup
+
+
+class Command(BaseCommand):
+    help = "Laad zware imports en caches vooraf en toon de duur per stap."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--skip",
+            action="append",
+            choices=sorted(STEPS),
+            default=[],
+            help="Sla deze stap over (herhaalbaar).",
+        )
+
+    def handle(self, *args, **options):
+        timings = warmup(skip=options["skip"])
+        for name, ms in timings.items():
+            self.stdout.write(f"{name}: {ms:.1f} ms")
+        self.stdout.write(f"totaal: {sum(timings.values()):.1f} ms")
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0003_note_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(fields=["title"], name="notes_note_title_idx"),
+        ),
+    ]
@@ -0,0 +1,109 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:38
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0004_note_title_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Job",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="taak")),
+                (
+                    "payload",
+                    models.JSONField(
+                        blank=True, default=dict, verbose_name="parameters"
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("queued", "in wachtrij"),
+                            ("running", "bezig"),
+                            ("done", "klaar"),
+                            ("failed", "mislukt"),
+                        ],
+                        default="queued",
+                        max_length=10,
+                        verbose_name="status",
+                    ),
+                ),
+                (
+                    "attempts",
+                    models.PositiveIntegerField(default=0, verbose_name="pogingen"),
+                ),
+                (
+                    "max_attempts",
+                    models.PositiveIntegerField(
+                        default=3, verbose_name="max. pogingen"
+                    ),
+                ),
+                (
+                    "run_after",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="niet voor"
+                    ),
+                ),
+                (
+                    "locked_by",
+                    models.CharField(blank=True, max_length=100, verbose_name="worker"),
+                ),
+                (
+                    "locked_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="opgepikt op"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="aangemaakt op"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="gestart op"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="klaar op"
+                    ),
+                ),
+                (
+                    "duration_ms",
+                    models.FloatField(blank=True, null=True, verbose_name="duur (ms)"),
+                ),
+                (
+                    "last_error",
+                    models.TextField(blank=True, verbose_name="laatste fout"),
+                ),
+            ],
+            options={
+                "ordering": ["run_after", "pk"],
+                "indexes": [
+                    models.Index(
+                        fields=["status", "run_after"], name="notes_job_poll_idx"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:39
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0005_job"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NoteRevision",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.PositiveIntegerField(verbose_name="versie")),
+                ("title", models.CharField(max_length=120, verbose_name="titel")),
+                (
+                    "is_snapshot",
+                    models.BooleanField(default=False, verbose_name="snapshot"),
+                ),
+                ("data", models.TextField(blank=True, verbose_name="body of delta")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="aangemaakt op"
+                    ),
+                ),
+                (
+                    "note",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="revisions",
+                        to="notes.note",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["note", "version"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("note", "version"), name="notes_revision_unique_version"
+                    )
+                ],
+            },
+        ),
+    ]
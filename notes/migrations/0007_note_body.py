@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:41
+
+import django.db.models.deletion
+import notes.bodies
+from django.db import migrations, models
+from django.db.models.functions import Length
+
+
+def externalize_large_bodies(apps, schema_editor):
+    """Verplaats bestaande grote bodies naar NoteBody (zie notes.bodies)."""
+    Note = apps.get_model("notes", "Note")
+    NoteBody = apps.get_model("notes", "NoteBody")
+    # Length telt tekens; is_large doet de exacte bytecheck
+    threshold = notes.bodies.external_threshold()
+    candidates = Note.objects.annotate(n=Length("body")).filter(n__gt=threshold // 4)
+    for note in candidates.only("pk", "body").iterator(chunk_size=100):
+        if not notes.bodies.is_large(note.body):
+            continue
+        codec, data = notes.bodies.compress(note.body)
+        NoteBody.objects.create(note_id=note.pk, codec=codec, data=data)
+        Note.objects.filter(pk=note.pk).update(body="", body_external=True)
+
+
+def internalize_bodies(apps, schema_editor):
+    Note = apps.get_model("notes", "Note")
+    NoteBody = apps.get_model("notes", "NoteBody")
+    for blob in NoteBody.objects.iterator(chunk_size=100):
+        body = notes.bodies.decompress(blob.codec, blob.data)
+        Note.objects.filter(pk=blob.note_id).update(body=body, body_external=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0006_noterevision"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NoteBody",
+            fields=[
+                (
+                    "note",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="body_blob",
+                        serialize=False,
+                        to="notes.note",
+                    ),
+                ),
+                (
+                    "codec",
+                    models.CharField(
+                        default="zlib", max_length=10, verbose_name="compressie"
+                    ),
+                ),
+                ("data", models.BinaryField(verbose_name="gecomprimeerde inhoud")),
+            ],
+        ),
+        migrations.AddField(
+            model_name="note",
+            name="body_external",
+            field=models.BooleanField(default=False, verbose_name="body apart bewaard"),
+        ),
+        migrations.AlterField(
+            model_name="note",
+            name="body",
+            field=notes.bodies.SplitBodyField(
+                blank=True,
+                help_text="Vrije tekst (Markdown toegestaan)",
+                verbose_name="inhoud",
+            ),
+        ),
+        migrations.RunPython(externalize_large_bodies, internalize_bodies),
+    ]
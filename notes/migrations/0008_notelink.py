@@ -0,0 +1,61 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0007_note_body"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NoteLink",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "target_title",
+                    models.CharField(max_length=120, verbose_name="doeltitel"),
+                ),
+                (
+                    "source",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="outgoing_links",
+                        to="notes.note",
+                    ),
+                ),
+                (
+                    "target",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="backlinks",
+                        to="notes.note",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["target_title"], name="notes_link_title_idx")
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("source", "target_title"),
+                        name="notes_link_unique_title",
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0008_notelink"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RelatedNote",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("score", models.FloatField(verbose_name="gelijkenis")),
+                ("rank", models.PositiveSmallIntegerField(verbose_name="positie")),
+                (
+                    "note",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="related_entries",
+                        to="notes.note",
+                    ),
+                ),
+                (
+                    "related",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="notes.note",
+                    ),
+                ),
+            ],
+            options={
+                "ordering": ["note", "rank"],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("note", "rank"), name="notes_related_unique_rank"
+                    )
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,53 @@
+# Generated by Django 5.2.18 on 2026-10-19 13:59
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+import notes.bodies
+import notes.snippets
+
+
+def fill_note_texts(apps, schema_editor):
+    """Platte tekst voor bestaande notes (incl. apart bewaarde bodies)."""
+    Note = apps.get_model("notes", "Note")
+    NoteBody = apps.get_model("notes", "NoteBody")
+    NoteText = apps.get_model("notes", "NoteText")
+    blobs = {
+        b.note_id: notes.bodies.decompress(b.codec, b.data)
+        for b in NoteBody.objects.iterator(chunk_size=100)
+    }
+    batch = []
+    for pk, body in Note.objects.values_list("pk", "body").iterator(chunk_size=500):
+        text = notes.snippets.plain_text(blobs.get(pk, body))
+        batch.append(NoteText(note_id=pk, text=text))
+        if len(batch) >= 500:
+            NoteText.objects.bulk_create(batch)
+            batch = []
+    NoteText.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0009_relatednote"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="NoteText",
+            fields=[
+                (
+                    "note",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="plain_text",
+                        serialize=False,
+                        to="notes.note",
+                    ),
+                ),
+                ("text", models.TextField(blank=True, verbose_name="platte tekst")),
+            ],
+        ),
+        migrations.RunPython(fill_note_texts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0010_notetext"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SavedSearch",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="naam")),
+                ("slug", models.SlugField(unique=True, verbose_name="slug")),
+                (
+                    "tag",
+                    models.CharField(blank=True, max_length=50, verbose_name="tag"),
+                ),
+                (
+                    "query",
+                    models.CharField(
+                        blank=True,
+                        help_text="Alle woorden moeten in titel of inhoud voorkomen.",
+                        max_length=200,
+                        verbose_name="zoektermen",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="aangemaakt op"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(
+                        auto_now=True, verbose_name="laatst bijgewerkt op"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name_plural": "saved searches",
+                "ordering": ["name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="SavedSearchMember",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "note",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="saved_search_memberships",
+                        to="notes.note",
+                    ),
+                ),
+                (
+                    "search",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="members",
+                        to="notes.savedsearch",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddField(
+            model_name="savedsearch",
+            name="notes",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="saved_searches",
+                through="notes.SavedSearchMember",
+                to="notes.note",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="savedsearchmember",
+            constraint=models.UniqueConstraint(
+                fields=("search", "note"), name="notes_saved_search_unique_member"
+            ),
+        ),
+    ]
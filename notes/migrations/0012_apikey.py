@@ -0,0 +1,75 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0011_savedsearch"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ApiKey",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=100, verbose_name="naam")),
+                (
+                    "prefix",
+                    models.CharField(
+                        editable=False,
+                        max_length=12,
+                        verbose_name="begin van de sleutel",
+                    ),
+                ),
+                (
+                    "key_hash",
+                    models.CharField(
+                        editable=False,
+                        max_length=64,
+                        unique=True,
+                        verbose_name="SHA-256 van de sleutel",
+                    ),
+                ),
+                (
+                    "rate",
+                    models.FloatField(
+                        blank=True,
+                        help_text="Leeg = NOTES_API_RATE.",
+                        null=True,
+                        verbose_name="requests per seconde",
+                    ),
+                ),
+                (
+                    "burst",
+                    models.PositiveIntegerField(
+                        blank=True,
+                        help_text="Leeg = NOTES_API_BURST.",
+                        null=True,
+                        verbose_name="burst",
+                    ),
+                ),
+                ("is_active", models.BooleanField(default=True, verbose_name="actief")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="aangemaakt op"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "API-sleutel",
+                "verbose_name_plural": "API-sleutels",
+                "ordering": ["name"],
+            },
+        ),
+    ]
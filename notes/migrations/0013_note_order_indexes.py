@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0012_apikey"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(fields=["-created_at"], name="notes_note_created_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                fields=["-updated_at", "-created_at", "title"],
+                name="notes_note_recent_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:10
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("notes", "0013_note_order_indexes"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="note",
+            index=models.Index(
+                django.db.models.functions.text.Lower("title"),
+                name="notes_note_title_lower_idx",
+            ),
+        ),
+    ]
@@ -9,6 +9,10 @@ Tag = label dat je kan koppelen aan meerdere Notes (ManyToMany).
 """
 
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .bodies import SplitBodyField, mark_external, store_external
 
 
 class Tag(models.Model):
@@ -23,11 +27,31 @@ class Tag(models.Model):
         return self.name
 
 
+class NoteQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        """Zoals `QuerySet.bulk_create`, maar grote bodies apart gecomprimeerd."""
+        objs = list(objs)
+        mark_external(objs)
+        created = super().bulk_create(objs, *args, **kwargs)
+        saved = [n for n in created if n.pk is not None]
+        store_external(saved)
+        store_plain_texts(saved)
+        if saved:
+            # geen post_save-signals: saved searches in één job herberekenen
+            from .dashboard import invalidate
+            from .saved_searches import schedule_rebuild
+
+            schedule_rebuild()
+            invalidate()
+        return created
+
+
 class Note(models.Model):
     """Korte notitie met titel, optionele tekst en aanmaakdatum."""
 
     title = models.CharField("titel", max_length=120, help_text="Korte titel")
-    body = models.TextField(
+    # grote bodies staan gecomprimeerd in NoteBody (zie notes.bodies)
+    body = SplitBodyField(
         "inhoud", blank=True, help_text="Vrije tekst (Markdown toegestaan)"
     )
     created_at = models.DateTimeField("aangemaakt op", auto_now_add=True)
@@ -37,10 +61,304 @@ class Note(models.Model):
     tags = models.ManyToManyField(
         "Tag", related_name="notes", blank=True, verbose_name="tags"
     )
+    body_external = models.BooleanField("body apart bewaard", default=False)
+
+    objects = NoteQuerySet.as_manager()
 
     class Meta:
         ordering = ["-created_at"]
+        indexes = [
+            # links oplossen op titel (notes.links)
+            models.Index(fields=["title"], name="notes_note_title_idx"),
+            # prefix-zoeken in de admin (NoteAdmin.get_search_results)
+            models.Index(Lower("title"), name="notes_note_title_lower_idx"),
+            # Meta.ordering: list_notes, saved searches, admin
+            models.Index(fields=["-created_at"], name="notes_note_created_idx"),
+            # public_list_notes; het prefix (-updated_at) dient ook de
+            # recentste notes op het dashboard
+            models.Index(
+                fields=["-updated_at", "-created_at", "title"],
+                name="notes_note_recent_idx",
+            ),
+        ]
 
     def __str__(self) -> str:  # pragma: no cover
         """Stringrepresentatie, getoond in admin/shell."""
         return self.title
+
+    def save(self, *args, **kwargs):
+        # niet geladen (deferred) = onbekend; dan voor de zekerheid opruimen
+        was_external = self.__dict__.get("body_external", True)
+        update_fields = kwargs.get("update_fields")
+        saves_body = "body" not in self.get_deferred_fields() and (
+            update_fields is None or "body" in update_fields
+        )
+        if saves_body:
+            mark_external([self])
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "body_external"}
+        super().save(*args, **kwargs)
+        if saves_body:
+            store_external([self], {self.pk: was_external})
+            store_plain_texts([self], memberships=True)
+
+
+class NoteBody(models.Model):
+    """Gecomprimeerde body van een grote Note (zie `notes.bodies`)."""
+
+    note = models.OneToOneField(
+        Note, on_delete=models.CASCADE, primary_key=True, related_name="body_blob"
+    )
+    codec = models.CharField("compressie", max_length=10, default="zlib")
+    data = models.BinaryField("gecomprimeerde inhoud")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"body van {self.note_id}"
+
+
+class NoteText(models.Model):
+    """
+    Platte tekst van de body (Markdown weggelaten), bijgewerkt na elke save
+    (job `notes.plain_text`).
+    Bron voor zoeksnippets (`notes.snippets`).
+    """
+
+    note = models.OneToOneField(
+        Note, on_delete=models.CASCADE, primary_key=True, related_name="plain_text"
+    )
+    text = models.TextField("platte tekst", blank=True)
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"tekst van {self.note_id}"
+
+
+def store_plain_texts(notes, memberships: bool = False) -> None:
+    """
+    Plan de platte tekst van de gegeven notes in (job `notes.plain_text`),
+    met `memberships` daarna ook hun saved searches.
+    """
+    # lazy: notes.jobs importeert dit models-bestand
+    from .jobs import enqueue
+
+    note_ids = [n.pk for n in notes]
+    if note_ids:
+        enqueue(
+            "notes.plain_text",
+            {"note_ids": note_ids, "memberships": memberships},
+            unique=True,
+        )
+
+
+class NoteLink(models.Model):
+    """
+    Wiki-link `[[titel]]` van de ene Note naar de andere (zie `notes.links`).
+    `target` is leeg zolang er geen note met `target_title` bestaat.
+    """
+
+    source = models.ForeignKey(
+        Note, on_delete=models.CASCADE, related_name="outgoing_links"
+    )
+    target = models.ForeignKey(
+        Note,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="backlinks",
+    )
+    target_title = models.CharField("doeltitel", max_length=120)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "target_title"], name="notes_link_unique_title"
+            ),
+        ]
+        indexes = [
+            # openstaande links oplossen wanneer een note met die titel verschijnt
+            models.Index(fields=["target_title"], name="notes_link_title_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.source_id} -> {self.target_title}"
+
+
+class RelatedNote(models.Model):
+    """
+    Voorberekende 'verwante notitie' op basis van gedeelde tags
+    (zie `notes.related`); per note de top-k, `rank` 1 = meest verwant.
+    """
+
+    note = models.ForeignKey(
+        Note, on_delete=models.CASCADE, related_name="related_entries"
+    )
+    related = models.ForeignKey(Note, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField("gelijkenis")
+    rank = models.PositiveSmallIntegerField("positie")
+
+    class Meta:
+        ordering = ["note", "rank"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["note", "rank"], name="notes_related_unique_rank"
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.note_id} ~ {self.related_id} ({self.score:.2f})"
+
+
+class SavedSearch(models.Model):
+    """
+    Vaste zoekopdracht zoals in `list_notes` (`?tag=...&q=...`) met een
+    gematerialiseerde lijst van notes die eraan voldoen (zie
+    `notes.saved_searches`).
+    """
+
+    name = models.CharField("naam", max_length=100)
+    slug = models.SlugField("slug", unique=True)
+    tag = models.CharField("tag", max_length=50, blank=True)
+    query = models.CharField(
+        "zoektermen",
+        max_length=200,
+        blank=True,
+        help_text="Alle woorden moeten in titel of inhoud voorkomen.",
+    )
+    notes = models.ManyToManyField(
+        Note,
+        through="SavedSearchMember",
+        related_name="saved_searches",
+        blank=True,
+    )
+    created_at = models.DateTimeField("aangemaakt op", auto_now_add=True)
+    updated_at = models.DateTimeField("laatst bijgewerkt op", auto_now=True)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name_plural = "saved searches"
+
+    def __str__(self) -> str:  # pragma: no cover
+        return self.name
+
+
+class SavedSearchMember(models.Model):
+    """Note die (nu) voldoet aan een SavedSearch."""
+
+    search = models.ForeignKey(
+        SavedSearch, on_delete=models.CASCADE, related_name="members"
+    )
+    note = models.ForeignKey(
+        Note, on_delete=models.CASCADE, related_name="saved_search_memberships"
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["search", "note"], name="notes_saved_search_unique_member"
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.search_id}: {self.note_id}"
+
+
+class NoteRevision(models.Model):
+    """
+    Eén versie van een Note (zie `notes.revisions`).
+    Om de zoveel versies een volledige snapshot van de body, daartussen
+    enkel een compacte delta t.o.v. de vorige versie.
+    """
+
+    note = models.ForeignKey(Note, on_delete=models.CASCADE, related_name="revisions")
+    version = models.PositiveIntegerField("versie")
+    title = models.CharField("titel", max_length=120)
+    is_snapshot = models.BooleanField("snapshot", default=False)
+    data = models.TextField("body of delta", blank=True)
+    created_at = models.DateTimeField("aangemaakt op", auto_now_add=True)
+
+    class Meta:
+        ordering = ["note", "version"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["note", "version"], name="notes_revision_unique_version"
+            ),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.note_id} v{self.version}"
+
+
+class Job(models.Model):
+    """
+    Achtergrondtaak in de database-queue (zie `notes.jobs`).
+    Wordt opgepikt door `manage.py run_worker`.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "in wachtrij"),
+        (RUNNING, "bezig"),
+        (DONE, "klaar"),
+        (FAILED, "mislukt"),
+    ]
+
+    name = models.CharField("taak", max_length=100)
+    payload = models.JSONField("parameters", default=dict, blank=True)
+    status = models.CharField(
+        "status", max_length=10, choices=STATUS_CHOICES, default=QUEUED
+    )
+    attempts = models.PositiveIntegerField("pogingen", default=0)
+    max_attempts = models.PositiveIntegerField("max. pogingen", default=3)
+    run_after = models.DateTimeField("niet voor", default=timezone.now)
+    locked_by = models.CharField("worker", max_length=100, blank=True)
+    locked_at = models.DateTimeField("opgepikt op", null=True, blank=True)
+    created_at = models.DateTimeField("aangemaakt op", auto_now_add=True)
+    started_at = models.DateTimeField("gestart op", null=True, blank=True)
+    finished_at = models.DateTimeField("klaar op", null=True, blank=True)
+    duration_ms = models.FloatField("duur (ms)", null=True, blank=True)
+    last_error = models.TextField("laatste fout", blank=True)
+
+    class Meta:
+        ordering = ["run_after", "pk"]
+        indexes = [
+            # polling: WHERE status = 'queued' AND run_after <= now
+            models.Index(fields=["status", "run_after"], name="notes_job_poll_idx"),
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class ApiKey(models.Model):
+    """
+    Sleutel voor de JSON API (header X-API-KEY), zie `notes.api_auth`.
+    Enkel de SHA-256 van de sleutel wordt bewaard; de sleutel zelf wordt
+    één keer getoond bij het aanmaken (`manage.py api_keys create`).
+    """
+
+    name = models.CharField("naam", max_length=100)
+    prefix = models.CharField("begin van de sleutel", max_length=12, editable=False)
+    key_hash = models.CharField(
+        "SHA-256 van de sleutel", max_length=64, unique=True, editable=False
+    )
+    rate = models.FloatField(
+        "requests per seconde",
+        null=True,
+        blank=True,
+        help_text="Leeg = NOTES_API_RATE.",
+    )
+    burst = models.PositiveIntegerField(
+        "burst", null=True, blank=True, help_text="Leeg = NOTES_API_BURST."
+    )
+    is_active = models.BooleanField("actief", default=True)
+    created_at = models.DateTimeField("aangemaakt op", auto_now_add=True)
+
+    class Meta:
+        ordering = ["name"]
+        verbose_name = "API-sleutel"
+        verbose_name_plural = "API-sleutels"
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.name} ({self.prefix}…)"
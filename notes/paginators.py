@@ -0,0 +1,95 @@
+"""
+notes.paginators
+================
+
+Paginator voor grote tabellen (gebruikt door `NoteAdmin`).
+
+Django's standaard `Paginator` doet bij elke pagina een volledige
+`COUNT(*)`. Bij grote tabellen is dat de duurste query van de admin.
+`EstimatedCountPaginator` gebruikt daarom:
+- op PostgreSQL zonder filters: `pg_class.reltuples` (schatting van de planner)
+- anders: een begrensde telling (`COUNT` over maximaal `count_cap` rijen)
+
+Is er meer dan de cap, dan geeft `count` de cap plus één pagina terug:
+de volgende pagina blijft zo bereikbaar. De admin geeft het gevraagde
+paginanummer mee (`page_hint`), zodat de telling meeschuift en verder
+bladeren voorbij de cap ook werkt.
+"""
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+DEFAULT_COUNT_CAP = 10_000
+
+
+def estimated_table_count(queryset: QuerySet):
+    """
+    Geef de geschatte rijcount van de tabel achter `queryset`, of None
+    als er geen (bruikbare) schatting is.
+
+    Alleen zinvol voor ongefilterde querysets op PostgreSQL.
+    """
+    if queryset.query.where:
+        return None
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+    # reltuples = -1 zolang de tabel nooit ge-ANALYZEd werd
+    if not row or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator die nooit een onbegrensde `COUNT(*)` uitvoert.
+
+    Kleine resultaten (onder `count_cap`) worden exact geteld; grotere
+    geven de schatting, of de grens plus één pagina terug.
+
+    Args:
+        count_cap: tel nooit verder dan dit aantal rijen
+        page_hint: de pagina die opgevraagd zal worden; de grens schuift
+            mee tot en met die pagina
+    """
+
+    def __init__(self, *args, count_cap=None, page_hint=1, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_cap = count_cap or getattr(
+            settings, "NOTES_ADMIN_COUNT_CAP", DEFAULT_COUNT_CAP
+        )
+        self.page_hint = page_hint
+
+    @property
+    def count_limit(self) -> int:
+        # een veelvoud van per_page: een rij voorbij de grens betekent dan
+        # dat de pagina na de grens minstens één rij heeft
+        per_page = max(int(self.per_page), 1)
+        pages = max(-(-self.count_cap // per_page), self.page_hint)
+        return pages * per_page
+
+    @cached_property
+    def count(self) -> int:
+        qs = self.object_list
+        if not isinstance(qs, QuerySet):
+            return super().count
+
+        limit = self.count_limit
+        estimate = estimated_table_count(qs)
+        if estimate is not None and estimate > limit:
+            return estimate
+
+        # begrensde telling: SELECT COUNT(*) FROM (... LIMIT grens + 1)
+        counted = qs.order_by()[: limit + 1].count()
+        if counted > limit:
+            return limit + int(self.per_page)
+        return counted
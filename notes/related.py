@@ -0,0 +1,64 @@
+"""
+notes.related
+=============
+
+Verwante notities (gedeelde tags) inplannen en uitlezen.
+
+De berekening zelf (numpy/scipy) staat in `notes.similarity` en draait
+als job in de worker. Deze module blijft licht, zodat webprocessen enkel
+jobs inplannen en de voorberekende `RelatedNote`-rijen lezen:
+
+- `schedule_refresh(note_ids)`: na een tagwijziging, na commit
+- `schedule_refresh()`: alles opnieuw (bv. na tags samenvoegen)
+- `related_for(note)`: één geïndexeerde query voor de detailpagina
+
+Een tagwijziging herberekent enkel de gewijzigde notes en de notes die
+ze nu tonen (`affected_notes`). Notes waar een gewijzigde note nieuw in
+de top-k zou komen, volgen pas bij `related.rebuild`
+(`manage.py related_notes`).
+
+Wordt een note verwijderd, dan verdwijnt ze via de cascade uit de lijsten
+van andere notes; die tonen dan tijdelijk één verwante note minder.
+"""
+
+from typing import Iterable, List, Optional
+
+from django.db import transaction
+
+from .jobs import enqueue
+from .models import Note, RelatedNote
+
+NoteTag = Note.tags.through
+
+
+def affected_notes(note_ids: Iterable[int]) -> List[int]:
+    """
+    Notes die herberekend worden als de tags van `note_ids` veranderen:
+    de notes zelf en de notes die ze nu als verwant tonen (hun score is
+    mogelijk niet meer juist).
+    """
+    note_ids = list(note_ids)
+    showing = RelatedNote.objects.filter(related_id__in=note_ids).values_list(
+        "note_id", flat=True
+    )
+    return sorted(set(note_ids) | set(showing))
+
+
+def schedule_refresh(note_ids: Optional[Iterable[int]] = None) -> None:
+    """Plan een herberekening in zodra de huidige transactie gecommit is."""
+    if note_ids is None:
+        transaction.on_commit(lambda: enqueue("related.rebuild", unique=True))
+        return
+    payload = {"note_ids": sorted(set(note_ids))}
+    if payload["note_ids"]:
+        transaction.on_commit(lambda: enqueue("related.refresh", payload, unique=True))
+
+
+def related_for(note: Note):
+    """Verwante notes voor de detailpagina, meest verwant eerst."""
+    return (
+        RelatedNote.objects.filter(note_id=note.pk)
+        .select_related("related")
+        .only("score", "rank", "related__title")
+        .order_by("rank")
+    )
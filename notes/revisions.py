@@ -0,0 +1,180 @@
+"""
+notes.revisions
+===============
+
+Compacte versiegeschiedenis voor notities.
+
+Bij elke save van een Note (zie `notes.signals`) komt er een
+`NoteRevision` bij. Om geen volledige kopie per edit te bewaren:
+- versie 1, 1 + N, 1 + 2N, ... zijn snapshots (volledige body)
+- alle andere versies bewaren een regel-delta t.o.v. de vorige versie
+
+Een versie terugbouwen = de dichtstbijzijnde snapshot ervoor nemen en
+maximaal N - 1 delta's toepassen; dat is één query.
+
+Voor de delta van een nieuwe versie is de body van de vorige nodig. Die
+staat na elke versie in de gedeelde cache (met het versienummer erbij),
+zodat een save geen delta's moet terugspelen; enkel na een cache-miss
+(of als de cache nog bij een oudere versie hoort) wordt ze teruggebouwd.
+
+Deltaformaat (JSON-lijst, gebaseerd op `difflib.SequenceMatcher`):
+    5           -> neem 5 regels over uit de vorige versie
+    -2          -> sla 2 regels van de vorige versie over
+    ["x\\n"]    -> voeg deze regels in
+"""
+
+import json
+from difflib import SequenceMatcher
+from typing import Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Max
+
+from .models import Note, NoteRevision
+
+DEFAULT_SNAPSHOT_EVERY = 20
+ATTEMPTS = 3
+# body van de laatste versie per note (zie `_previous`)
+CACHE_SECONDS = 24 * 3600
+
+
+def snapshot_every() -> int:
+    return max(
+        1, getattr(settings, "NOTES_REVISION_SNAPSHOT_EVERY", DEFAULT_SNAPSHOT_EVERY)
+    )
+
+
+def is_snapshot_version(version: int, every: Optional[int] = None) -> bool:
+    return (version - 1) % (every or snapshot_every()) == 0
+
+
+def make_delta(old: str, new: str) -> str:
+    """Bereken de delta die `old` omzet in `new`."""
+    a, b = old.splitlines(keepends=True), new.splitlines(keepends=True)
+    matcher = SequenceMatcher(None, a, b, autojunk=False)
+    ops = []
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(i2 - i1)
+            continue
+        if i2 > i1:
+            ops.append(-(i2 - i1))
+        if j2 > j1:
+            ops.append(b[j1:j2])
+    return json.dumps(ops, ensure_ascii=False, separators=(",", ":"))
+
+
+def apply_delta(old: str, delta: str) -> str:
+    """Pas een delta van `make_delta` toe op `old`."""
+    lines = old.splitlines(keepends=True)
+    out, pos = [], 0
+    for op in json.loads(delta):
+        if isinstance(op, list):
+            out.extend(op)
+        elif op >= 0:
+            out.extend(lines[pos : pos + op])
+            pos += op
+        else:
+            pos -= op
+    return "".join(out)
+
+
+def body_at(note_id: int, version: int) -> Optional[str]:
+    """Bouw de body van `version` terug (None als die versie niet bestaat)."""
+    revisions = NoteRevision.objects.filter(note_id=note_id)
+    last_snapshot = revisions.filter(is_snapshot=True, version__lte=version).aggregate(
+        v=Max("version")
+    )["v"]
+    if last_snapshot is None:
+        return None
+
+    body = None
+    rows = revisions.filter(version__gte=last_snapshot, version__lte=version).order_by(
+        "version"
+    )
+    for is_snapshot, data in rows.values_list("is_snapshot", "data"):
+        body = data if is_snapshot else apply_delta(body, data)
+    return body
+
+
+def latest_version(note_id: int) -> int:
+    return (
+        NoteRevision.objects.filter(note_id=note_id).aggregate(v=Max("version"))["v"]
+        or 0
+    )
+
+
+def _cache_key(note_id: int) -> str:
+    return f"notes:revisions:last:{note_id}"
+
+
+def _previous(note_id: int) -> Optional[Tuple[int, str, str]]:
+    """
+    (versie, titel, body) van de laatste versie, of None.
+    De body komt uit de cache als die bij de laatste versie hoort; anders
+    teruggebouwd vanaf de laatste snapshot.
+    """
+    last = (
+        NoteRevision.objects.filter(note_id=note_id)
+        .order_by("-version")
+        .values_list("version", "title")
+        .first()
+    )
+    if last is None:
+        return None
+    version, title = last
+    cached = cache.get(_cache_key(note_id))
+    if cached is not None and cached[0] == version:
+        return version, title, cached[1]
+    return version, title, body_at(note_id, version)
+
+
+def _record(note: Note) -> Optional[NoteRevision]:
+    body = note.body or ""
+    previous = _previous(note.pk)
+    if previous is not None:
+        last_version, last_title, last_body = previous
+        if last_title == note.title and last_body == body:
+            return None
+        version = last_version + 1
+    else:
+        version = 1
+
+    if previous is None or is_snapshot_version(version):
+        data, snapshot = body, True
+    else:
+        data, snapshot = make_delta(last_body, body), False
+
+    revision = NoteRevision.objects.create(
+        note_id=note.pk,
+        version=version,
+        title=note.title,
+        is_snapshot=snapshot,
+        data=data,
+    )
+    # pas na commit: een teruggedraaide versie mag nooit in de cache staan
+    transaction.on_commit(
+        lambda: cache.set(_cache_key(note.pk), (version, body), CACHE_SECONDS)
+    )
+    return revision
+
+
+def record_revision(note: Note) -> Optional[NoteRevision]:
+    """
+    Bewaar de huidige staat van `note` als nieuwe versie.
+    Doet niets als titel en body niet veranderd zijn.
+
+    Twee gelijktijdige saves kunnen hetzelfde versienummer kiezen; de
+    tweede botst op `notes_revision_unique_version` en probeert het
+    opnieuw (tot `ATTEMPTS` keer) met de dan laatste versie.
+    """
+    for attempt in range(ATTEMPTS):
+        try:
+            with transaction.atomic():
+                return _record(note)
+        except IntegrityError:
+            if attempt == ATTEMPTS - 1:
+                raise
+    return None
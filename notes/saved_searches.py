@@ -0,0 +1,184 @@
+"""
+notes.saved_searches
+====================
+
+Gematerialiseerde zoekopdrachten (`SavedSearch`).
+
+Een saved search is een vaste filter zoals in `list_notes`, met dezelfde
+betekenis als `?tag=...&q=...` daar:
+- `tag`:   de note heeft deze tag (hoofdletterongevoelig)
+- `query`: de hele zoekterm komt voor in de titel of de platte tekst
+  (`NoteText`), zoals `notes.search.text_filter` / `text_matches`
+
+Welke notes eraan voldoen staat in `SavedSearchMember`; een dashboard
+leest dat als gewone geïndexeerde join (`SavedSearch.notes`).
+
+Bijwerken zonder de queries opnieuw te draaien:
+- de definities worden één keer per proces geladen en gecompileerd tot
+  een Python-predicaat (`compile_predicate`)
+- na elke save of tagwijziging van een Note (zie `notes.signals`) wordt
+  enkel die note tegen alle predicaten gehouden en het verschil met de
+  bewaarde lidmaatschappen weggeschreven (`update_memberships`, job
+  `saved_searches.note`); na een nieuwe body nog eens zodra de platte
+  tekst bewaard is (job `notes.plain_text`)
+- bij een nieuwe/gewijzigde saved search of na bulkbewerkingen (die geen
+  signals sturen) wordt alles in één doorloop herberekend (`rebuild`,
+  job `saved_searches.rebuild`)
+
+De definities worden lokaal gecachet; na een wijziging in een ander
+proces duurt het hoogstens `NOTES_SAVED_SEARCH_RELOAD_SECONDS` (30 s)
+voor elk proces ze opnieuw laadt.
+"""
+
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Prefetch
+
+from . import dashboard
+from .jobs import enqueue
+from .models import Note, NoteText, SavedSearch, SavedSearchMember, Tag
+from .search import text_matches
+
+DEFAULT_RELOAD_SECONDS = 30.0
+
+Predicate = Callable[[str, str, Set[str]], bool]
+
+_definitions: Optional[List[Tuple[int, Predicate, bool]]] = None
+_loaded_at = 0.0
+_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def compile_predicate(tag: str, query: str) -> Predicate:
+    """
+    Predicaat `(titel, platte tekst, tagnamen) -> bool` voor een saved
+    search. Verwacht alles al in lowercase (één keer per note, niet per
+    search).
+    """
+    tag, query = tag.lower(), query.lower()
+
+    def predicate(title: str, text: str, tag_names: Set[str]) -> bool:
+        if tag and tag not in tag_names:
+            return False
+        return not query or text_matches(query, title, text)
+
+    return predicate
+
+
+def definitions() -> List[Tuple[int, Predicate, bool]]:
+    """[(search-id, predicaat, heeft tagfilter)], lokaal gecachet."""
+    global _definitions, _loaded_at
+    interval = getattr(
+        settings, "NOTES_SAVED_SEARCH_RELOAD_SECONDS", DEFAULT_RELOAD_SECONDS
+    )
+    if _definitions is None or time.monotonic() - _loaded_at > interval:
+        with _lock:
+            _definitions = [
+                (pk, compile_predicate(tag, query), bool(tag))
+                for pk, tag, query in SavedSearch.objects.values_list(
+                    "pk", "tag", "query"
+                )
+            ]
+            _loaded_at = time.monotonic()
+    return _definitions
+
+
+def forget_definitions() -> None:
+    """Laad de definities opnieuw bij het volgende gebruik."""
+    global _definitions
+    _definitions = None
+
+
+def update_memberships(note: Note) -> None:
+    """Houd één note tegen alle saved searches en bewaar het verschil."""
+    searches = definitions()
+    if not searches:
+        return
+
+    tag_names: Set[str] = set()
+    if any(has_tag for _pk, _p, has_tag in searches):
+        tag_names = {name.lower() for name in note.tags.values_list("name", flat=True)}
+    text = NoteText.objects.filter(note_id=note.pk).values_list("text", flat=True)
+    title, text = (note.title or "").lower(), (text.first() or "").lower()
+    wanted = {pk for pk, predicate, _t in searches if predicate(title, text, tag_names)}
+
+    current = set(
+        SavedSearchMember.objects.filter(note_id=note.pk).values_list(
+            "search_id", flat=True
+        )
+    )
+    if wanted == current:
+        return
+    with transaction.atomic():
+        if current - wanted:
+            SavedSearchMember.objects.filter(
+                note_id=note.pk, search_id__in=current - wanted
+            ).delete()
+        if wanted - current:
+            SavedSearchMember.objects.bulk_create(
+                [
+                    SavedSearchMember(search_id=pk, note_id=note.pk)
+                    for pk in wanted - current
+                ],
+                ignore_conflicts=True,
+            )
+
+
+def rebuild(search_ids: Optional[Iterable[int]] = None, chunk_size: int = 1000) -> int:
+    """
+    Herbereken de leden van de gegeven saved searches (None = alle) in één
+    doorloop over alle notes. Geeft het aantal lidmaatschappen terug.
+    """
+    searches = SavedSearch.objects.all()
+    if search_ids is not None:
+        searches = searches.filter(pk__in=list(search_ids))
+    compiled = [
+        (s.pk, compile_predicate(s.tag, s.query)) for s in searches.only("tag", "query")
+    ]
+    if not compiled:
+        return 0
+
+    notes = (
+        Note.objects.order_by("pk")
+        .defer("body")
+        .annotate(text=F("plain_text__text"))
+        .prefetch_related(Prefetch("tags", queryset=Tag.objects.only("name")))
+    )
+    total = 0
+    with transaction.atomic():
+        SavedSearchMember.objects.filter(
+            search_id__in=[pk for pk, _ in compiled]
+        ).delete()
+        batch: List[SavedSearchMember] = []
+        for note in notes.iterator(chunk_size=chunk_size):
+            tag_names = {t.name.lower() for t in note.tags.all()}
+            title, text = (note.title or "").lower(), (note.text or "").lower()
+            batch.extend(
+                SavedSearchMember(search_id=pk, note_id=note.pk)
+                for pk, predicate in compiled
+                if predicate(title, text, tag_names)
+            )
+            if len(batch) >= chunk_size:
+                SavedSearchMember.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        SavedSearchMember.objects.bulk_create(batch)
+        total += len(batch)
+    # aantallen op het dashboard
+    dashboard.invalidate()
+    return total
+
+
+def schedule_rebuild(search_ids: Optional[Iterable[int]] = None) -> None:
+    """Plan `rebuild` in als job zodra de huidige transactie gecommit is."""
+    if search_ids is None and not definitions():
+        return
+    payload = {"search_ids": sorted(search_ids) if search_ids is not None else None}
+    transaction.on_commit(
+        lambda: enqueue("saved_searches.rebuild", payload, unique=True)
+    )
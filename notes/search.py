@@ -0,0 +1,638 @@
+"""
+notes.search
+============
+
+In-memory BM25-zoekmachine voor notities (titel + platte tekst).
+
+Opbouw van de index:
+- tokens = woorden (`\\w+`, lowercase) uit de titel en de platte tekst
+  van de body (Markdown weggelaten, zoals in `NoteText`); een titelwoord
+  telt `NOTES_SEARCH_TITLE_WEIGHT` keer (standaard 3) mee, zowel voor de
+  termfrequentie als voor de documentlengte (BM25F-light)
+- basissegment: een omgekeerde index in compacte arrays (CSR-vorm):
+  `offsets[term]..offsets[term+1]` wijst in `postings_doc` (int32) en
+  `postings_tf` (float32); wordt met `np.load(mmap_mode="r")` van schijf
+  geladen, dus een worker start zonder alles te parsen
+- wijzigingen (save/delete, zie `notes.signals`) komen in een kleine
+  delta in dicts; oude versies in het basissegment krijgen een tombstone.
+  Een save markeert de note enkel (`mark_dirty`); het tokenizen gebeurt
+  pas vóór de volgende zoekopdracht in dit proces, niet in de save.
+  Wordt de delta te groot, dan wordt alles terug samengevoegd (`compact`)
+
+Rangschikken: per zoekterm één slice uit de postings, gevectoriseerd
+scoren met NumPy en de top-k via `np.argpartition`.
+
+De lijst en de API (`search_notes`) tonen dezelfde notes als de
+"db"-backend: de hele zoekterm als substring van titel of platte tekst
+(ook "koff" vindt "koffie"; "koffie kopen" enkel notes met precies die
+woorden na elkaar), zonder maximum. Welke notes dat zijn, haalt de index
+op zonder LIKE-scan:
+- één woord (de gewone zoekopdracht): exact uit de index, alle notes met
+  een term waarin het woord voorkomt; de vocabulaire wordt daarvoor met
+  één regex doorzocht (`Segment.terms_containing`)
+- meerdere woorden of leestekens: de index geeft de notes met alle
+  woorden (een superset) en de database kijkt de substring enkel op die
+  rijen na, via de primaire sleutel; is meer dan de helft van de notes
+  kandidaat, dan blijft het de LIKE-scan over alles (die is dan even
+  duur en het resultaat is hetzelfde)
+- een zoekterm zonder woorden ("++"): gewoon de LIKE-filter over alles
+De note-id's gaan als één parameter naar de database (`pk_filter`), dus
+ook duizenden treffers zijn één query. Metingen van dit pad, naast de
+"db"-backend: `benchmarks/search.py --db-notes`.
+
+Elk proces heeft zijn eigen index (`get_engine()`); wijzigingen uit andere
+processen worden om de `NOTES_SEARCH_SYNC_SECONDS` ingehaald via
+`updated_at` en het aantal notes (`SearchEngine.sync`).
+
+Instellingen:
+- `NOTES_SEARCH_BACKEND`: "bm25" (standaard) of "db" (icontains-filter
+  op titel en `NoteText`, zie `text_filter`)
+- `NOTES_SEARCH_INDEX_DIR`: map voor de index op schijf (None = enkel in
+  geheugen); opbouwen met `manage.py build_search_index`
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
+
+# numpy is optioneel (zonder valt het zoeken terug op de database) en wordt
+# pas geladen wanneer de index nodig is: deze module hangt via de signals
+# aan elke `django.setup()`, ook in processen die nooit zoeken
+np = None
+
+K1 = 1.2
+B = 0.75
+DEFAULT_TITLE_WEIGHT = 3.0
+DEFAULT_SYNC_SECONDS = 5.0
+# in meta.json; een index in een ander formaat wordt opnieuw opgebouwd
+INDEX_FORMAT = 2
+
+_token = re.compile(r"\w+")
+
+ARRAYS = ("offsets", "postings_doc", "postings_tf", "doc_ids", "doc_len")
+
+
+def tokenize(text: str) -> List[str]:
+    return _token.findall((text or "").lower())
+
+
+def title_weight() -> float:
+    return getattr(settings, "NOTES_SEARCH_TITLE_WEIGHT", DEFAULT_TITLE_WEIGHT)
+
+
+def load_numpy():
+    """Importeer numpy bij het eerste gebruik; None als het ontbreekt."""
+    global np
+    if np is None:
+        try:
+            import numpy
+        except ImportError:  # pragma: no cover - afhankelijk van de omgeving
+            return None
+        np = numpy
+    return np
+
+
+def backend() -> str:
+    if load_numpy() is None:
+        return "db"
+    return getattr(settings, "NOTES_SEARCH_BACKEND", "bm25")
+
+
+def document(title: str, text: str) -> Tuple[Counter, float]:
+    """Gewogen termfrequenties en lengte van één note (platte tekst)."""
+    weight = title_weight()
+    title_terms = tokenize(title)
+    body_terms = tokenize(text)
+    tf = Counter(body_terms)
+    for term in title_terms:
+        tf[term] += weight
+    return tf, len(body_terms) + weight * len(title_terms)
+
+
+class Segment:
+    """Onveranderlijke omgekeerde index in arrays (CSR per term)."""
+
+    def __init__(self, vocab: List[str], arrays: Dict[str, "np.ndarray"]):
+        self.vocab = vocab
+        self.term_ids = {term: i for i, term in enumerate(vocab)}
+        # voor `terms_containing`, pas bij de eerste zoekopdracht
+        self._vocab_text = None
+        self._vocab_starts = None
+        for name in ARRAYS:
+            setattr(self, name, arrays[name])
+
+    @classmethod
+    def empty(cls) -> "Segment":
+        load_numpy()
+        return cls(
+            [],
+            {
+                "offsets": np.zeros(1, dtype=np.int64),
+                "postings_doc": np.zeros(0, dtype=np.int32),
+                "postings_tf": np.zeros(0, dtype=np.float32),
+                "doc_ids": np.zeros(0, dtype=np.int64),
+                "doc_len": np.zeros(0, dtype=np.float32),
+            },
+        )
+
+    @classmethod
+    def build(cls, docs: Iterable[Tuple[int, Counter, float]]) -> "Segment":
+        """Bouw een segment uit (pk, termfrequenties, lengte)-tuples."""
+        load_numpy()
+        term_ids: Dict[str, int] = {}
+        terms, doc_idx, tfs, doc_ids, doc_len = [], [], [], [], []
+        for n, (pk, tf, length) in enumerate(docs):
+            doc_ids.append(pk)
+            doc_len.append(length)
+            for term, count in tf.items():
+                terms.append(term_ids.setdefault(term, len(term_ids)))
+                doc_idx.append(n)
+                tfs.append(count)
+
+        terms = np.asarray(terms, dtype=np.int64)
+        order = np.argsort(terms, kind="stable")
+        counts = np.bincount(terms, minlength=len(term_ids))
+        offsets = np.zeros(len(term_ids) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        vocab = [None] * len(term_ids)
+        for term, i in term_ids.items():
+            vocab[i] = term
+        return cls(
+            vocab,
+            {
+                "offsets": offsets,
+                "postings_doc": np.asarray(doc_idx, dtype=np.int32)[order],
+                "postings_tf": np.asarray(tfs, dtype=np.float32)[order],
+                "doc_ids": np.asarray(doc_ids, dtype=np.int64),
+                "doc_len": np.asarray(doc_len, dtype=np.float32),
+            },
+        )
+
+    def postings(self, term: str):
+        i = self.term_ids.get(term)
+        if i is None:
+            return None
+        start, end = self.offsets[i], self.offsets[i + 1]
+        return self.postings_doc[start:end], self.postings_tf[start:end]
+
+    def terms_containing(self, word: str) -> "np.ndarray":
+        """Term-id's waarin `word` voorkomt (één regex over de vocabulaire)."""
+        if self._vocab_text is None:
+            lengths = np.fromiter(
+                (len(term) + 1 for term in self.vocab), np.int64, len(self.vocab)
+            )
+            self._vocab_starts = np.cumsum(lengths) - lengths
+            self._vocab_text = "\n".join(self.vocab)
+        hits = [m.start() for m in re.finditer(re.escape(word), self._vocab_text)]
+        return np.unique(np.searchsorted(self._vocab_starts, hits, side="right") - 1)
+
+    def save(self, path: Path, meta: dict) -> None:
+        path.mkdir(parents=True, exist_ok=True)
+        for name in ARRAYS:
+            tmp = path / f"{name}.tmp.npy"
+            np.save(tmp, getattr(self, name))
+            os.replace(tmp, path / f"{name}.npy")
+        tmp = path / "vocab.tmp.json"
+        tmp.write_text(json.dumps(self.vocab, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path / "vocab.json")
+        # meta als laatste: zonder meta.json geldt de index als onvolledig
+        tmp = path / "meta.tmp.json"
+        tmp.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp, path / "meta.json")
+
+    @classmethod
+    def load(cls, path: Path) -> Tuple["Segment", dict]:
+        load_numpy()
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        vocab = json.loads((path / "vocab.json").read_text(encoding="utf-8"))
+        arrays = {name: np.load(path / f"{name}.npy", mmap_mode="r") for name in ARRAYS}
+        return cls(vocab, arrays), meta
+
+
+class SearchEngine:
+    """Basissegment + delta voor recente wijzigingen."""
+
+    def __init__(self, segment: Optional[Segment] = None):
+        self._lock = threading.RLock()
+        self.dirty: set = set()
+        self.synced_at: Optional[datetime] = None
+        self._last_sync = 0.0
+        self._reset(segment or Segment.empty())
+
+    def _reset(self, segment: Segment) -> None:
+        self.base = segment
+        self.alive = np.ones(len(segment.doc_ids), dtype=bool)
+        self.base_pos = {int(pk): i for i, pk in enumerate(segment.doc_ids)}
+        self.delta: Dict[int, Tuple[Counter, float]] = {}
+        self.delta_postings: Dict[str, Dict[int, float]] = {}
+        self.doc_count = len(segment.doc_ids)
+        self.total_len = float(np.sum(segment.doc_len, dtype=np.float64))
+
+    # -- opbouwen ---------------------------------------------------------
+
+    @classmethod
+    def from_database(cls, chunk_size: int = 2000) -> "SearchEngine":
+        from .models import Note
+
+        started = timezone.now()
+        # de bewaarde platte tekst; enkel zonder NoteText wordt gerenderd
+        notes = (
+            Note.objects.order_by("pk")
+            .select_related("body_blob")
+            .annotate(text=F("plain_text__text"))
+        )
+        segment = Segment.build(
+            (note.pk, *document(note.title, _text(note)))
+            for note in notes.iterator(chunk_size=chunk_size)
+        )
+        engine = cls(segment)
+        engine.synced_at = started
+        engine._last_sync = time.monotonic()
+        return engine
+
+    @classmethod
+    def load(cls, path: Path) -> Optional["SearchEngine"]:
+        """De index in `path`, of None als die in een ander formaat is."""
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        if meta.get("format") != INDEX_FORMAT:
+            return None
+        segment, meta = Segment.load(path)
+        engine = cls(segment)
+        engine.synced_at = datetime.fromisoformat(meta["synced_at"])
+        return engine
+
+    def save(self, path: Path) -> None:
+        with self._lock:
+            self.compact()
+            self.base.save(
+                Path(path),
+                {"synced_at": self.synced_at.isoformat(), "format": INDEX_FORMAT},
+            )
+
+    def compact(self) -> None:
+        """Voeg de delta samen met het basissegment (tombstones vallen weg)."""
+        with self._lock:
+            if not self.delta and self.alive.all():
+                return
+            base = self.base
+            keep = np.flatnonzero(self.alive)
+            remap = np.full(len(base.doc_ids), -1, dtype=np.int64)
+            remap[keep] = np.arange(len(keep))
+
+            term_of = np.repeat(
+                np.arange(len(base.vocab), dtype=np.int64), np.diff(base.offsets)
+            )
+            live = self.alive[base.postings_doc]
+            vocab = list(base.vocab)
+            term_ids = dict(base.term_ids)
+            terms = [term_of[live]]
+            docs = [remap[base.postings_doc[live]]]
+            tfs = [np.asarray(base.postings_tf[live], dtype=np.float32)]
+
+            delta_pks = sorted(self.delta)
+            extra_terms, extra_docs, extra_tfs = [], [], []
+            for n, pk in enumerate(delta_pks, start=len(keep)):
+                for term, count in self.delta[pk][0].items():
+                    if term not in term_ids:
+                        term_ids[term] = len(vocab)
+                        vocab.append(term)
+                    extra_terms.append(term_ids[term])
+                    extra_docs.append(n)
+                    extra_tfs.append(count)
+            terms.append(np.asarray(extra_terms, dtype=np.int64))
+            docs.append(np.asarray(extra_docs, dtype=np.int64))
+            tfs.append(np.asarray(extra_tfs, dtype=np.float32))
+
+            terms = np.concatenate(terms)
+            order = np.argsort(terms, kind="stable")
+            offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+            np.cumsum(np.bincount(terms, minlength=len(vocab)), out=offsets[1:])
+            segment = Segment(
+                vocab,
+                {
+                    "offsets": offsets,
+                    "postings_doc": np.concatenate(docs)[order].astype(np.int32),
+                    "postings_tf": np.concatenate(tfs)[order],
+                    "doc_ids": np.concatenate(
+                        [base.doc_ids[keep], np.asarray(delta_pks, dtype=np.int64)]
+                    ),
+                    "doc_len": np.concatenate(
+                        [
+                            base.doc_len[keep],
+                            np.asarray(
+                                [self.delta[pk][1] for pk in delta_pks],
+                                dtype=np.float32,
+                            ),
+                        ]
+                    ),
+                },
+            )
+            self._reset(segment)
+
+    # -- wijzigingen ------------------------------------------------------
+
+    def remove(self, pk: int) -> None:
+        with self._lock:
+            old = self.delta.pop(pk, None)
+            if old is not None:
+                for term in old[0]:
+                    postings = self.delta_postings.get(term)
+                    if postings is not None:
+                        postings.pop(pk, None)
+                        if not postings:
+                            del self.delta_postings[term]
+                self.doc_count -= 1
+                self.total_len -= old[1]
+            pos = self.base_pos.get(pk)
+            if pos is not None and self.alive[pos]:
+                self.alive[pos] = False
+                self.doc_count -= 1
+                self.total_len -= float(self.base.doc_len[pos])
+
+    def remove_many(self, pks: Iterable[int]) -> None:
+        with self._lock:
+            for pk in pks:
+                self.remove(pk)
+
+    def update(self, pk: int, title: str, text: str) -> None:
+        tf, length = document(title, text)
+        with self._lock:
+            self.remove(pk)
+            self.delta[pk] = (tf, length)
+            for term, count in tf.items():
+                self.delta_postings.setdefault(term, {})[pk] = count
+            self.doc_count += 1
+            self.total_len += length
+            if len(self.delta) > max(1000, len(self.base.doc_ids) // 10):
+                self.compact()
+
+    def mark_dirty(self, pks: Iterable[int]) -> None:
+        """Indexeer deze notes opnieuw vóór de volgende zoekopdracht."""
+        with self._lock:
+            self.dirty.update(pks)
+
+    def refresh_dirty(self) -> None:
+        """Werk de notes uit `mark_dirty` bij (één query)."""
+        from .models import Note
+
+        with self._lock:
+            pks, self.dirty = self.dirty, set()
+            if not pks:
+                return
+            found = set()
+            notes = Note.objects.select_related("body_blob").filter(pk__in=pks)
+            for note in notes.iterator():
+                self.update(note.pk, note.title, _text(note))
+                found.add(note.pk)
+            self.remove_many(pks - found)
+
+    def indexed_ids(self) -> set:
+        with self._lock:
+            ids = set(self.base.doc_ids[self.alive].tolist())
+            return ids | set(self.delta)
+
+    def sync(self) -> None:
+        """Haal wijzigingen uit andere processen in (via updated_at en aantallen)."""
+        from .models import Note
+
+        with self._lock:
+            started = timezone.now()
+            notes = Note.objects.select_related("body_blob")
+            if self.synced_at is not None:
+                for note in notes.filter(updated_at__gte=self.synced_at).iterator():
+                    self.update(note.pk, note.title, _text(note))
+
+            if Note.objects.count() != self.doc_count:
+                db_ids = set(Note.objects.values_list("pk", flat=True))
+                indexed = self.indexed_ids()
+                for pk in indexed - db_ids:
+                    self.remove(pk)
+                missing = db_ids - indexed
+                for note in notes.filter(pk__in=missing).iterator():
+                    self.update(note.pk, note.title, _text(note))
+
+            self.synced_at = started
+            self._last_sync = time.monotonic()
+
+    def maybe_sync(self) -> None:
+        self.refresh_dirty()
+        interval = getattr(settings, "NOTES_SEARCH_SYNC_SECONDS", DEFAULT_SYNC_SECONDS)
+        if time.monotonic() - self._last_sync >= interval:
+            self.sync()
+
+    # -- zoeken -----------------------------------------------------------
+
+    def _containing(self, word: str) -> Tuple["np.ndarray", set]:
+        """
+        Notes met een term waarin `word` voorkomt ("koff" -> "koffie"): een
+        masker over het basissegment en de pk's uit de delta.
+        """
+        base = self.base
+        term_ids = base.terms_containing(word)
+        starts = base.offsets[term_ids]
+        lengths = base.offsets[term_ids + 1] - starts
+        # alle postings-slices samen als één indexarray
+        idx = np.arange(lengths.sum()) + np.repeat(
+            starts - (np.cumsum(lengths) - lengths), lengths
+        )
+        mask = np.zeros(len(base.doc_ids), dtype=bool)
+        mask[base.postings_doc[idx]] = True
+        delta = set()
+        for term in [t for t in self.delta_postings if word in t]:
+            delta.update(self.delta_postings[term])
+        return mask, delta
+
+    def candidates(self, query: str) -> Optional[set]:
+        """
+        Note-id's die `query` als substring kunnen bevatten: de notes die
+        elk zoekwoord in een term hebben. Een superset van de treffers van
+        `text_filter`, exact voor één woord; None als `query` geen woorden
+        heeft.
+        """
+        words = list(dict.fromkeys(tokenize(query)))
+        if not words:
+            return None
+        with self._lock:
+            mask, delta = self._containing(words[0])
+            for word in words[1:]:
+                if not (mask.any() or delta):
+                    break
+                more_mask, more_delta = self._containing(word)
+                mask &= more_mask
+                delta &= more_delta
+            mask &= self.alive
+            return set(self.base.doc_ids[mask].tolist()) | delta
+
+    def search(self, query: str, k: int = 10) -> List[Tuple[int, float]]:
+        """Top-k (pk, score), beste eerst; bij gelijke score de nieuwste pk."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or k <= 0:
+            return []
+
+        with self._lock:
+            n = max(self.doc_count, 1)
+            avgdl = (self.total_len / n) or 1.0
+            base = self.base
+            scores = np.zeros(len(base.doc_ids), dtype=np.float32)
+            delta_scores: Dict[int, float] = {}
+
+            for term in terms:
+                found = base.postings(term)
+                if found is not None:
+                    docs, tf = found
+                    live = self.alive[docs]
+                    docs, tf = docs[live], tf[live]
+                else:
+                    docs = tf = None
+                extra = self.delta_postings.get(term, {})
+                df = (0 if docs is None else len(docs)) + len(extra)
+                if not df:
+                    continue
+                idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+
+                if docs is not None and len(docs):
+                    norm = K1 * (1 - B + B * base.doc_len[docs] / avgdl)
+                    scores[docs] += idf * tf * (K1 + 1) / (tf + norm)
+                for pk, count in extra.items():
+                    norm = K1 * (1 - B + B * self.delta[pk][1] / avgdl)
+                    delta_scores[pk] = delta_scores.get(pk, 0.0) + idf * count * (
+                        K1 + 1
+                    ) / (count + norm)
+
+            hits = np.flatnonzero(scores)
+            if len(hits) > k:
+                hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+            n_delta = len(delta_scores)
+            pks = np.concatenate(
+                [base.doc_ids[hits], np.fromiter(delta_scores, np.int64, n_delta)]
+            )
+            values = np.concatenate(
+                [
+                    scores[hits].astype(np.float64),
+                    np.fromiter(delta_scores.values(), np.float64, n_delta),
+                ]
+            )
+
+        # gevectoriseerd sorteren: `search_notes` vraagt alle kandidaten op
+        order = np.lexsort((-pks, -values))[:k]
+        return list(zip(pks[order].tolist(), values[order].tolist()))
+
+
+_engine: Optional[SearchEngine] = None
+_engine_lock = threading.Lock()
+
+
+def index_dir() -> Optional[Path]:
+    path = getattr(settings, "NOTES_SEARCH_INDEX_DIR", None)
+    return Path(path) if path else None
+
+
+def _text(note) -> str:
+    """Platte tekst van een note: geannoteerd (`text`) of gerenderd."""
+    from .snippets import plain_text  # lazy: markdown enkel als het moet
+
+    text = getattr(note, "text", None)
+    return plain_text(note.body) if text is None else text
+
+
+def loaded_engine() -> Optional[SearchEngine]:
+    """De index van dit proces, of None als die nog niet geladen is."""
+    return _engine
+
+
+def get_engine() -> SearchEngine:
+    """Laad de index (van schijf indien aanwezig, anders uit de database)."""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                path = index_dir()
+                engine = None
+                if path is not None and (path / "meta.json").exists():
+                    engine = SearchEngine.load(path)
+                if engine is not None:
+                    engine.sync()
+                else:
+                    engine = SearchEngine.from_database()
+                _engine = engine
+    return _engine
+
+
+def reset_engine() -> None:
+    """Vergeet de geladen index (tests, na `build_search_index`)."""
+    global _engine
+    with _engine_lock:
+        _engine = None
+
+
+def text_filter(query: str) -> Q:
+    """
+    Substringfilter (hoofdletterongevoelig) op titel en platte tekst, voor
+    de "db"-backend. Niet op `Note.body`: een grote body staat
+    gecomprimeerd in `NoteBody` en de kolom bevat dan niets (zie
+    `notes.bodies`); `NoteText` heeft altijd de volledige tekst.
+    """
+    return Q(title__icontains=query) | Q(plain_text__text__icontains=query)
+
+
+def text_matches(query: str, title: str, text: str) -> bool:
+    """
+    `text_filter` voor één note in Python (saved searches): `query` als
+    substring van de titel of de platte tekst. Verwacht alles in lowercase.
+    """
+    return query in title or query in text
+
+
+def pk_filter(pks, using: str = "default") -> Q:
+    """
+    `pk__in` met de id's als één parameter (JSON-lijst op SQLite, array
+    op PostgreSQL), dus zonder limiet op het aantal query-parameters.
+    """
+    pks = sorted(pks)
+    if connections[using].vendor == "postgresql":
+        return Q(pk__in=RawSQL("SELECT unnest(%s::bigint[])", [pks]))
+    return Q(pk__in=RawSQL("SELECT value FROM json_each(%s)", [json.dumps(pks)]))
+
+
+def search_notes(queryset, query: str):
+    """
+    Filter `queryset` op `query` en geef (queryset, ranking) terug.
+
+    Welke notes meedoen is voor beide backends hetzelfde: `text_filter`,
+    de hele zoekterm als substring van titel of platte tekst. Met BM25
+    komen ze uit de index (`SearchEngine.candidates`), voor één woord
+    zonder LIKE; enkel meerdere woorden of leestekens worden daarna nog
+    op de kandidaten zelf nagekeken. `ranking` geeft de note-id's met
+    een score, meest relevant eerst; treffers enkel op een deel van een
+    woord hebben geen score en komen daarna. Er is geen maximum.
+    Met de "db"-backend, of zonder woorden in `query`, is `ranking` None.
+    """
+    if backend() != "bm25":
+        return queryset.filter(text_filter(query)), None
+    engine = get_engine()
+    engine.maybe_sync()
+    candidates = engine.candidates(query)
+    if candidates is None:
+        return queryset.filter(text_filter(query)), None
+    if _token.fullmatch(query):
+        queryset = queryset.filter(pk_filter(candidates, queryset.db))
+    elif 2 * len(candidates) <= engine.doc_count:
+        queryset = queryset.filter(pk_filter(candidates, queryset.db))
+        queryset = queryset.filter(text_filter(query))
+    else:
+        # bijna alles is kandidaat: de LIKE over alles is dan goedkoper
+        queryset = queryset.filter(text_filter(query))
+    return queryset, [pk for pk, _score in engine.search(query, len(candidates))]
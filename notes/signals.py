@@ -0,0 +1,226 @@
+"""
+notes.signals
+=============
+
+Signal handlers voor `Note` (en de tags-tussentabel).
+Worden geregistreerd in `NotesConfig.ready()`.
+
+Het zware werk na een save draait niet in de request maar als job
+(`notes.jobs`, zie `notes.tasks`). De job wordt in dezelfde transactie als
+de save ingepland: een worker ziet hem pas na de commit en een rollback
+schrapt hem mee. `unique=True`: een nog wachtende job voor dezelfde note
+volstaat, want die leest de laatste staat uit de database. Behalve voor
+versies: elke save krijgt een eigen job met zijn titel en body.
+
+- live updates: publiceer compacte events naar `notes.events.hub`,
+  pas na commit en enkel als er clients verbonden zijn
+- versiegeschiedenis: job `notes.revision` (`notes.revisions`)
+- wiki-links: job `notes.links`, werkt de linkindex (`NoteLink`)
+  incrementeel bij (`notes.links`)
+- platte tekst: job `notes.plain_text`, vanuit `Note.save`
+- verwante notes: plan een herberekening in als tags wijzigen (`notes.related`)
+- zoeken: markeer de note in de BM25-index van dit proces na commit; die
+  leeft per proces, dus geen job (`notes.search`)
+- saved searches: job `saved_searches.note`, houdt de note tegen alle
+  saved searches (`notes.saved_searches`)
+- API-sleutels: vergeet de sleutels in het geheugen na een wijziging
+- lijstitems: nieuwe taggeneratie voor de fragmentcache (`notes.fragments`)
+- dashboard: nieuwe generatie na een wijziging aan notes of saved searches
+  (`notes.dashboard`; tags via de taggeneratie hierboven)
+- verwijderen: alle gevolgen samen in `notes_deleted`, ook gebruikt door
+  de bulkverwijdering (`notes.bulk`)
+"""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .events import hub
+from . import dashboard, saved_searches
+from .api_auth import forget_keys
+from .fragments import invalidate_tags
+from .jobs import enqueue
+from .models import ApiKey, Note, SavedSearch, Tag
+from .related import schedule_refresh
+from .search import loaded_engine
+
+NoteTag = Note.tags.through
+
+
+def _publish(event: dict) -> None:
+    transaction.on_commit(lambda: hub.publish(event))
+
+
+@receiver(post_save, sender=Note, dispatch_uid="notes_live_saved")
+def publish_note_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not hub.subscriber_count:
+        return
+    _publish(
+        {
+            "type": "created" if created else "updated",
+            "id": instance.pk,
+            "title": instance.title,
+        }
+    )
+
+
+@receiver(post_save, sender=Note, dispatch_uid="notes_revision_saved")
+def record_note_revision(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {"title", "body"} & set(update_fields):
+        return
+    # de staat van deze save meegeven: twee saves vóór de worker draait
+    # zijn twee versies
+    enqueue(
+        "notes.revision",
+        {"note_id": instance.pk, "title": instance.title, "body": instance.body or ""},
+    )
+
+
+@receiver(post_save, sender=Note, dispatch_uid="notes_links_saved")
+def update_note_links(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    outgoing = update_fields is None or "body" in update_fields
+    incoming = update_fields is None or "title" in update_fields
+    if outgoing or incoming:
+        enqueue(
+            "notes.links",
+            {"note_id": instance.pk, "outgoing": outgoing, "incoming": incoming},
+            unique=True,
+        )
+
+
+@receiver(post_save, sender=Note, dispatch_uid="notes_search_saved")
+def update_search_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    engine = loaded_engine()
+    if raw or engine is None:
+        return
+    if update_fields is not None and not {"title", "body"} & set(update_fields):
+        return
+    pk = instance.pk
+    transaction.on_commit(lambda: engine.mark_dirty([pk]))
+
+
+def notes_deleted(note_ids) -> None:
+    """
+    Gevolgen van het verwijderen van notes, één keer voor de hele set:
+    zoekindex, live updates en dashboard. Voor `post_delete` en voor
+    `notes.bulk.delete_notes` (dat geen signals stuurt).
+    """
+    note_ids = list(note_ids)
+    engine = loaded_engine()
+    if engine is not None:
+        transaction.on_commit(lambda: engine.remove_many(note_ids))
+    if hub.subscriber_count:
+        for pk in note_ids:
+            _publish({"type": "deleted", "id": pk})
+    dashboard.invalidate()
+
+
+@receiver(post_delete, sender=Note, dispatch_uid="notes_note_deleted")
+def note_deleted(sender, instance, **kwargs):
+    notes_deleted([instance.pk])
+
+
+@receiver(m2m_changed, sender=NoteTag, dispatch_uid="notes_live_tags")
+def publish_note_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not hub.subscriber_count:
+        return
+
+    # reverse: instance is een Tag en pk_set bevat note-id's
+    if reverse:
+        note_ids = list(pk_set or [])
+    else:
+        note_ids = [instance.pk]
+    if not note_ids:
+        return
+
+    tags = {pk: [] for pk in note_ids}
+    for note_id, name in (
+        NoteTag.objects.filter(note_id__in=note_ids)
+        .order_by("tag__name")
+        .values_list("note_id", "tag__name")
+    ):
+        tags[note_id].append(name)
+
+    for note_id, names in tags.items():
+        _publish({"type": "updated", "id": note_id, "tags": names})
+
+
+@receiver(m2m_changed, sender=NoteTag, dispatch_uid="notes_related_tags")
+def refresh_related_on_tags(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        schedule_refresh([instance.pk])
+    elif pk_set:
+        schedule_refresh(pk_set)
+    elif action == "post_clear":
+        # tag.notes.clear(): welke notes het waren is niet meer bekend
+        schedule_refresh()
+
+
+@receiver(post_save, sender=Note, dispatch_uid="notes_saved_searches_saved")
+def update_saved_search_members(
+    sender, instance, raw=False, update_fields=None, **kwargs
+):
+    if raw:
+        return
+    if update_fields is not None and not {"title", "body"} & set(update_fields):
+        return
+    if saved_searches.definitions():
+        enqueue("saved_searches.note", {"note_id": instance.pk}, unique=True)
+
+
+@receiver(m2m_changed, sender=NoteTag, dispatch_uid="notes_saved_searches_tags")
+def update_saved_search_members_on_tags(sender, instance, action, reverse, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if reverse:
+        # tag.notes.add(...) e.d.: mogelijk veel notes, dus in één job
+        saved_searches.schedule_rebuild()
+    elif saved_searches.definitions():
+        enqueue("saved_searches.note", {"note_id": instance.pk}, unique=True)
+
+
+@receiver(post_save, sender=SavedSearch, dispatch_uid="notes_saved_search_changed")
+def saved_search_changed(sender, instance, raw=False, **kwargs):
+    saved_searches.forget_definitions()
+    dashboard.invalidate()
+    if not raw:
+        saved_searches.schedule_rebuild([instance.pk])
+
+
+@receiver(post_delete, sender=SavedSearch, dispatch_uid="notes_saved_search_deleted")
+def saved_search_deleted(sender, instance, **kwargs):
+    saved_searches.forget_definitions()
+    dashboard.invalidate()
+
+
+@receiver(post_save, sender=ApiKey, dispatch_uid="notes_api_key_saved")
+@receiver(post_delete, sender=ApiKey, dispatch_uid="notes_api_key_deleted")
+def api_keys_changed(sender, **kwargs):
+    # andere processen zien de wijziging na NOTES_API_KEY_RELOAD_SECONDS
+    forget_keys()
+
+
+@receiver(m2m_changed, sender=NoteTag, dispatch_uid="notes_fragments_tags")
+def invalidate_fragments_on_tags(sender, action, **kwargs):
+    if action in ("post_add", "post_remove", "post_clear"):
+        invalidate_tags()
+
+
+@receiver(post_save, sender=Tag, dispatch_uid="notes_fragments_tag_saved")
+@receiver(post_delete, sender=Tag, dispatch_uid="notes_fragments_tag_deleted")
+def invalidate_fragments_on_tag_change(sender, **kwargs):
+    invalidate_tags()
+
+
+@receiver(post_save, sender=Note, dispatch_uid="notes_dashboard_saved")
+def invalidate_dashboard(sender, **kwargs):
+    # ook bij raw (loaddata): de totalen kloppen anders niet meer
+    dashboard.invalidate()
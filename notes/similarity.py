@@ -0,0 +1,154 @@
+"""
+notes.similarity
+================
+
+Berekening van 'verwante notities' op basis van gedeelde tags
+(zie `notes.related` voor het inplannen en uitlezen).
+
+Per request alle notes vergelijken is kwadratisch werk, dus dit draait
+in de achtergrond (`notes.jobs`, jobs `related.refresh` en
+`related.rebuild`):
+
+1. de tussentabel note<->tag wordt één sparse note×tag-matrix `M`
+   (SciPy CSR, enen op de plaats van een koppeling); bij een gedeeltelijke
+   herberekening enkel de rijen van de notes en hun mogelijke buren
+2. per batch notes geeft `M[batch] @ M.T` het aantal gedeelde tags met
+   elke andere note; enkel notes met minstens één gedeelde tag komen in
+   het resultaat voor, dus het blijft sparse
+3. daaruit volgt de gelijkenis (Jaccard of cosinus) en met
+   `np.argpartition` de top-k per note
+4. resultaat in `RelatedNote`
+
+Instellingen: `NOTES_RELATED_TOP_K` (standaard 5) en
+`NOTES_RELATED_METRIC` ("jaccard" of "cosine").
+Vereist numpy en scipy; enkel de worker importeert deze module.
+"""
+
+from typing import Iterable, Optional
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from scipy import sparse
+
+from .models import Note, RelatedNote
+
+NoteTag = Note.tags.through
+
+DEFAULT_TOP_K = 5
+METRICS = ("jaccard", "cosine")
+
+
+def top_k() -> int:
+    return getattr(settings, "NOTES_RELATED_TOP_K", DEFAULT_TOP_K)
+
+
+def metric() -> str:
+    value = getattr(settings, "NOTES_RELATED_METRIC", "jaccard")
+    if value not in METRICS:
+        raise ValueError(f"Onbekende metric: {value}")
+    return value
+
+
+class TagMatrix:
+    """
+    Sparse note×tag-matrix met de bijhorende note-id's.
+
+    Met `note_ids` bevat ze enkel die notes en de notes met minstens één
+    gedeelde tag (de enige mogelijke buren), elk met al hun tags.
+    """
+
+    def __init__(self, note_ids: Optional[Iterable[int]] = None):
+        links = NoteTag.objects.all()
+        if note_ids is not None:
+            tag_ids = NoteTag.objects.filter(note_id__in=note_ids).values("tag_id")
+            nearby = NoteTag.objects.filter(tag_id__in=tag_ids).values("note_id")
+            links = links.filter(note_id__in=nearby)
+        links = links.values_list("note_id", "tag_id")
+        pairs = np.array(list(links.iterator(chunk_size=10000)), dtype=np.int64)
+        pairs = pairs.reshape(-1, 2)
+        self.note_ids, rows = np.unique(pairs[:, 0], return_inverse=True)
+        tag_ids, cols = np.unique(pairs[:, 1], return_inverse=True)
+
+        data = np.ones(len(pairs), dtype=np.float32)
+        self.matrix = sparse.csr_matrix(
+            (data, (rows, cols)), shape=(len(self.note_ids), len(tag_ids))
+        )
+        self.matrix.sum_duplicates()
+        self.matrix.data[:] = 1  # dubbele koppelingen tellen één keer
+        self.sizes = np.asarray(self.matrix.sum(axis=1), dtype=np.float64).ravel()
+        self._transposed = self.matrix.T.tocsr()
+
+    def rows_for(self, note_ids: Iterable[int]) -> np.ndarray:
+        """Rij-indexen van de gegeven note-id's (notes zonder tags vallen weg)."""
+        ids = np.fromiter(note_ids, dtype=np.int64)
+        pos = np.searchsorted(self.note_ids, ids)
+        inside = pos < len(self.note_ids)
+        pos, ids = pos[inside], ids[inside]
+        return pos[self.note_ids[pos] == ids]
+
+    def neighbours(self, rows: np.ndarray, k: int, how: str = "jaccard"):
+        """
+        Top-k buren voor een batch rijen.
+
+        Yields:
+            (note_id, [(buur_id, score), ...]) gesorteerd op score, hoog eerst
+        """
+        overlap = (self.matrix[rows] @ self._transposed).tocsr()
+        overlap.sort_indices()
+        shared = overlap.data.astype(np.float64)
+        own = np.repeat(self.sizes[rows], np.diff(overlap.indptr))
+        other = self.sizes[overlap.indices]
+        if how == "cosine":
+            scores = shared / np.sqrt(own * other)
+        else:
+            scores = shared / (own + other - shared)
+
+        for i, row in enumerate(rows):
+            start, end = overlap.indptr[i], overlap.indptr[i + 1]
+            cols, vals = overlap.indices[start:end], scores[start:end]
+            keep = cols != row
+            cols, vals = cols[keep], vals[keep]
+            if len(cols) > k:
+                best = np.argpartition(-vals, k - 1)[:k]
+                cols, vals = cols[best], vals[best]
+            # hoogste score eerst; bij gelijke score de oudste note (laagste id)
+            order = np.lexsort((self.note_ids[cols], -vals))
+            yield int(self.note_ids[row]), [
+                (int(self.note_ids[c]), float(v))
+                for c, v in zip(cols[order], vals[order])
+            ]
+
+
+def refresh_related(
+    note_ids: Optional[Iterable[int]] = None,
+    batch_size: int = 500,
+    k: Optional[int] = None,
+) -> int:
+    """
+    Herbereken de verwante notes van `note_ids` (None = alle notes).
+    Geeft het aantal geschreven `RelatedNote`-rijen terug.
+    """
+    k = k or top_k()
+    how = metric()
+    if note_ids is None:
+        tags = TagMatrix()
+        targets = list(Note.objects.values_list("pk", flat=True))
+    else:
+        targets = list(note_ids)
+        tags = TagMatrix(targets)
+
+    written = 0
+    for start in range(0, len(targets), batch_size):
+        chunk_ids = targets[start : start + batch_size]
+        chunk_rows = tags.rows_for(chunk_ids)
+        entries = [
+            RelatedNote(note_id=note_id, related_id=other, score=score, rank=rank)
+            for note_id, found in tags.neighbours(chunk_rows, k, how)
+            for rank, (other, score) in enumerate(found, start=1)
+        ]
+        with transaction.atomic():
+            RelatedNote.objects.filter(note_id__in=chunk_ids).delete()
+            RelatedNote.objects.bulk_create(entries)
+        written += len(entries)
+    return written
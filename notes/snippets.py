@@ -0,0 +1,109 @@
+"""
+notes.snippets
+==============
+
+Korte tekstfragmenten rond de zoektermen voor `list_notes?q=...`.
+
+- bij elke save (en `bulk_create`) wordt de body één keer naar platte
+  tekst omgezet (Markdown -> HTML -> tags weg) en in `NoteText` bewaard
+- bij het zoeken knipt de database het fragment uit die tekst
+  (`StrIndex` + `Substr`); er wordt niets gerenderd en er komen geen
+  volledige bodies naar Python, enkel maximaal `NOTES_SNIPPET_CHARS`
+  tekens per resultaat
+- de zoektermen worden in dat korte fragment gemarkeerd met `<mark>`
+"""
+
+import html
+import re
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.db.models import Case, F, IntegerField, Value, When
+from django.db.models.functions import Greatest, Length, Lower, StrIndex, Substr
+from django.utils.html import escape, strip_tags
+from django.utils.safestring import SafeString, mark_safe
+
+from .models import NoteText
+from .search import tokenize
+
+DEFAULT_SNIPPET_CHARS = 160
+# maximaal zoveel zoektermen bepalen waar het fragment begint
+MAX_TERMS = 3
+
+
+def snippet_chars() -> int:
+    return getattr(settings, "NOTES_SNIPPET_CHARS", DEFAULT_SNIPPET_CHARS)
+
+
+def plain_text(body: str) -> str:
+    """Markdown-body als platte tekst op één regel."""
+    import markdown  # lazy: enkel nodig bij opslaan, niet bij het zoeken
+
+    rendered = markdown.markdown(body or "", extensions=["extra"])
+    return " ".join(html.unescape(strip_tags(rendered)).split())
+
+
+def store_texts(notes: Iterable) -> None:
+    """Bewaar de platte tekst van de gegeven (opgeslagen) notes."""
+    rows = [NoteText(note_id=n.pk, text=plain_text(n.body)) for n in notes]
+    if rows:
+        NoteText.objects.bulk_create(
+            rows, update_conflicts=True, unique_fields=["note"], update_fields=["text"]
+        )
+
+
+def query_terms(query: str) -> List[str]:
+    terms = list(dict.fromkeys(tokenize(query)))
+    return terms[:MAX_TERMS] or ([query.strip().lower()] if query.strip() else [])
+
+
+def highlight(text: str, terms: List[str]) -> SafeString:
+    """Escape `text` en zet de zoektermen in <mark>."""
+    if not terms:
+        return mark_safe(escape(text))
+    pattern = re.compile("|".join(re.escape(t) for t in terms), re.IGNORECASE)
+    out, pos = [], 0
+    for match in pattern.finditer(text):
+        out.append(escape(text[pos : match.start()]))
+        out.append(f"<mark>{escape(match.group(0))}</mark>")
+        pos = match.end()
+    out.append(escape(text[pos:]))
+    return mark_safe("".join(out))
+
+
+def snippets_for(note_ids: Iterable[int], query: str) -> Dict[int, SafeString]:
+    """
+    {note-id: fragment met <mark>} voor de gegeven notes (één query).
+    Het fragment begint kort vóór de eerste gevonden zoekterm.
+    """
+    note_ids = list(note_ids)
+    terms = query_terms(query)
+    if not note_ids or not terms:
+        return {}
+
+    width = snippet_chars()
+    lowered = Lower("text")
+    positions = {
+        f"pos{i}": StrIndex(lowered, Value(term)) for i, term in enumerate(terms)
+    }
+    first_hit = Case(
+        *[When(**{f"pos{i}__gt": 0}, then=F(f"pos{i}")) for i in range(len(terms))],
+        default=Value(1),
+        output_field=IntegerField(),
+    )
+    rows = (
+        NoteText.objects.filter(note_id__in=note_ids)
+        .annotate(**positions)
+        .annotate(start=Greatest(first_hit - width // 3, Value(1)))
+        .annotate(fragment=Substr("text", F("start"), width), length=Length("text"))
+        .values_list("note_id", "fragment", "start", "length")
+    )
+
+    snippets = {}
+    for note_id, fragment, start, length in rows:
+        if not fragment:
+            continue
+        prefix = "… " if start > 1 else ""
+        suffix = " …" if start - 1 + width < length else ""
+        snippets[note_id] = mark_safe(prefix + highlight(fragment, terms) + suffix)
+    return snippets
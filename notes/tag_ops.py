@@ -0,0 +1,125 @@
+"""
+notes.tag_ops
+=============
+
+Bulkbewerkingen op tags: samenvoegen (merge), hernoemen en verwijderen.
+
+Alles draait als een handvol set-gebaseerde statements op de
+tussentabel van `Note.tags` (re-point, dedupe, delete) binnen één
+transactie. Er worden dus nooit notities één voor één ingeladen of
+opgeslagen, ook niet als een tag aan 100k notities hangt.
+
+Gebruikt door de admin-acties in `notes.admin` en door het
+management command `manage.py tags`.
+"""
+
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Min
+
+from .models import Note, Tag
+from .fragments import invalidate_tags
+from .related import schedule_refresh
+from .saved_searches import schedule_rebuild
+
+NoteTag = Note.tags.through
+
+
+def _tag_ids(tags: Iterable) -> list:
+    """Aanvaard Tag-objecten of primaire sleutels, geef unieke ids terug."""
+    ids = []
+    for t in tags:
+        pk = t.pk if isinstance(t, Tag) else int(t)
+        if pk not in ids:
+            ids.append(pk)
+    return ids
+
+
+def merge_tags(sources: Iterable, target) -> int:
+    """
+    Voeg de tags in `sources` samen in `target`.
+
+    Stappen (allemaal set-based):
+    1. verwijder links van een bron-tag als de note `target` al heeft
+    2. verwijder dubbele links als een note meerdere bron-tags heeft
+    3. zet de overgebleven links om naar `target` (één UPDATE)
+    4. verwijder de bron-tags
+
+    Returns:
+        int: aantal links dat naar `target` werd omgezet
+    """
+    target_id = target.pk if isinstance(target, Tag) else int(target)
+    source_ids = [pk for pk in _tag_ids(sources) if pk != target_id]
+    if not source_ids:
+        return 0
+
+    with transaction.atomic():
+        links = NoteTag.objects.filter(tag_id__in=source_ids)
+
+        # 1. notes die target al hebben: bron-link is overbodig
+        links.filter(
+            note_id__in=NoteTag.objects.filter(tag_id=target_id).values("note_id")
+        ).delete()
+
+        # 2. per note maar één bron-link overhouden (laagste id)
+        keep = links.values("note_id").annotate(first=Min("id")).values("first")
+        links.exclude(pk__in=keep).delete()
+
+        # 3. re-point
+        moved = links.update(tag_id=target_id)
+
+        # 4. bron-tags zelf weg (hun links zijn al verplaatst)
+        Tag.objects.filter(pk__in=source_ids).delete()
+
+        # tagsets van veel notes veranderd: volledig herberekenen
+        schedule_refresh()
+        schedule_rebuild()
+        invalidate_tags()
+
+    return moved
+
+
+def rename_tag(tag: Tag, new_name: str) -> Tag:
+    """
+    Hernoem `tag` naar `new_name`.
+
+    Bestaat er al een tag met exact die naam, dan wordt `tag` erin
+    samengevoegd en krijg je de bestaande tag terug.
+    """
+    new_name = " ".join(str(new_name).split())
+    if not new_name:
+        raise ValueError("Nieuwe tagnaam mag niet leeg zijn.")
+
+    with transaction.atomic():
+        existing = Tag.objects.filter(name=new_name).exclude(pk=tag.pk).first()
+        if existing is not None:
+            merge_tags([tag], existing)
+            return existing
+
+        Tag.objects.filter(pk=tag.pk).update(name=new_name)
+        tag.name = new_name
+        schedule_rebuild()
+        invalidate_tags()
+        return tag
+
+
+def delete_tags(tags: Iterable) -> int:
+    """
+    Verwijder tags en al hun links in twee DELETE-statements.
+
+    Returns:
+        int: aantal verwijderde links
+    """
+    ids = _tag_ids(tags)
+    if not ids:
+        return 0
+
+    with transaction.atomic():
+        removed, _ = NoteTag.objects.filter(tag_id__in=ids).delete()
+        Tag.objects.filter(pk__in=ids).delete()
+        if removed:
+            schedule_refresh()
+            schedule_rebuild()
+            invalidate_tags()
+    return removed
@@ -0,0 +1,111 @@
+"""
+notes.tasks
+===========
+
+Jobs voor de achtergrondqueue (`notes.jobs`). Geregistreerd bij het
+laden van de app (`NotesConfig.ready()`), zodat zowel webprocessen
+(enqueue) als `manage.py run_worker` (uitvoeren) ze kennen.
+
+De jobs per note (`notes.*`, `saved_searches.note`) lezen de note opnieuw
+uit de database: wachten er meerdere saves, dan verwerkt één job de
+laatste staat. Uitzondering is `notes.revision`: die krijgt titel en body
+van zijn save mee, zodat elke save een versie wordt. Bestaat de note niet
+meer, dan doen ze niets.
+"""
+
+from . import links, revisions, saved_searches, tag_ops
+from .jobs import job
+from .models import Note
+
+
+def _note(note_id):
+    return Note.objects.select_related("body_blob").filter(pk=note_id).first()
+
+
+@job("tags.merge")
+def merge_tags(source_ids, target_id):
+    tag_ops.merge_tags(source_ids, target_id)
+
+
+@job("tags.delete")
+def delete_tags(tag_ids):
+    tag_ops.delete_tags(tag_ids)
+
+
+@job("related.refresh")
+def refresh_related(note_ids):
+    # numpy/scipy enkel in de worker laden
+    from .related import affected_notes
+    from .similarity import refresh_related
+
+    refresh_related(affected_notes(note_ids))
+
+
+@job("related.rebuild")
+def rebuild_related():
+    from .similarity import refresh_related
+
+    refresh_related()
+
+
+@job("saved_searches.rebuild")
+def rebuild_saved_searches(search_ids=None):
+    saved_searches.rebuild(search_ids)
+
+
+@job("saved_searches.note")
+def update_saved_search_memberships(note_id):
+    note = _note(note_id)
+    if note is not None:
+        saved_searches.update_memberships(note)
+
+
+@job("notes.revision")
+def record_revision(note_id, title=None, body=None):
+    if title is None:
+        # jobs van vóór de titel/body in de payload
+        note = _note(note_id)
+    elif Note.objects.filter(pk=note_id).exists():
+        note = Note(pk=note_id, title=title, body=body)
+    else:
+        note = None
+    if note is not None:
+        revisions.record_revision(note)
+
+
+@job("notes.created")
+def created_without_signals(note_ids):
+    """
+    Eerste versie en links (uit- en inkomend) voor notes die met
+    `bulk_create` gemaakt zijn, zonder post_save (`notes.bulk`).
+    """
+    notes = Note.objects.select_related("body_blob").filter(pk__in=note_ids)
+    for note in notes.order_by("pk"):
+        revisions.record_revision(note)
+        links.sync_links(note)
+        links.sync_incoming(note)
+
+
+@job("notes.links")
+def sync_links(note_id, outgoing=True, incoming=True):
+    note = _note(note_id)
+    if note is None:
+        return
+    if outgoing:
+        links.sync_links(note)
+    if incoming:
+        links.sync_incoming(note)
+
+
+@job("notes.plain_text")
+def store_plain_texts(note_ids, memberships=False):
+    # lazy: markdown enkel in de worker laden
+    from .snippets import store_texts
+
+    notes = list(Note.objects.select_related("body_blob").filter(pk__in=note_ids))
+    store_texts(notes)
+    # saved searches kijken naar de platte tekst: opnieuw nakijken nu die
+    # klaar is (een eerdere `saved_searches.note` kan de oude gelezen hebben)
+    if memberships and saved_searches.definitions():
+        for note in notes:
+            saved_searches.update_memberships(note)
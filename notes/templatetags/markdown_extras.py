@@ -10,6 +10,21 @@ We doen:
 3. linkify (maak kale URLs klikbaar)
 4. mark_safe zodat Django het niet ontsnapt in de template
 
+Wiki-links `[[Titel]]` / `[[Titel|tekst]]` worden door `WikiLinkExtension`
+een link naar die note (of een `<span class="wikilink missing">` als de
+note niet bestaat). Alle titels van één body worden in één query opgezocht.
+Publieke pagina's gebruiken `{{ note.body|markdownify:"public" }}` zodat de
+links naar de publieke detailpagina wijzen.
+
+`markdown`, `bleach` en (via codehilite) `pygments` worden pas bij de
+eerste render geïmporteerd: workers, management commands en tests die
+geen Markdown renderen betalen die opstarttijd niet. `preload()` doet
+die import (en een voorbeeldrender) bewust vooraf, zie `manage.py warmup`.
+
+De gerenderde HTML staat in de gedeelde cache (namespace "markdown",
+zie `notes.caching`), met als sleutel een hash van variant, tekst en de
+opgezochte wiki-linkdoelen; enkel die ene titel-query blijft per render.
+
 We laten o.a. toe:
 - p, br, strong/b, em/i, code, pre, blockquote
 - ul/ol/li
@@ -19,11 +34,22 @@ We laten o.a. toe:
 - table, thead, tbody, tr, th, td (voor Markdown-tabellen)
 """
 
+import hashlib
+import xml.etree.ElementTree as etree
+from functools import lru_cache
+
 from django import template
+from django.conf import settings
+from django.urls import reverse
 from django.utils.safestring import mark_safe
 
-import markdown
-import bleach
+from notes.caching import get_or_compute
+from notes.links import (
+    WIKILINK_RE,
+    extract_link_titles,
+    normalize_title,
+    resolve_titles,
+)
 
 register = template.Library()
 
@@ -63,7 +89,7 @@ ALLOWED_TAGS = [
 
 # Welke HTML-attributen mogen in die tags voorkomen
 ALLOWED_ATTRS = {
-    "a": ["href", "title", "rel"],
+    "a": ["href", "title", "rel", "class"],
     "code": ["class"],  # bv. <code class="language-python">
     "span": ["class"],  # pygments voegt vaak <span class="k"> etc. toe
     "th": ["align"],
@@ -73,12 +99,89 @@ ALLOWED_ATTRS = {
 
 ALLOWED_PROTOCOLS = ["http", "https", "mailto"]
 
+DEFAULT_CACHE_SECONDS = 24 * 3600
+
 
-def _render_markdown_to_clean_html(text: str) -> str:
+# URL-namen voor wiki-links, per variant van de filter
+WIKILINK_URL_NAMES = {
+    "": "notes:detail",
+    "public": "notes:public_detail",
+}
+
+
+@lru_cache(maxsize=None)
+def wikilink_extension_class():
+    """`WikiLinkExtension`, pas aangemaakt als markdown geïmporteerd wordt."""
+    from markdown.extensions import Extension
+    from markdown.inlinepatterns import InlineProcessor
+
+    class WikiLinkInlineProcessor(InlineProcessor):
+        def __init__(self, pattern, md, targets, url_name):
+            super().__init__(pattern, md)
+            self.targets = targets
+            self.url_name = url_name
+
+        def handleMatch(self, m, data):
+            title = normalize_title(m.group(1))
+            pk = self.targets.get(title)
+            if pk is None:
+                el = etree.Element("span")
+                el.set("class", "wikilink missing")
+            else:
+                el = etree.Element("a")
+                el.set("href", reverse(self.url_name, args=[pk]))
+                el.set("class", "wikilink")
+            el.text = (m.group(2) or m.group(1)).strip()
+            return el, m.start(0), m.end(0)
+
+    class WikiLinkExtension(Extension):
+        """`[[Titel]]` -> link naar de note met die titel."""
+
+        def __init__(self, **kwargs):
+            self.config = {
+                "targets": [{}, "{titel: note-id} van de bestaande notes"],
+                "url_name": ["notes:detail", "URL-naam van de detailpagina"],
+            }
+            super().__init__(**kwargs)
+
+        def extendMarkdown(self, md):
+            processor = WikiLinkInlineProcessor(
+                WIKILINK_RE, md, self.getConfig("targets"), self.getConfig("url_name")
+            )
+            # vóór de gewone [tekst](url)- en referentielinks
+            md.inlinePatterns.register(processor, "wikilink", 175)
+
+    return WikiLinkExtension
+
+
+def _render_markdown_to_clean_html(text: str, variant: str = "") -> str:
     """
-    Neem rauwe Markdown-tekst en geef veilige HTML terug.
+    Neem rauwe Markdown-tekst en geef veilige HTML terug (gecachet).
     """
     raw = text or ""
+    titles = extract_link_titles(raw)
+    targets = resolve_titles(titles) if titles else {}
+    digest = hashlib.sha1(
+        f"{variant}\0{sorted(targets.items())}\0{raw}".encode("utf-8")
+    ).hexdigest()
+    return get_or_compute(
+        "markdown",
+        [digest],
+        lambda: _render(raw, variant, targets),
+        timeout=getattr(
+            settings, "NOTES_MARKDOWN_CACHE_SECONDS", DEFAULT_CACHE_SECONDS
+        ),
+    )
+
+
+def _render(raw: str, variant: str, targets: dict) -> str:
+    import bleach
+    import markdown
+
+    wikilinks = wikilink_extension_class()(
+        targets=targets,
+        url_name=WIKILINK_URL_NAMES.get(variant, WIKILINK_URL_NAMES[""]),
+    )
 
     # 1. Markdown -> HTML
     # We zetten veelgebruikte extensies aan:
@@ -94,6 +197,7 @@ def _render_markdown_to_clean_html(text: str) -> str:
             "toc",  # table-of-contents anchors (ids op headings)
             "sane_lists",
             "smarty",
+            wikilinks,
         ],
         output_format="html5",
     )
@@ -115,10 +219,27 @@ def _render_markdown_to_clean_html(text: str) -> str:
     return mark_safe(linkified)
 
 
+# codeblok zodat ook codehilite en een pygments-lexer geladen worden
+PRELOAD_SAMPLE = """# Opwarmen
+
+Een *korte* tekst met een [link](https://example.com) en [[Wiki]].
+
+```python
+print("hallo")
+```
+"""
+
+
+def preload() -> None:
+    """Importeer markdown, bleach en pygments en render een voorbeeld."""
+    _render(PRELOAD_SAMPLE, "", {})
+
+
 @register.filter
-def markdownify(value: str) -> str:
+def markdownify(value: str, variant: str = "") -> str:
     """
     Django template filter:
         {{ note.body|markdownify }}
+        {{ note.body|markdownify:"public" }}   (wiki-links naar publieke pagina's)
     """
-    return _render_markdown_to_clean_html(value)
+    return _render_markdown_to_clean_html(value, variant)
@@ -0,0 +1,24 @@
+"""
+note_fragments
+==============
+Template tag `note_items`: de HTML per lijstitem uit de fragmentcache
+(zie `notes.fragments`).
+
+    {% load note_fragments %}
+    {% note_items notes "notes/_list_item.html" as items %}
+    {% for item in items %}{{ item }}{% empty %}...{% endfor %}
+
+Het itemtemplate krijgt enkel `n` (de note) als context, geen request:
+alles wat erin staat moet voor elke bezoeker hetzelfde zijn.
+"""
+
+from django import template
+
+from notes.fragments import render_items
+
+register = template.Library()
+
+
+@register.simple_tag
+def note_items(notes, template_name):
+    return render_items(notes, template_name)
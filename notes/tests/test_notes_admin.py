@@ -0,0 +1,101 @@
+"""
+Tests voor de NoteAdmin voor grote tabellen.
+"""
+
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.admin import NoteAdmin
+from notes.models import Note, Tag
+from notes.paginators import EstimatedCountPaginator
+
+
+class NoteAdminTests(TestCase):
+    def setUp(self):
+        User.objects.create_superuser("admin", "a@example.com", "pw")
+        self.client.login(username="admin", password="pw")
+        tag = Tag.objects.create(name="werk")
+        self.alpha = Note.objects.create(title="Alpha project")
+        self.alpha.tags.add(tag)
+        self.beta = Note.objects.create(title="Beta", body="Alpha in de body")
+
+    def test_changelist_shows_tag_count_without_full_count(self):
+        resp = self.client.get(reverse("admin:notes_note_changelist"))
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Alpha project")
+        cl = resp.context["cl"]
+        self.assertIsNone(cl.full_result_count)
+        counts = {n.title: n.tag_count for n in cl.result_list}
+        self.assertEqual(counts, {"Alpha project": 1, "Beta": 0})
+
+    def test_search_uses_title_prefix_not_body(self):
+        for query in ("Alpha", "alpha", "ALPHA PRO"):
+            with self.subTest(query):
+                resp = self.client.get(
+                    reverse("admin:notes_note_changelist"), {"q": query}
+                )
+                titles = [n.title for n in resp.context["cl"].result_list]
+                self.assertEqual(titles, ["Alpha project"])
+
+        resp = self.client.get(
+            reverse("admin:notes_note_changelist"), {"q": str(self.beta.pk)}
+        )
+        self.assertIn("Beta", [n.title for n in resp.context["cl"].result_list])
+
+    def test_search_uses_lower_title_index(self):
+        resp = self.client.get(reverse("admin:notes_note_changelist"), {"q": "alp"})
+        qs = resp.context["cl"].queryset.filter(title_key__gte="alp")
+        with connection.cursor() as cursor:
+            sql, params = qs.query.sql_with_params()
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn("notes_note_title_lower_idx", plan)
+
+    def test_pages_past_the_cap_stay_reachable(self):
+        Note.objects.bulk_create([Note(title=f"n{i}") for i in range(30)])
+        url = reverse("admin:notes_note_changelist")
+        per_page = mock.patch.object(NoteAdmin, "list_per_page", 5)
+        with per_page, self.settings(NOTES_ADMIN_COUNT_CAP=5):
+            for page in (2, 3, 4, 5):
+                with self.subTest(page):
+                    resp = self.client.get(url, {"p": page})
+                    self.assertEqual(resp.status_code, 200)
+                    self.assertEqual(len(resp.context["cl"].result_list), 5)
+                    # de volgende pagina blijft aanklikbaar
+                    self.assertGreater(resp.context["cl"].paginator.num_pages, page)
+
+    def test_change_form_uses_autocomplete_for_tags(self):
+        resp = self.client.get(reverse("admin:notes_note_change", args=[self.alpha.pk]))
+        self.assertContains(resp, "admin-autocomplete")
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def test_count_is_capped_plus_one_page(self):
+        Note.objects.bulk_create([Note(title=f"n{i}") for i in range(22)])
+        paginator = EstimatedCountPaginator(Note.objects.all(), 5, count_cap=10)
+        self.assertEqual(paginator.count, 15)
+        self.assertEqual(paginator.num_pages, 3)
+        self.assertEqual(len(paginator.page(3).object_list), 5)
+
+    def test_cap_moves_with_the_requested_page(self):
+        Note.objects.bulk_create([Note(title=f"n{i}") for i in range(22)])
+        paginator = EstimatedCountPaginator(
+            Note.objects.all(), 5, count_cap=10, page_hint=4
+        )
+        self.assertEqual(paginator.count, 25)
+        self.assertEqual(len(paginator.page(4).object_list), 5)
+        self.assertEqual(len(paginator.page(5).object_list), 2)
+
+    def test_exactly_the_cap_is_exact(self):
+        Note.objects.bulk_create([Note(title=f"n{i}") for i in range(10)])
+        paginator = EstimatedCountPaginator(Note.objects.all(), 5, count_cap=10)
+        self.assertEqual(paginator.count, 10)
+
+    def test_small_result_is_exact(self):
+        Note.objects.bulk_create([Note(title=f"n{i}") for i in range(3)])
+        paginator = EstimatedCountPaginator(Note.objects.all(), 5, count_cap=10)
+        self.assertEqual(paginator.count, 3)
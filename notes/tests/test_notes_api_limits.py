@@ -0,0 +1,141 @@
+"""
+Tests voor API-sleutels en rate limiting (notes.api_auth).
+"""
+
+import json
+import threading
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.api_auth import Client, create_key, lookup, take_token
+from notes.models import ApiKey, Note
+from siteproject.sqlite_cache import SQLiteCache
+
+
+@override_settings(NOTES_API_RATE=1.0, NOTES_API_BURST=2)
+class ApiKeyTests(TestCase):
+    def post(self, key, title="Via API"):
+        return self.client.post(
+            reverse("notes:api_new"),
+            data=json.dumps({"title": title}),
+            content_type="application/json",
+            HTTP_X_API_KEY=key,
+        )
+
+    def test_only_hash_is_stored(self):
+        raw, api_key = create_key("client")
+        self.assertNotIn(raw, (api_key.key_hash, api_key.prefix))
+        self.assertTrue(raw.startswith(api_key.prefix))
+        self.assertEqual(self.post(raw).status_code, 201)
+
+    def test_cached_lookup_needs_no_queries(self):
+        raw, _ = create_key("client")
+        lookup(raw)
+        with self.assertNumQueries(0):
+            self.assertIsNotNone(lookup(raw))
+            self.assertIsNone(lookup("nk_onbekend"))
+
+    def test_revoked_key_is_refused(self):
+        raw, api_key = create_key("client")
+        api_key.is_active = False
+        api_key.save()
+        self.assertEqual(self.post(raw).status_code, 403)
+
+    def test_over_limit_gets_429_before_parsing(self):
+        raw, _ = create_key("client")
+        self.assertEqual(self.post(raw).status_code, 201)
+        self.assertEqual(self.post(raw).status_code, 201)
+
+        with self.assertNumQueries(0):
+            resp = self.client.post(
+                reverse("notes:api_new"),
+                data="geen json",
+                content_type="application/json",
+                HTTP_X_API_KEY=raw,
+            )
+        self.assertEqual(resp.status_code, 429)
+        self.assertEqual(resp["Retry-After"], "1")
+        self.assertEqual(Note.objects.count(), 2)
+
+        # een andere sleutel heeft een eigen bucket
+        other, _ = create_key("ander", burst=5)
+        self.assertEqual(self.post(other).status_code, 201)
+
+    @override_settings(NOTES_API_ANON_RATE=0)
+    def test_anonymous_list_is_unlimited_by_default(self):
+        url = reverse("notes:api_list")
+        for _ in range(5):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        # een verkeerde sleutel wordt niet stil genegeerd
+        self.assertEqual(self.client.get(url, HTTP_X_API_KEY="fout").status_code, 403)
+
+    @override_settings(NOTES_API_ANON_RATE=1.0, NOTES_API_ANON_BURST=2)
+    def test_anonymous_list_is_limited_per_ip(self):
+        url = reverse("notes:api_list")
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.get(url).status_code, 429)
+        other_ip = self.client.get(url, REMOTE_ADDR="10.0.0.2")
+        self.assertEqual(other_ip.status_code, 200)
+
+    @override_settings(
+        NOTES_API_ANON_RATE=1.0, NOTES_API_ANON_BURST=1, NOTES_API_TRUSTED_PROXIES=1
+    )
+    def test_anonymous_bucket_uses_forwarded_ip_behind_a_proxy(self):
+        url = reverse("notes:api_list")
+
+        def get(forwarded):
+            return self.client.get(
+                url, REMOTE_ADDR="10.0.0.1", HTTP_X_FORWARDED_FOR=forwarded
+            ).status_code
+
+        self.assertEqual(get("203.0.113.5"), 200)
+        self.assertEqual(get("203.0.113.6"), 200)
+        self.assertEqual(get("203.0.113.5"), 429)
+        # een vervalst adres vooraan verandert de bucket niet
+        self.assertEqual(get("198.51.100.1, 203.0.113.5"), 429)
+
+    def test_bucket_refills(self):
+        client = Client(bucket="test", rate=2.0, burst=1)
+        self.assertEqual(take_token(client, now=100.0), 0)
+        self.assertAlmostEqual(take_token(client, now=100.25), 0.25)
+        self.assertEqual(take_token(client, now=100.5), 0)
+
+    def test_concurrent_takes_share_one_bucket(self):
+        client = Client(bucket="race", rate=0.001, burst=10)
+        results = []
+        real_get = SQLiteCache.get
+
+        def slow_get(self, *args, **kwargs):
+            # venster tussen lezen en schrijven verbreden
+            value = real_get(self, *args, **kwargs)
+            time.sleep(0.002)
+            return value
+
+        def worker():
+            for _ in range(5):
+                results.append(take_token(client, now=100.0))
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        with mock.patch.object(SQLiteCache, "get", slow_get):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(len(results), 40)
+        self.assertEqual(results.count(0), 10)
+
+    def test_command_creates_and_revokes(self):
+        out = StringIO()
+        call_command("api_keys", "create", "cli", "--rate", "3", stdout=out)
+        raw = out.getvalue().split()[-1]
+        self.assertEqual(ApiKey.objects.get().rate, 3)
+        self.assertEqual(self.post(raw).status_code, 201)
+
+        call_command("api_keys", "revoke", raw[:12], stdout=StringIO())
+        self.assertEqual(self.post(raw).status_code, 403)
@@ -0,0 +1,65 @@
+"""
+Tests voor de streaming archiefdownload (zip en tar.gz).
+"""
+
+import io
+import tarfile
+import zipfile
+
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.archive import iter_archive
+from notes.models import Note, Tag
+
+
+class ArchiveDownloadTests(TestCase):
+    def setUp(self):
+        tag = Tag.objects.create(name="werk")
+        self.note = Note.objects.create(title="Mijn notitie", body="# Kop\n\nTekst")
+        self.note.tags.add(tag)
+        Note.objects.create(title="Leeg", body="")
+
+    def download(self, fmt):
+        resp = self.client.get(reverse("notes:export"), {"format": fmt})
+        self.assertEqual(resp.status_code, 200)
+        self.assertTrue(resp.streaming)
+        self.assertIn("attachment;", resp["Content-Disposition"])
+        return b"".join(resp.streaming_content)
+
+    def test_zip_contains_markdown_with_front_matter(self):
+        data = self.download("zip")
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            names = zf.namelist()
+            self.assertEqual(len(names), 2)
+            name = f"notes/{self.note.pk}-mijn-notitie.md"
+            text = zf.read(name).decode("utf-8")
+        self.assertTrue(text.startswith('---\ntitle: "Mijn notitie"\n'))
+        self.assertIn('tags: ["werk"]', text)
+        self.assertIn("updated_at: ", text)
+        self.assertTrue(text.endswith("# Kop\n\nTekst\n"))
+
+    def test_tar_gz_contains_markdown(self):
+        data = self.download("tar.gz")
+        with tarfile.open(fileobj=io.BytesIO(data), mode="r:gz") as tf:
+            members = tf.getnames()
+            text = tf.extractfile(f"notes/{self.note.pk}-mijn-notitie.md").read()
+        self.assertEqual(len(members), 2)
+        self.assertIn(b"# Kop", text)
+
+    def test_unknown_format_is_rejected(self):
+        resp = self.client.get(reverse("notes:export"), {"format": "rar"})
+        self.assertEqual(resp.status_code, 400)
+
+    def test_first_chunk_is_sent_before_all_notes_are_read(self):
+        consumed = []
+
+        def notes():
+            for note in Note.objects.order_by("pk"):
+                consumed.append(note.pk)
+                yield note
+
+        chunks = iter_archive(notes(), "zip")
+        first = next(chunks)
+        self.assertTrue(first.startswith(b"PK"))
+        self.assertEqual(len(consumed), 1)
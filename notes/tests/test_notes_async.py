@@ -0,0 +1,66 @@
+"""
+Tests voor de native async varianten van de API- en publieke views.
+"""
+
+import json
+
+from django.conf import settings
+from django.http import Http404
+from django.test import AsyncRequestFactory, TestCase
+
+from notes import async_views
+from notes.models import Note, Tag
+
+
+class AsyncViewsTests(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        tag = Tag.objects.create(name="openbaar")
+        self.note = Note.objects.create(title="Async note", body="**vet**")
+        self.note.tags.add(tag)
+
+    async def test_api_list_notes(self):
+        resp = await async_views.api_list_notes(self.factory.get("/notes/api/list/"))
+        self.assertEqual(resp.status_code, 200)
+        data = json.loads(resp.content)
+        self.assertEqual(data[0]["title"], "Async note")
+        self.assertEqual(data[0]["tags"], ["openbaar"])
+
+    async def test_api_new_note_requires_key(self):
+        request = self.factory.post(
+            "/notes/api/new/",
+            data=json.dumps({"title": "x"}),
+            content_type="application/json",
+        )
+        resp = await async_views.api_new_note(request)
+        self.assertEqual(resp.status_code, 403)
+
+    async def test_api_new_note_creates_note_with_tags(self):
+        request = self.factory.post(
+            "/notes/api/new/",
+            data=json.dumps({"title": "Nieuw", "body": "b", "tags": ["z", "a", "z"]}),
+            content_type="application/json",
+            headers={"X-API-KEY": settings.API_KEY},
+        )
+        resp = await async_views.api_new_note(request)
+        self.assertEqual(resp.status_code, 201)
+        payload = json.loads(resp.content)
+        self.assertEqual(payload["tags"], ["a", "z"])
+        note = await Note.objects.aget(pk=payload["id"])
+        names = [t.name async for t in note.tags.all()]
+        self.assertEqual(names, ["a", "z"])
+
+    async def test_public_views(self):
+        resp = await async_views.public_list_notes(self.factory.get("/notes/pub/"))
+        self.assertContains(resp, "Async note")
+        self.assertContains(resp, "openbaar")
+
+        resp = await async_views.public_detail_note(
+            self.factory.get("/notes/pub/1/"), pk=self.note.pk
+        )
+        self.assertContains(resp, "<strong>vet</strong>")
+
+        with self.assertRaises(Http404):
+            await async_views.public_detail_note(
+                self.factory.get("/notes/pub/0/"), pk=0
+            )
@@ -0,0 +1,102 @@
+"""
+Tests voor gecomprimeerde grote bodies en deferred bodies in lijsten.
+"""
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.bulk import duplicate_notes
+from notes.exchange import iter_note_records
+from notes.models import Note, NoteBody
+
+BIG = "".join(f"regel {i} met wat tekst\n" for i in range(200))
+
+
+@override_settings(NOTES_BODY_EXTERNAL_THRESHOLD=1024)
+class LargeBodyTests(TestCase):
+    def test_small_body_stays_inline(self):
+        note = Note.objects.create(title="Klein", body="kort")
+        self.assertFalse(note.body_external)
+        self.assertFalse(NoteBody.objects.exists())
+
+    def test_large_body_is_compressed_and_transparent(self):
+        note = Note.objects.create(title="Groot", body=BIG)
+
+        row = Note.objects.filter(pk=note.pk).values("body", "body_external").get()
+        self.assertEqual(row, {"body": "", "body_external": True})
+        blob = NoteBody.objects.get(note=note)
+        self.assertLess(len(blob.data), len(BIG) // 2)
+
+        fresh = Note.objects.get(pk=note.pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(fresh.body, BIG)
+        with self.assertNumQueries(0):
+            self.assertEqual(fresh.body, BIG)
+
+    def test_shrinking_body_removes_blob(self):
+        note = Note.objects.create(title="Groot", body=BIG)
+        note = Note.objects.get(pk=note.pk)
+        note.body = "nu kort"
+        note.save()
+
+        self.assertFalse(NoteBody.objects.exists())
+        self.assertEqual(Note.objects.get(pk=note.pk).body, "nu kort")
+
+    def test_clearing_loaded_large_body(self):
+        note = Note.objects.create(title="Groot", body=BIG)
+        note = Note.objects.get(pk=note.pk)
+        note.body = ""
+        self.assertEqual(note.body, "")
+        note.save()
+
+        self.assertFalse(NoteBody.objects.exists())
+        self.assertEqual(Note.objects.get(pk=note.pk).body, "")
+
+    @override_settings(NOTES_SEARCH_BACKEND="db")
+    def test_db_search_finds_text_in_external_body(self):
+        note = Note.objects.create(title="Groot", body=BIG + "naald in de hooiberg")
+        self.assertTrue(Note.objects.get(pk=note.pk).body_external)
+
+        resp = self.client.get(reverse("notes:list"), {"q": "Naald"})
+        self.assertEqual([n.pk for n in resp.context["notes"]], [note.pk])
+        resp = self.client.get(reverse("notes:api_list"), {"q": "naald"})
+        self.assertEqual([n["id"] for n in resp.json()], [note.pk])
+
+    def test_bulk_create_and_duplicate(self):
+        (note,) = Note.objects.bulk_create([Note(title="Bulk", body=BIG)])
+        (copy,) = duplicate_notes([note.pk])
+
+        self.assertEqual(NoteBody.objects.count(), 2)
+        self.assertEqual(Note.objects.get(pk=copy.pk).body, BIG)
+
+    def test_export_joins_blobs(self):
+        Note.objects.create(title="Groot", body=BIG)
+        Note.objects.create(title="Klein", body="kort")
+
+        with self.assertNumQueries(2):  # notes (+ blob join) en tags
+            records = list(iter_note_records())
+        self.assertEqual(sorted(r["body"] for r in records), sorted([BIG, "kort"]))
+
+    def test_detail_page_shows_large_body(self):
+        note = Note.objects.create(title="Groot", body=BIG)
+        resp = self.client.get(reverse("notes:detail", args=[note.pk]))
+        self.assertContains(resp, "regel 199 met wat tekst")
+
+
+class DeferredListTests(TestCase):
+    def test_list_views_do_not_select_body(self):
+        Note.objects.create(title="Een", body="geheime inhoud")
+        body_column = '"notes_note"."body"'
+
+        for name in ("notes:list", "notes:public_list", "notes:api_list", "home"):
+            with self.subTest(view=name):
+                with CaptureQueriesContext(connection) as ctx:
+                    self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+                selects = [
+                    q["sql"] for q in ctx.captured_queries if "notes_note" in q["sql"]
+                ]
+                self.assertTrue(selects)
+                for sql in selects:
+                    self.assertNotIn(body_column, sql.split("FROM")[0])
@@ -0,0 +1,164 @@
+"""
+Tests voor de bulkacties op de notitielijst.
+"""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes import bulk, search
+from notes.models import Note, NoteLink, NoteRevision, Tag
+
+
+class BulkActionTests(TestCase):
+    def setUp(self):
+        self.werk = Tag.objects.create(name="werk")
+        self.idee = Tag.objects.create(name="idee")
+        self.notes = [Note.objects.create(title=f"Note {i}") for i in range(5)]
+        for n in self.notes:
+            n.tags.set([self.werk, self.idee])
+        self.url = reverse("notes:bulk")
+
+    def ids(self, notes):
+        return [n.pk for n in notes]
+
+    def test_list_has_checkboxes(self):
+        resp = self.client.get(reverse("notes:list"))
+        self.assertContains(resp, 'name="note"', count=5)
+        self.assertContains(resp, reverse("notes:bulk"))
+
+    def test_bulk_delete(self):
+        resp = self.client.post(
+            self.url, {"action": "delete", "note": self.ids(self.notes[:3])}
+        )
+        self.assertRedirects(resp, reverse("notes:list"), fetch_redirect_response=False)
+        self.assertEqual(Note.objects.count(), 2)
+        self.assertEqual(Note.tags.through.objects.count(), 4)
+
+    def test_delete_is_one_statement_per_table(self):
+        extra = [
+            Note.objects.create(title=f"Extra {i}", body="zie [[Note 0]]")
+            for i in range(20)
+        ]
+        engine = search.get_engine()
+
+        def delete(notes):
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                with CaptureQueriesContext(connection) as ctx:
+                    deleted = bulk.delete_notes(self.ids(notes))
+            self.assertEqual(deleted, len(notes))
+            return len(ctx.captured_queries), len(callbacks)
+
+        # savepoint, één statement per tabel die naar notes wijst, de
+        # notes zelf, release; één callback voor de zoekindex en één
+        # voor het dashboard, hoeveel notes het ook zijn
+        small = delete(self.notes[:2])
+        large = delete(extra + self.notes[2:3])
+        self.assertEqual(small, large)
+        self.assertEqual(small[1], 2)
+
+        remaining = set(Note.objects.values_list("pk", flat=True))
+        self.assertEqual(remaining, set(self.ids(self.notes[3:])))
+        self.assertEqual(
+            set(Note.tags.through.objects.values_list("note_id", flat=True)),
+            remaining,
+        )
+        self.assertFalse(NoteLink.objects.exists())
+        self.assertFalse(NoteRevision.objects.exclude(note_id__in=remaining).exists())
+        self.assertEqual(engine.indexed_ids(), remaining)
+
+    def test_delete_unlinks_backlinks(self):
+        target = self.notes[0]
+        source = Note.objects.create(title="Bron", body="zie [[Note 0]]")
+        bulk.delete_notes([target.pk])
+        link = NoteLink.objects.get(source=source)
+        self.assertIsNone(link.target_id)
+        self.assertEqual(link.target_title, "Note 0")
+
+    def test_bulk_tag_and_untag(self):
+        nieuw = Tag.objects.create(name="nieuw")
+        self.client.post(
+            self.url, {"action": "tag", "tag": "nieuw", "note": self.ids(self.notes)}
+        )
+        self.assertEqual(nieuw.notes.count(), 5)
+
+        # opnieuw taggen mag geen duplicaten/fouten geven
+        self.client.post(
+            self.url, {"action": "tag", "tag": "nieuw", "note": self.ids(self.notes)}
+        )
+        self.assertEqual(nieuw.notes.count(), 5)
+
+        self.client.post(
+            self.url,
+            {"action": "untag", "tag": "werk", "note": self.ids(self.notes[:2])},
+        )
+        self.assertEqual(self.werk.notes.count(), 3)
+
+    def test_duplicate_uses_constant_queries(self):
+        extra = [Note.objects.create(title=f"Extra {i}") for i in range(20)]
+        for n in extra:
+            n.tags.set([self.werk])
+        ids = self.ids(self.notes + extra)
+
+        # select originelen, savepoint, insert notes, job `notes.plain_text`
+        # (unique: select + insert), select links, insert links, job
+        # `notes.created`, release
+        with self.settings(NOTES_JOBS_EAGER=False), self.assertNumQueries(9):
+            copies = bulk.duplicate_notes(ids)
+
+        self.assertEqual(len(copies), 25)
+        self.assertEqual(
+            Note.objects.filter(title__startswith="Kopie van ").count(), 25
+        )
+        copy = Note.objects.get(title="Kopie van Note 0")
+        self.assertEqual(
+            sorted(copy.tags.values_list("name", flat=True)), ["idee", "werk"]
+        )
+
+    def test_duplicate_gets_links_and_a_revision(self):
+        target = Note.objects.create(title="Doel")
+        source = Note.objects.create(title="Bron", body="zie [[Doel]]")
+        (copy,) = bulk.duplicate_notes([source.pk])
+
+        self.assertEqual(
+            list(copy.outgoing_links.values_list("target_id", flat=True)),
+            [target.pk],
+        )
+        self.assertEqual(
+            set(target.backlinks.values_list("source__title", flat=True)),
+            {"Bron", "Kopie van Bron"},
+        )
+        self.assertEqual(
+            list(
+                NoteRevision.objects.filter(note=copy).values_list("version", "title")
+            ),
+            [(1, "Kopie van Bron")],
+        )
+
+    def test_tag_ignores_missing_notes(self):
+        nieuw = Tag.objects.create(name="nieuw")
+        gone = Note.objects.create(title="Weg")
+        gone_pk = gone.pk
+        gone.delete()
+
+        resp = self.client.post(
+            self.url,
+            {"action": "tag", "tag": "nieuw", "note": [self.notes[0].pk, gone_pk]},
+            follow=True,
+        )
+        self.assertContains(resp, "toegevoegd aan 1 notitie(s)")
+        self.assertEqual(list(nieuw.notes.all()), [self.notes[0]])
+        connection.check_constraints()
+
+    def test_tag_action_requires_existing_tag(self):
+        resp = self.client.post(
+            self.url,
+            {"action": "tag", "tag": "bestaatniet", "note": self.ids(self.notes)},
+            follow=True,
+        )
+        self.assertContains(resp, "Kies een bestaande tag.")
+
+    def test_get_not_allowed(self):
+        resp = self.client.get(self.url)
+        self.assertEqual(resp.status_code, 400)
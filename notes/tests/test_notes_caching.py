@@ -0,0 +1,110 @@
+"""
+Tests voor de gedeelde SQLite-cache en notes.caching.
+"""
+
+import threading
+import time
+from io import StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase
+
+from notes import caching
+from notes.models import Note
+
+
+class SQLiteCacheTests(TestCase):
+    def test_basic_operations(self):
+        cache.set("a", {"x": 1})
+        self.assertEqual(cache.get("a"), {"x": 1})
+        self.assertFalse(cache.add("a", 2))
+        self.assertTrue(cache.add("b", 2))
+        self.assertEqual(cache.incr("b", 3), 5)
+        cache.set_many({"c": 1, "d": 2})
+        self.assertEqual(
+            cache.get_many(["a", "c", "d", "x"]), {"a": {"x": 1}, "c": 1, "d": 2}
+        )
+        cache.delete_many(["c", "d"])
+        self.assertFalse(cache.has_key("c"))
+        with self.assertRaises(ValueError):
+            cache.incr("ontbreekt")
+
+    def test_expired_entries_are_misses_and_can_be_added(self):
+        cache.set("kort", 1, 1)
+        with mock.patch("time.time", return_value=time.time() + 5):
+            self.assertIsNone(cache.get("kort"))
+            self.assertTrue(cache.add("kort", 2))
+        self.assertEqual(cache.get("kort"), 2)
+
+    def test_shared_between_threads(self):
+        cache.set("gedeeld", "ja")
+        seen = []
+        thread = threading.Thread(target=lambda: seen.append(cache.get("gedeeld")))
+        thread.start()
+        thread.join()
+        self.assertEqual(seen, ["ja"])
+
+
+class CachingTests(TestCase):
+    def test_bump_invalidates_namespace(self):
+        old = caching.key_prefix("demo")
+        caching.bump("demo")
+        self.assertNotEqual(caching.key_prefix("demo"), old)
+        self.assertEqual(caching.key_prefix("ander"), caching.key_prefix("ander"))
+
+    def test_long_keys_are_hashed(self):
+        key = caching.make_key("notes:x:g1", "a b", "c" * 300)
+        self.assertLessEqual(len(key), caching.MAX_KEY_LENGTH)
+        self.assertNotIn(" ", key)
+
+    def test_get_or_compute_computes_once(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return "waarde"
+
+        for _ in range(3):
+            self.assertEqual(caching.get_or_compute("demo", [1], compute), "waarde")
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(caching.stats()["demo"], {"hits": 2, "misses": 1, "early": 0})
+
+    def test_locked_miss_waits_for_other_process(self):
+        key = caching.make_key(caching.key_prefix("demo"), 2)
+        cache.add(key + ":lock", 1)
+
+        def other_process():
+            time.sleep(0.1)
+            cache.set(key, ("van ander", 0.1, time.time() + 60))
+
+        threading.Thread(target=other_process).start()
+        value = caching.get_or_compute("demo", [2], lambda: "zelf berekend")
+        self.assertEqual(value, "van ander")
+
+    def test_near_expiry_recomputes_early(self):
+        # berekening van 1 s, nog 0,5 s geldig
+        key = caching.make_key(caching.key_prefix("demo"), 3)
+        cache.set(key, ("oud", 1.0, time.time() + 0.5))
+        with mock.patch("random.random", return_value=0.0):
+            value = caching.get_or_compute("demo", [3], lambda: "nieuw")
+        self.assertEqual(value, "oud")
+        with mock.patch("random.random", return_value=0.999):
+            value = caching.get_or_compute("demo", [3], lambda: "nieuw")
+        self.assertEqual(value, "nieuw")
+
+    def test_markdown_render_is_cached(self):
+        Note.objects.create(title="Doel")
+        template = Template("{% load markdown_extras %}{{ body|markdownify }}")
+        context = Context({"body": "Zie [[Doel]] en **vet**"})
+        first = template.render(context)
+        with self.assertNumQueries(1):  # enkel de wiki-link-titels
+            self.assertEqual(template.render(context), first)
+
+    def test_stats_command(self):
+        caching.get_or_compute("demo", [4], lambda: 1)
+        out = StringIO()
+        call_command("cache", "stats", stdout=out)
+        self.assertIn("demo: 0 hits, 1 misses", out.getvalue())
@@ -0,0 +1,54 @@
+"""
+Tests voor de compressie van dynamische responses
+(siteproject.compression).
+"""
+
+import gzip
+
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.models import Note
+from siteproject.compression import choose_encoding
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        for i in range(40):
+            Note.objects.create(title=f"Notitie nummer {i}", body="tekst")
+
+    def test_negotiation(self):
+        both = ("br", "gzip")
+        self.assertEqual(choose_encoding("gzip, deflate, br", both), "br")
+        self.assertEqual(choose_encoding("br;q=0.5, gzip", both), "gzip")
+        self.assertEqual(choose_encoding("*", both), "br")
+        self.assertEqual(choose_encoding("gzip;q=0, identity", both), None)
+        self.assertEqual(choose_encoding("br", ("gzip",)), None)
+
+    def test_api_list_is_compressed(self):
+        url = reverse("notes:api_list")
+        plain = self.client.get(url)
+        self.assertFalse(plain.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", plain["Vary"])
+
+        first = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(first["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(first.content), plain.content)
+        self.assertEqual(first["Content-Length"], str(len(first.content)))
+
+        second = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+        # deterministisch (mtime=0): zelfde bytes zonder cache
+        self.assertEqual(second.content, first.content)
+
+    def test_small_and_uncompressible_responses_are_left_alone(self):
+        Note.objects.all().delete()
+        resp = self.client.get(reverse("notes:api_list"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(resp.has_header("Content-Encoding"))
+
+        resp = self.client.get(reverse("notes:export"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertFalse(resp.has_header("Content-Encoding"))
+
+    def test_personal_pages_are_compressed_with_gzip(self):
+        resp = self.client.get(reverse("notes:new"), HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(resp["Content-Encoding"], "gzip")
+        self.assertIn(b"csrfmiddlewaretoken", gzip.decompress(resp.content))
@@ -0,0 +1,78 @@
+"""
+Tests voor de dashboardgegevens (notes.dashboard) en de homepage.
+"""
+
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from notes import tag_ops
+from notes.dashboard import build, dashboard_data
+from notes.models import Note, Tag
+
+
+class DashboardTests(TestCase):
+    def setUp(self):
+        self.werk = Tag.objects.create(name="werk")
+        self.thuis = Tag.objects.create(name="thuis")
+        for i in range(7):
+            note = Note.objects.create(title=f"Note {i}", body="tekst")
+            note.tags.add(self.werk)
+            if i < 2:
+                note.tags.add(self.thuis)
+        old = Note.objects.create(title="Oud")
+        Note.objects.filter(pk=old.pk).update(
+            created_at=timezone.now() - timedelta(days=30),
+            updated_at=timezone.now() - timedelta(days=30),
+        )
+
+    def test_build(self):
+        with self.assertNumQueries(5):
+            data = build()
+        self.assertEqual(
+            [n["title"] for n in data["recent_notes"]],
+            ["Note 6", "Note 5", "Note 4", "Note 3", "Note 2"],
+        )
+        self.assertEqual(
+            data["top_tags"],
+            [{"name": "werk", "note_count": 7}, {"name": "thuis", "note_count": 2}],
+        )
+        self.assertEqual(
+            data["totals"],
+            {
+                "notes": 8,
+                "tags": 2,
+                "created_recently": 7,
+                "updated_recently": 7,
+                "recent_days": 7,
+            },
+        )
+
+    def test_warm_home_needs_no_query(self):
+        url = reverse("home")
+        cold = self.client.get(url)
+        self.assertContains(cold, "werk</a>\n          (7)")
+        with self.assertNumQueries(0):
+            warm = self.client.get(url)
+        self.assertEqual(warm.content, cold.content)
+
+    def test_note_changes_invalidate(self):
+        dashboard_data()
+        with self.captureOnCommitCallbacks(execute=True):
+            Note.objects.create(title="Nieuwste")
+        data = dashboard_data()
+        self.assertEqual(data["recent_notes"][0]["title"], "Nieuwste")
+        self.assertEqual(data["totals"]["notes"], 9)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Note.objects.get(title="Nieuwste").delete()
+        self.assertEqual(dashboard_data()["totals"]["notes"], 8)
+
+    def test_tag_operations_without_signals_invalidate(self):
+        dashboard_data()
+        with self.captureOnCommitCallbacks(execute=True):
+            tag_ops.rename_tag(self.werk, "kantoor")
+        names = [t["name"] for t in dashboard_data()["top_tags"]]
+        self.assertEqual(names, ["kantoor", "thuis"])
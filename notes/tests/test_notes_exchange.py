@@ -0,0 +1,124 @@
+"""
+Tests voor de streaming import/export commands (NDJSON en CSV).
+"""
+
+import csv
+import io
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from notes.models import Note, Tag
+
+
+class ExportImportTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        werk = Tag.objects.create(name="werk")
+        idee = Tag.objects.create(name="idee")
+        for i in range(7):
+            n = Note.objects.create(title=f"Note {i}", body=f"regel 1\nregel {i}")
+            n.tags.set([werk, idee] if i % 2 else [werk])
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.tmp.name, name)
+
+    def run_cmd(self, *args):
+        call_command(*args, stdout=StringIO(), stderr=StringIO())
+
+    def snapshot(self):
+        return sorted(
+            (n.title, n.body, tuple(sorted(t.name for t in n.tags.all())))
+            for n in Note.objects.prefetch_related("tags")
+        )
+
+    def roundtrip(self, filename):
+        before = self.snapshot()
+        created = dict(Note.objects.values_list("title", "created_at"))
+        self.run_cmd("export_notes", self.path(filename), "--batch-size", "3")
+
+        Note.objects.all().delete()
+        Tag.objects.all().delete()
+        self.run_cmd("import_notes", self.path(filename), "--batch-size", "3")
+
+        self.assertEqual(self.snapshot(), before)
+        self.assertEqual(dict(Note.objects.values_list("title", "created_at")), created)
+
+    def test_ndjson_roundtrip(self):
+        self.roundtrip("notes.ndjson")
+
+    def test_csv_roundtrip(self):
+        self.roundtrip("notes.csv")
+
+    def test_export_resume_appends_remaining_notes(self):
+        path = self.path("notes.ndjson")
+        first_ids = list(Note.objects.order_by("pk").values_list("pk", flat=True))[:3]
+        self.run_cmd("export_notes", path)
+        with open(path, encoding="utf-8") as fh:
+            lines = fh.readlines()
+        # simuleer een onderbroken export na 3 records
+        with open(path, "w", encoding="utf-8") as fh:
+            fh.writelines(lines[:3])
+
+        self.run_cmd("export_notes", path, "--resume")
+
+        with open(path, encoding="utf-8") as fh:
+            ids = [json.loads(line)["id"] for line in fh]
+        self.assertEqual(ids[:3], first_ids)
+        self.assertEqual(len(ids), 7)
+        self.assertEqual(len(set(ids)), 7)
+
+    def interrupted(self, filename, marker):
+        """Exporteer, kap af vóór `marker` (in het 4de record) en hervat."""
+        path = self.path(filename)
+        self.run_cmd("export_notes", path)
+        with open(path, "rb") as fh:
+            data = fh.read()
+        end = data.index(marker)
+        with open(path, "wb") as fh:
+            fh.write(data[:end])
+
+        self.run_cmd("export_notes", path, "--resume")
+        with open(path, "rb") as fh:
+            return self.ids_in(fh.read(), filename)
+
+    def ids_in(self, data, filename):
+        text = data.decode("utf-8")
+        if filename.endswith(".csv"):
+            return [int(r["id"]) for r in csv.DictReader(io.StringIO(text, newline=""))]
+        return [json.loads(line)["id"] for line in text.splitlines()]
+
+    def test_export_resume_drops_incomplete_ndjson_line(self):
+        # afgebroken midden in de JSON van het 4de record
+        ids = self.interrupted("notes.ndjson", b'Note 3"')
+        self.assertEqual(ids, self.all_ids())
+
+    def test_export_resume_drops_incomplete_csv_row(self):
+        # afgebroken in de body ("regel 1\nregel ...") van het 4de record
+        ids = self.interrupted("notes.csv", b"regel 3")
+        self.assertEqual(ids, self.all_ids())
+
+    def all_ids(self):
+        return list(Note.objects.order_by("pk").values_list("pk", flat=True))
+
+    def test_import_resume_skips_checkpointed_records(self):
+        path = self.path("notes.ndjson")
+        self.run_cmd("export_notes", path)
+        Note.objects.all().delete()
+        with open(f"{path}.checkpoint", "w", encoding="ascii") as fh:
+            fh.write("5")
+
+        self.run_cmd("import_notes", path, "--resume")
+
+        self.assertEqual(
+            sorted(Note.objects.values_list("title", flat=True)), ["Note 5", "Note 6"]
+        )
+        with open(f"{path}.checkpoint", encoding="ascii") as fh:
+            self.assertEqual(fh.read(), "7")
@@ -0,0 +1,66 @@
+"""
+Tests voor de fragmentcache van lijstitems (notes.fragments).
+"""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes import bulk, tag_ops
+from notes.fragments import render_items
+from notes.models import Note, Tag
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        self.werk = Tag.objects.create(name="werk")
+        self.notes = [Note.objects.create(title=f"Note {i}") for i in range(20)]
+        self.notes[0].tags.add(self.werk)
+
+    def render(self):
+        return render_items(
+            Note.objects.order_by("pk").defer("body"), "notes/_public_list_item.html"
+        )
+
+    def test_warm_list_needs_no_tag_query(self):
+        cold = self.render()
+        self.assertIn("werk", cold[0])
+
+        with CaptureQueriesContext(connection) as ctx:
+            warm = self.render()
+        self.assertEqual(warm, cold)
+        self.assertEqual(len(ctx), 1)  # enkel de notes zelf
+
+    def test_changed_note_is_rerendered(self):
+        self.render()
+        note = self.notes[3]
+        note.title = "Nieuwe titel"
+        note.save()
+        with CaptureQueriesContext(connection) as ctx:
+            items = self.render()
+        self.assertIn("Nieuwe titel", items[3])
+        self.assertEqual(len(ctx), 2)  # notes + tags van de ene gemiste note
+
+    def test_tag_changes_bump_generation(self):
+        self.render()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notes[1].tags.add(self.werk)
+        self.assertIn("werk", self.render()[1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            tag_ops.rename_tag(self.werk, "kantoor")
+        self.assertIn("kantoor", self.render()[0])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            bulk.untag_notes([self.notes[0].pk], Tag.objects.get(name="kantoor"))
+        self.assertNotIn("kantoor", self.render()[0])
+
+    def test_list_pages_render_items(self):
+        resp = self.client.get(reverse("notes:public_list"))
+        self.assertContains(
+            resp, reverse("notes:public_detail", args=[self.notes[0].pk])
+        )
+        resp = self.client.get(reverse("notes:list"), {"tag": "werk"})
+        self.assertContains(resp, 'name="note" value="%d"' % self.notes[0].pk)
+        self.assertNotContains(resp, "Note 5")
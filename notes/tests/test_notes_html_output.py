@@ -0,0 +1,49 @@
+"""
+Tests voor de HTML-output: geen inline styles in de lijsten en optionele
+minificatie (siteproject.html_minify).
+"""
+
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.models import Note, Tag
+from siteproject.html_minify import minify_html
+
+
+class HtmlOutputTests(TestCase):
+    def setUp(self):
+        note = Note.objects.create(title="Een", body="```\ncode   met  spaties\n```")
+        note.tags.add(Tag.objects.create(name="werk"))
+        self.note = note
+
+    def test_tag_chips_use_classes(self):
+        for url in (
+            reverse("notes:list"),
+            reverse("notes:public_list"),
+            reverse("notes:public_detail", args=[self.note.pk]),
+        ):
+            with self.subTest(url=url):
+                resp = self.client.get(url)
+                self.assertContains(resp, '<span class="tag-chip">werk</span>')
+                self.assertNotContains(resp, "style=")
+
+    def test_minify_keeps_pre_and_attributes(self):
+        html = (
+            "<ul>\n    <li>  a  </li>\n</ul>\n"
+            '<input value="x   y">\n<pre>  b\n    c</pre>\n<textarea>\n  d</textarea>'
+        )
+        self.assertEqual(
+            minify_html(html),
+            '<ul>\n<li> a </li>\n</ul>\n<input value="x   y">\n'
+            "<pre>  b\n    c</pre>\n<textarea>\n  d</textarea>",
+        )
+
+    def test_minified_page(self):
+        plain_size = len(self.client.get(reverse("notes:list")).content)
+        with self.settings(NOTES_MINIFY_HTML=True):
+            client = self.client_class()
+            resp = client.get(reverse("notes:public_detail", args=[self.note.pk]))
+            self.assertNotContains(resp, "\n  ")
+            self.assertContains(resp, "code   met  spaties")
+            minified_size = len(client.get(reverse("notes:list")).content)
+        self.assertLess(minified_size, plain_size)
@@ -0,0 +1,131 @@
+"""
+Tests voor de database-jobqueue en `manage.py run_worker`.
+"""
+
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from notes import jobs
+from notes.models import Job, Note, Tag
+
+calls = []
+
+
+@jobs.job("test.record")
+def record(value):
+    calls.append(value)
+
+
+@jobs.job("test.fail")
+def fail():
+    raise RuntimeError("boem")
+
+
+@override_settings(NOTES_JOBS_EAGER=False)
+class JobQueueTests(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_enqueue_and_run_pending(self):
+        jobs.enqueue("test.record", {"value": 1})
+        jobs.enqueue("test.record", {"value": 2})
+        self.assertEqual(jobs.run_pending(), 2)
+        self.assertEqual(calls, [1, 2])
+
+        done = Job.objects.filter(status=Job.DONE)
+        self.assertEqual(done.count(), 2)
+        self.assertTrue(all(j.duration_ms is not None for j in done))
+
+    def test_unique_enqueue_skips_duplicates(self):
+        self.assertIsNotNone(jobs.enqueue("test.record", {"value": 1}, unique=True))
+        self.assertIsNone(jobs.enqueue("test.record", {"value": 1}, unique=True))
+        self.assertEqual(Job.objects.count(), 1)
+
+    def test_claim_is_exclusive(self):
+        jobs.enqueue("test.record", {"value": 1})
+        first = jobs.claim_next("w1")
+        self.assertEqual(first.status, Job.RUNNING)
+        self.assertEqual(first.locked_by, "w1")
+        self.assertIsNone(jobs.claim_next("w2"))
+
+    def test_failed_job_is_retried_then_marked_failed(self):
+        job_obj = jobs.enqueue("test.fail", max_attempts=2)
+        jobs.run_pending()
+        job_obj.refresh_from_db()
+        self.assertEqual(job_obj.status, Job.QUEUED)
+        self.assertIn("boem", job_obj.last_error)
+        self.assertGreater(job_obj.run_after, timezone.now())
+
+        Job.objects.update(run_after=timezone.now())
+        jobs.run_pending()
+        job_obj.refresh_from_db()
+        self.assertEqual(job_obj.status, Job.FAILED)
+        self.assertEqual(job_obj.attempts, 2)
+
+    def test_requeue_stale(self):
+        Job.objects.create(
+            name="test.record",
+            status=Job.RUNNING,
+            locked_at=timezone.now() - jobs.STALE_AFTER * 2,
+        )
+        self.assertEqual(jobs.requeue_stale(), 1)
+
+    def test_purge_finished_keeps_recent_and_pending_jobs(self):
+        now = timezone.now()
+        old = now - timedelta(days=30)
+        for status in (Job.DONE, Job.FAILED, Job.QUEUED):
+            Job.objects.create(name="test.record", status=status, finished_at=old)
+        recent = Job.objects.create(
+            name="test.record", status=Job.DONE, finished_at=now
+        )
+        failed = Job.objects.create(
+            name="test.record", status=Job.FAILED, finished_at=now - timedelta(days=2)
+        )
+
+        self.assertEqual(jobs.purge_finished(now), 2)
+        self.assertEqual(
+            set(Job.objects.exclude(status=Job.QUEUED).values_list("pk", flat=True)),
+            {recent.pk, failed.pk},
+        )
+
+    def test_run_worker_purges_finished_jobs(self):
+        Job.objects.create(
+            name="test.record",
+            status=Job.DONE,
+            finished_at=timezone.now() - timedelta(days=30),
+        )
+        err = StringIO()
+        call_command("run_worker", "--once", stdout=StringIO(), stderr=err)
+        self.assertFalse(Job.objects.exists())
+        self.assertIn("1 afgewerkte job(s) opgeruimd", err.getvalue())
+
+    def test_run_worker_once_runs_registered_task(self):
+        keep = Tag.objects.create(name="werk")
+        old = Tag.objects.create(name="Werk")
+        jobs.enqueue("tags.merge", {"source_ids": [old.pk], "target_id": keep.pk})
+
+        out = StringIO()
+        call_command("run_worker", "--once", stdout=out, stderr=StringIO())
+
+        self.assertIn("1 job(s) verwerkt", out.getvalue())
+        self.assertFalse(Tag.objects.filter(pk=old.pk).exists())
+
+    def test_note_save_queues_post_save_work(self):
+        note = Note.objects.create(title="Nieuw", body="zie [[Ander]]")
+        note.body = "zie [[Ander]] en [[Derde]]"
+        note.save()
+        self.assertEqual(
+            sorted(Job.objects.values_list("name", flat=True)),
+            # één versie per save, de rest één keer per note
+            ["notes.links", "notes.plain_text", "notes.revision", "notes.revision"],
+        )
+        self.assertFalse(note.revisions.exists())
+
+        jobs.run_pending()
+        self.assertEqual(note.revisions.count(), 2)
+        self.assertEqual(note.outgoing_links.count(), 2)
+        self.assertEqual(note.plain_text.text, "zie [[Ander]] en [[Derde]]")
@@ -0,0 +1,96 @@
+"""
+Tests voor [[wiki-links]], de linkindex en backlinks.
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from notes.links import backlinks, extract_link_titles, rebuild_links
+from notes.models import Note, NoteLink
+
+
+class ExtractTests(TestCase):
+    def test_titles_are_unique_and_normalized(self):
+        text = "Zie [[Recepten]], [[ Recepten ]] en [[Boodschappen|de lijst]]. [[]]"
+        self.assertEqual(extract_link_titles(text), ["Recepten", "Boodschappen"])
+
+
+class LinkIndexTests(TestCase):
+    def links(self, note):
+        return dict(
+            NoteLink.objects.filter(source=note).values_list("target_title", "target")
+        )
+
+    def test_links_are_resolved_and_updated_incrementally(self):
+        a = Note.objects.create(title="A")
+        source = Note.objects.create(title="Bron", body="[[A]] en [[B]]")
+        self.assertEqual(self.links(source), {"A": a.pk, "B": None})
+        kept = NoteLink.objects.get(source=source, target_title="A").pk
+
+        source.body = "[[A]] en [[C]]"
+        source.save()
+        self.assertEqual(self.links(source), {"A": a.pk, "C": None})
+        # ongewijzigde link is niet herschreven
+        self.assertTrue(NoteLink.objects.filter(pk=kept).exists())
+
+    def test_new_and_renamed_notes_pick_up_links(self):
+        source = Note.objects.create(title="Bron", body="[[Later]]")
+        later = Note.objects.create(title="Later")
+        self.assertEqual(self.links(source), {"Later": later.pk})
+
+        later.title = "Anders"
+        later.save()
+        self.assertEqual(self.links(source), {"Later": None})
+
+    def test_backlinks_is_one_query(self):
+        target = Note.objects.create(title="Doel")
+        for i in range(3):
+            Note.objects.create(title=f"Bron {i}", body="naar [[Doel]]")
+
+        with self.assertNumQueries(1):
+            titles = [n.title for n in backlinks(target)]
+        self.assertEqual(titles, ["Bron 0", "Bron 1", "Bron 2"])
+
+    def test_rebuild_after_bulk_create(self):
+        target = Note.objects.create(title="Doel")
+        Note.objects.bulk_create([Note(title="Import", body="[[Doel]] [[Elders]]")])
+        self.assertEqual(NoteLink.objects.count(), 0)
+
+        self.assertEqual(rebuild_links(), 2)
+        self.assertEqual(
+            set(NoteLink.objects.values_list("target_title", "target")),
+            {("Doel", target.pk), ("Elders", None)},
+        )
+        call_command("rebuild_links", stdout=StringIO())
+        self.assertEqual(NoteLink.objects.count(), 2)
+
+
+class WikiLinkRenderTests(TestCase):
+    def test_detail_renders_links_and_backlinks(self):
+        target = Note.objects.create(title="Doel", body="tekst")
+        source = Note.objects.create(
+            title="Bron", body="Zie [[Doel|het doel]] en [[Bestaat niet]]."
+        )
+
+        html = self.client.get(reverse("notes:detail", args=[source.pk])).content
+        html = html.decode("utf-8")
+        detail_url = reverse("notes:detail", args=[target.pk])
+        self.assertIn(f'<a class="wikilink" href="{detail_url}"', html)
+        self.assertIn('<span class="wikilink missing">Bestaat niet</span>', html)
+
+        resp = self.client.get(reverse("notes:detail", args=[target.pk]))
+        self.assertContains(resp, "Links hierheen")
+        self.assertContains(resp, reverse("notes:detail", args=[source.pk]))
+
+    def test_public_detail_links_to_public_pages(self):
+        target = Note.objects.create(title="Doel")
+        source = Note.objects.create(title="Bron", body="[[Doel]]")
+
+        resp = self.client.get(reverse("notes:public_detail", args=[source.pk]))
+        self.assertContains(resp, reverse("notes:public_detail", args=[target.pk]))
+
+        resp = self.client.get(reverse("notes:public_detail", args=[target.pk]))
+        self.assertContains(resp, reverse("notes:public_detail", args=[source.pk]))
@@ -0,0 +1,112 @@
+"""
+Tests voor live updates: broadcast hub, signals en SSE-endpoint.
+"""
+
+import asyncio
+import threading
+from unittest import mock
+
+from django.test import AsyncRequestFactory, TestCase
+from django.urls import reverse
+
+from notes import async_views
+from notes.events import BroadcastHub, hub
+from notes.models import Note, Tag
+
+
+class BroadcastHubTests(TestCase):
+    def test_publish_from_other_thread_reaches_subscriber(self):
+        local_hub = BroadcastHub(queue_size=10)
+
+        async def scenario():
+            sub = local_hub.subscribe()
+            t = threading.Thread(
+                target=local_hub.publish, args=({"type": "created", "id": 1},)
+            )
+            t.start()
+            t.join()
+            event = await sub.get(timeout=1)
+            local_hub.unsubscribe(sub)
+            return event
+
+        self.assertEqual(asyncio.run(scenario()), {"type": "created", "id": 1})
+        self.assertEqual(local_hub.subscriber_count, 0)
+
+    def test_slow_client_gets_resync(self):
+        local_hub = BroadcastHub(queue_size=2)
+
+        async def scenario():
+            sub = local_hub.subscribe()
+            for i in range(5):
+                local_hub.publish({"type": "updated", "id": i})
+            await asyncio.sleep(0)
+            return [await sub.get(timeout=1) for _ in range(sub.queue.qsize())]
+
+        events = asyncio.run(scenario())
+        self.assertIn({"type": "resync"}, events)
+        self.assertLessEqual(len(events), 2)
+
+
+class LiveSignalTests(TestCase):
+    def test_note_changes_publish_events_after_commit(self):
+        received = []
+        with mock.patch("notes.signals.hub") as fake_hub:
+            fake_hub.subscriber_count = 1
+            fake_hub.publish.side_effect = received.append
+
+            with self.captureOnCommitCallbacks(execute=True):
+                note = Note.objects.create(title="Live")
+            pk = note.pk
+            with self.captureOnCommitCallbacks(execute=True):
+                note.tags.add(Tag.objects.create(name="werk"))
+            with self.captureOnCommitCallbacks(execute=True):
+                note.delete()
+
+        self.assertEqual(
+            received,
+            [
+                {"type": "created", "id": pk, "title": "Live"},
+                {"type": "updated", "id": pk, "tags": ["werk"]},
+                {"type": "deleted", "id": pk},
+            ],
+        )
+
+    def test_no_subscribers_no_queries(self):
+        note = Note.objects.create(title="Stil")
+        tag = Tag.objects.create(name="werk")
+        # enkel Django's eigen select + insert op de tussentabel
+        with self.assertNumQueries(2):
+            note.tags.add(tag)
+
+
+class NoteEventsViewTests(TestCase):
+    def test_wsgi_request_gets_204(self):
+        resp = self.client.get(reverse("notes:events"))
+        self.assertEqual(resp.status_code, 204)
+
+    def test_list_page_wires_live_script(self):
+        resp = self.client.get(reverse("notes:list"))
+        self.assertContains(resp, "data-live-url")
+        self.assertContains(resp, "js/notes_live.js")
+
+    async def test_stream_response(self):
+        request = AsyncRequestFactory().get("/notes/events/")
+        resp = await async_views.note_events(request)
+        self.assertEqual(resp["Content-Type"], "text/event-stream")
+        self.assertEqual(resp["Cache-Control"], "no-cache")
+
+    async def test_stream_yields_published_events(self):
+        stream = async_views._event_stream()
+        self.assertEqual(await anext(stream), "retry: 5000\n\n")
+        pending = asyncio.ensure_future(anext(stream))
+        await asyncio.sleep(0)
+        self.assertEqual(hub.subscriber_count, 1)
+
+        hub.publish({"type": "deleted", "id": 7})
+        chunk = await asyncio.wait_for(pending, 1)
+        self.assertEqual(
+            chunk, 'event: deleted\ndata: {"type": "deleted", "id": 7}\n\n'
+        )
+
+        await stream.aclose()
+        self.assertEqual(hub.subscriber_count, 0)
@@ -0,0 +1,168 @@
+"""
+Tests voor de queryplannen van de drukste pagina's: elke SELECT van een
+request met opgewarmd proces (zoekindex, saved searches) maar lege
+gedeelde cache wordt met EXPLAIN bekeken, op SQLite en op PostgreSQL
+als de tests daar draaien.
+
+Een plan faalt bij
+- een volledige tabelscan zonder index (behalve de kleine tabellen in
+  `SMALL_TABLES`, die de pagina toch volledig toont)
+- een sortering in een tijdelijke B-tree (SQLite) of een `Sort`-node
+  (PostgreSQL), tenzij de rijen zelf via een index opgezocht werden:
+  dan is de sortering begrensd door de filter (één tag, één saved
+  search, de zoekresultaten), niet door de grootte van de tabel
+
+De lijst van note-id's uit de zoekindex (`notes.search.pk_filter`) is
+een virtuele tabel (`json_each`) en telt als zo'n opzoeking.
+"""
+
+import json
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note, SavedSearch, Tag
+from notes.saved_searches import rebuild
+
+# volledig getoond (filterbalk, dashboard); zelf via hun unieke index
+SMALL_TABLES = {"notes_tag", "notes_savedsearch"}
+
+_SQLITE_STEP_RE = re.compile(r"^(SCAN|SEARCH) (\S+)(?: USING (.*))?")
+# Django-aliassen in subqueries en self-joins: "notes_tag" U0
+_ALIAS_RE = re.compile(r'"(\w+)" ([A-Z]\d+)\b')
+
+
+def sqlite_steps(sql):
+    with connection.cursor() as cursor:
+        cursor.execute("EXPLAIN QUERY PLAN " + sql)
+        details = [row[-1] for row in cursor.fetchall()]
+    aliases = dict((alias, table) for table, alias in _ALIAS_RE.findall(sql))
+    steps = []
+    for detail in details:
+        match = _SQLITE_STEP_RE.match(detail)
+        if match:
+            kind, table, using = match.groups()
+            table = aliases.get(table, table)
+            if "VIRTUAL TABLE" in detail:
+                # de id-lijst van pk_filter: enkel de zoekresultaten
+                kind = "SEARCH"
+            indexed = kind == "SEARCH" or bool(using and "INDEX" in using)
+            steps.append((kind.lower(), table, indexed, detail))
+        elif detail.startswith("USE TEMP B-TREE"):
+            steps.append(("sort", None, False, detail))
+    return steps
+
+
+def postgres_steps(sql):
+    with connection.cursor() as cursor:
+        # kleine testtabellen: zonder dit kiest de planner altijd een seq scan
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_sort = off")
+        cursor.execute("EXPLAIN (FORMAT JSON) " + sql)
+        (plan,) = cursor.fetchone()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    steps = []
+
+    def walk(node):
+        node_type = node["Node Type"]
+        table = node.get("Relation Name")
+        if node_type == "Seq Scan":
+            steps.append(("scan", table, False, node_type))
+        elif table is not None:
+            searched = "Index Cond" in node or node_type == "Bitmap Heap Scan"
+            steps.append(("search" if searched else "scan", table, True, node_type))
+        elif node_type in ("Sort", "Incremental Sort"):
+            steps.append(("sort", None, False, node_type))
+        for child in node.get("Plans", ()):
+            walk(child)
+
+    walk(plan[0]["Plan"])
+    return steps
+
+
+def plan_problems(sql):
+    if connection.vendor == "postgresql":
+        steps = postgres_steps(sql)
+    else:
+        steps = sqlite_steps(sql)
+    problems = []
+    for kind, table, indexed, detail in steps:
+        if kind == "scan" and not indexed and table not in SMALL_TABLES:
+            problems.append(f"volledige scan: {detail}")
+    sorts = [detail for kind, _t, _i, detail in steps if kind == "sort"]
+    unbounded = [
+        detail
+        for kind, table, _i, detail in steps
+        if kind == "scan" and table not in SMALL_TABLES
+    ]
+    if sorts and unbounded:
+        problems.append(f"sortering over {unbounded}: {sorts}")
+    return problems
+
+
+class QueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        werk = Tag.objects.create(name="werk")
+        Tag.objects.create(name="thuis")
+        for i in range(60):
+            note = Note.objects.create(
+                title=f"Notitie {i}", body=f"koffie en [[Notitie {i + 1}]]"
+            )
+            if i % 3 == 0:
+                note.tags.add(werk)
+        cls.note = note
+        saved = SavedSearch.objects.create(name="Werk", slug="werk", tag="werk")
+        rebuild([saved.pk])
+
+    def hot_paths(self):
+        return {
+            "home": reverse("home"),
+            "list": reverse("notes:list"),
+            "list_tag": reverse("notes:list") + "?tag=Werk",
+            "list_search": reverse("notes:list") + "?q=koffie",
+            "detail": reverse("notes:detail", args=[self.note.pk]),
+            "saved_search": reverse("notes:saved_search", args=["werk"]),
+            "public_list": reverse("notes:public_list"),
+            "public_detail": reverse("notes:public_detail", args=[self.note.pk]),
+            "api_list": reverse("notes:api_list"),
+        }
+
+    def test_hot_paths_use_indexes(self):
+        for name, url in self.hot_paths().items():
+            with self.subTest(name):
+                # eerst opwarmen: zoekindex, saved-search-definities e.d.;
+                # dan zonder gecachete fragmenten/dashboard
+                self.assertEqual(self.client.get(url).status_code, 200)
+                cache.clear()
+                with CaptureQueriesContext(connection) as ctx:
+                    self.client.get(url)
+                selects = [
+                    q["sql"]
+                    for q in ctx.captured_queries
+                    if q["sql"].startswith("SELECT")
+                ]
+                self.assertTrue(selects)
+                for sql in selects:
+                    self.assertEqual(plan_problems(sql), [], sql)
+
+    def test_orderings_have_matching_indexes(self):
+        cases = {
+            "notes_note_created_idx": Note.objects.defer("body"),
+            "notes_note_recent_idx": Note.objects.order_by(
+                "-updated_at", "-created_at", "title"
+            ),
+        }
+        if connection.vendor != "sqlite":
+            self.skipTest("indexnamen in het plan: enkel op SQLite nagekeken")
+        for index, qs in cases.items():
+            with self.subTest(index):
+                plan = " ".join(d for *_s, d in sqlite_steps(str(qs[:5].query)))
+                self.assertIn(index, plan)
+                self.assertNotIn("TEMP B-TREE", plan)
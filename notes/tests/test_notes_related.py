@@ -0,0 +1,83 @@
+"""
+Tests voor voorberekende verwante notities (gedeelde tags).
+"""
+
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.jobs import run_pending
+from notes.models import Job, Note, RelatedNote, Tag
+from notes.related import affected_notes
+from notes.similarity import refresh_related
+
+
+class RelatedNotesTests(TestCase):
+    def setUp(self):
+        self.a, self.b, self.c = (Tag.objects.create(name=n) for n in "abc")
+        self.n1 = Note.objects.create(title="een")
+        self.n2 = Note.objects.create(title="twee")
+        self.n3 = Note.objects.create(title="drie")
+        self.n4 = Note.objects.create(title="zonder tags")
+        self.n1.tags.set([self.a, self.b])
+        self.n2.tags.set([self.a, self.b, self.c])
+        self.n3.tags.set([self.c])
+
+    def ranking(self, note):
+        return list(
+            RelatedNote.objects.filter(note=note)
+            .order_by("rank")
+            .values_list("related__title", "score")
+        )
+
+    def test_jaccard_top_k(self):
+        refresh_related()
+
+        self.assertEqual(self.ranking(self.n1), [("twee", 2 / 3)])
+        self.assertEqual([t for t, _ in self.ranking(self.n2)], ["een", "drie"])
+        self.assertEqual(self.ranking(self.n4), [])
+
+    @override_settings(NOTES_RELATED_METRIC="cosine")
+    def test_cosine_and_k(self):
+        refresh_related(k=1)
+        ((title, score),) = self.ranking(self.n3)
+        self.assertEqual(title, "twee")
+        self.assertAlmostEqual(score, 1 / 3**0.5, places=5)
+
+    @override_settings(NOTES_JOBS_EAGER=False)
+    def test_tag_change_schedules_incremental_refresh(self):
+        refresh_related()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.n4.tags.add(self.c)
+        self.assertTrue(Job.objects.filter(name="related.refresh").exists())
+
+        self.assertEqual(affected_notes([self.n4.pk]), [self.n4.pk])
+        run_pending()
+        self.assertEqual([t for t, _ in self.ranking(self.n4)], ["drie", "twee"])
+        # n3 toonde n4 nog niet: pas bij de volledige herberekening
+        self.assertEqual([t for t, _ in self.ranking(self.n3)], ["twee"])
+
+        call_command("related_notes", stdout=StringIO())
+        self.assertEqual([t for t, _ in self.ranking(self.n3)][0], "zonder tags")
+
+    def test_refresh_updates_notes_showing_the_changed_note(self):
+        refresh_related()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.n2.tags.remove(self.a, self.b)
+
+        self.assertEqual(self.ranking(self.n1), [])
+        self.assertEqual(self.ranking(self.n3), [("twee", 1.0)])
+
+    def test_partial_matrix_matches_the_full_one(self):
+        refresh_related()
+        before = [self.ranking(self.n1), self.ranking(self.n3)]
+        refresh_related([self.n1.pk, self.n3.pk])
+        self.assertEqual([self.ranking(self.n1), self.ranking(self.n3)], before)
+
+    def test_detail_page_reads_precomputed_rows(self):
+        call_command("related_notes", stdout=StringIO())
+        resp = self.client.get(reverse("notes:detail", args=[self.n1.pk]))
+        self.assertContains(resp, "Verwante notities")
+        self.assertContains(resp, reverse("notes:detail", args=[self.n2.pk]))
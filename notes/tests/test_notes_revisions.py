@@ -0,0 +1,141 @@
+"""
+Tests voor de versiegeschiedenis met snapshots + delta's.
+"""
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes import jobs, revisions
+from notes.models import Note, NoteRevision
+from notes.revisions import apply_delta, body_at, make_delta
+
+
+class DeltaTests(TestCase):
+    def test_roundtrip(self):
+        cases = [
+            ("", "nieuw"),
+            ("a\nb\nc\n", "a\nB\nc\nd\n"),
+            ("een\ntwee\ndrie", "twee\ndrie\nvier"),
+            ("zonder newline", ""),
+        ]
+        for old, new in cases:
+            with self.subTest(old=old, new=new):
+                self.assertEqual(apply_delta(old, make_delta(old, new)), new)
+
+    def test_delta_is_small_for_small_edit(self):
+        old = "".join(f"regel {i}\n" for i in range(500))
+        new = old.replace("regel 250\n", "regel 250 aangepast\n")
+        self.assertLess(len(make_delta(old, new)), 60)
+
+
+@override_settings(NOTES_REVISION_SNAPSHOT_EVERY=5)
+class RevisionHistoryTests(TestCase):
+    def test_every_save_is_recorded_and_reconstructable(self):
+        note = Note.objects.create(title="Historiek", body="v1\n")
+        bodies = ["v1\n"]
+        for i in range(2, 13):
+            note.body = bodies[-1] + f"v{i}\n"
+            note.save()
+            bodies.append(note.body)
+
+        revisions = NoteRevision.objects.filter(note=note)
+        self.assertEqual(revisions.count(), 12)
+        self.assertEqual(
+            list(revisions.filter(is_snapshot=True).values_list("version", flat=True)),
+            [1, 6, 11],
+        )
+        for version, body in enumerate(bodies, start=1):
+            self.assertEqual(body_at(note.pk, version), body)
+
+    def test_unchanged_save_adds_no_revision(self):
+        note = Note.objects.create(title="Zelfde", body="x")
+        note.save()
+        self.assertEqual(note.revisions.count(), 1)
+
+        note.title = "Andere titel"
+        note.save()
+        self.assertEqual(note.revisions.count(), 2)
+
+    def test_reconstruction_is_one_query_per_step(self):
+        note = Note.objects.create(title="Q", body="a\n")
+        for i in range(4):
+            note.body += f"{i}\n"
+            note.save()
+        # aggregate (laatste snapshot) + rijen ophalen
+        with self.assertNumQueries(2):
+            self.assertEqual(body_at(note.pk, 5), note.body)
+
+    def test_save_reads_previous_body_from_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            note = Note.objects.create(title="Cache", body="a\n")
+        for i in range(3):
+            with self.captureOnCommitCallbacks(execute=True):
+                note.body += f"{i}\n"
+                note.save()
+
+        # geen delta's terugspelen: enkel de laatste versie + insert
+        note.body += "nog\n"
+        with mock.patch.object(revisions, "body_at", side_effect=AssertionError):
+            with self.assertNumQueries(4):  # select, savepoint, insert, release
+                revision = revisions.record_revision(note)
+        self.assertEqual(revision.version, 5)
+        self.assertEqual(body_at(note.pk, 5), note.body)
+
+    def test_stale_cache_falls_back_to_replay(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            note = Note.objects.create(title="Oud", body="a\n")
+        # versie 2 zonder commit-callbacks: de cache hoort nog bij versie 1
+        note.body = "a\nb\n"
+        note.save()
+        note.body = "a\nb\nc\n"
+        note.save()
+        self.assertEqual(body_at(note.pk, 3), "a\nb\nc\n")
+
+    def test_concurrent_version_is_retried(self):
+        note = Note.objects.create(title="Race", body="een\n")
+        stale = revisions._previous(note.pk)
+        # een andere save schreef versie 2 nadat deze save versie 1 las
+        NoteRevision.objects.create(
+            note_id=note.pk, version=2, title="Race", data='[1,["twee\\n"]]'
+        )
+        note.body = "een\ntwee\ndrie\n"
+
+        with mock.patch.object(
+            revisions, "_previous", side_effect=[stale, revisions._previous(note.pk)]
+        ):
+            revision = revisions.record_revision(note)
+        self.assertEqual(revision.version, 3)
+        self.assertEqual(body_at(note.pk, 2), "een\ntwee\n")
+        self.assertEqual(body_at(note.pk, 3), "een\ntwee\ndrie\n")
+
+    def test_edit_view_records_revision(self):
+        note = Note.objects.create(title="Via form", body="oud")
+        self.client.post(
+            reverse("notes:edit", args=[note.pk]),
+            {"title": "Via form", "body": "nieuw"},
+        )
+        self.assertEqual(body_at(note.pk, 1), "oud")
+        self.assertEqual(body_at(note.pk, 2), "nieuw")
+
+
+@override_settings(NOTES_JOBS_EAGER=False)
+class QueuedRevisionTests(TestCase):
+    def test_each_save_before_the_worker_is_a_version(self):
+        note = Note.objects.create(title="Wachtrij", body="v1\n")
+        for body in ("v2\n", "v3\n"):
+            note.body = body
+            note.save()
+        self.assertFalse(note.revisions.exists())
+
+        jobs.run_pending()
+        self.assertEqual(note.revisions.count(), 3)
+        for version, body in enumerate(["v1\n", "v2\n", "v3\n"], start=1):
+            self.assertEqual(body_at(note.pk, version), body)
+
+    def test_deleted_note_gets_no_revision(self):
+        note = Note.objects.create(title="Weg", body="x")
+        Note.objects.filter(pk=note.pk).delete()
+        jobs.run_pending()
+        self.assertFalse(NoteRevision.objects.exists())
@@ -0,0 +1,118 @@
+"""
+Tests voor gematerialiseerde saved searches.
+"""
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes import bulk, saved_searches
+from notes.jobs import run_pending
+from notes.models import Job, Note, SavedSearch, Tag
+
+
+class SavedSearchTests(TestCase):
+    def setUp(self):
+        self.werk = Tag.objects.create(name="Werk")
+        self.n1 = Note.objects.create(title="Planning", body="Sprint en review")
+        self.n2 = Note.objects.create(title="Boodschappen", body="melk")
+        self.n1.tags.add(self.werk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.search = SavedSearch.objects.create(
+                name="Werk reviews", slug="werk-reviews", tag="werk", query="Review"
+            )
+        run_pending()
+
+    def members(self):
+        return set(self.search.notes.values_list("title", flat=True))
+
+    def test_creating_a_search_fills_members(self):
+        self.assertEqual(self.members(), {"Planning"})
+
+    def test_save_updates_only_that_note(self):
+        self.n2.body = "review van de week"
+        self.n2.save()
+        self.assertEqual(self.members(), {"Planning"})  # tag ontbreekt nog
+
+        self.n2.tags.add(self.werk)
+        self.assertEqual(self.members(), {"Planning", "Boodschappen"})
+
+        self.n1.title, self.n1.body = "Planning", "enkel sprint"
+        self.n1.save()
+        self.assertEqual(self.members(), {"Boodschappen"})
+
+    def test_unchanged_membership_writes_nothing(self):
+        saved_searches.definitions()
+        self.n1.title = "Planning Q3"
+        with self.assertNumQueries(3):  # tags, platte tekst, lidmaatschappen
+            saved_searches.update_memberships(self.n1)
+
+    @override_settings(NOTES_JOBS_EAGER=False)
+    def test_bulk_paths_schedule_rebuild(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            (note,) = Note.objects.bulk_create([Note(title="Review import")])
+            bulk.tag_notes([note.pk], self.werk)
+        self.assertTrue(Job.objects.filter(name="saved_searches.rebuild").exists())
+
+        run_pending()
+        self.assertEqual(self.members(), {"Planning", "Review import"})
+
+    def test_changed_definition_rebuilds(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.search.tag, self.search.query = "", "melk"
+            self.search.save()
+        run_pending()
+        self.assertEqual(self.members(), {"Boodschappen"})
+
+    def test_dashboard_reads_members(self):
+        resp = self.client.get(reverse("notes:saved_search", args=["werk-reviews"]))
+        self.assertEqual([n.title for n in resp.context["notes"]], ["Planning"])
+
+        home = self.client.get(reverse("home"))
+        self.assertContains(home, reverse("notes:saved_search", args=["werk-reviews"]))
+
+
+class SavedSearchMatchesListTests(TestCase):
+    """Leden van een saved search = `list_notes` met dezelfde ?tag=&q=."""
+
+    PARAMS = [
+        ("werk", ""),
+        ("", "review"),
+        ("", "koffie kopen"),
+        ("", "kopen koffie"),
+        ("Werk", "REV"),
+        ("", "vet"),
+        ("thuis", "koffie"),
+        ("onbekend", ""),
+    ]
+
+    def setUp(self):
+        werk = Tag.objects.create(name="Werk")
+        thuis = Tag.objects.create(name="thuis")
+        notes = [
+            ("Sprint review", "planning", [werk]),
+            ("Boodschappen", "koffie kopen en melk", [thuis]),
+            ("Lijst", "kopen: koffie", [thuis, werk]),
+            ("Koffiezet", "ontkalken, **vet** gedrukt", []),
+            ("Reviewen", "code", [werk]),
+        ]
+        for title, body, tags in notes:
+            Note.objects.create(title=title, body=body).tags.set(tags)
+
+    def test_members_equal_list_results(self):
+        for tag, query in self.PARAMS:
+            with self.subTest(tag=tag, q=query):
+                saved = SavedSearch.objects.create(
+                    name=f"{tag}/{query}", slug=f"s-{tag}-{query}", tag=tag, query=query
+                )
+                saved_searches.rebuild([saved.pk])
+                members = set(saved.notes.values_list("pk", flat=True))
+
+                params = {k: v for k, v in (("tag", tag), ("q", query)) if v}
+                resp = self.client.get(reverse("notes:list"), params)
+                self.assertEqual(members, {n.pk for n in resp.context["notes"]})
+
+                # en incrementeel (na een save) hetzelfde resultaat
+                for note in Note.objects.all():
+                    saved_searches.forget_definitions()
+                    saved_searches.update_memberships(note)
+                self.assertEqual(set(saved.notes.values_list("pk", flat=True)), members)
@@ -0,0 +1,209 @@
+"""
+Tests voor de BM25-zoekmachine en de zoekresultaten in list/API.
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from notes import search
+from notes.models import Note
+from notes.search import SearchEngine, Segment, document
+
+
+def engine_for(docs):
+    return SearchEngine(
+        Segment.build((pk, *document(title, body)) for pk, title, body in docs)
+    )
+
+
+DOCS = [
+    (1, "Boodschappen", "melk en brood"),
+    (2, "Recept brood", "bloem, water, zout en gist"),
+    (3, "Vakantie", "brood voor onderweg"),
+    (4, "Werk", "planning voor volgende week"),
+]
+
+
+class EngineTests(TestCase):
+    def test_title_weighs_more_than_body(self):
+        engine = engine_for(DOCS)
+        ranked = [pk for pk, _ in engine.search("brood", 10)]
+        self.assertEqual(ranked[0], 2)
+        self.assertEqual(set(ranked), {1, 2, 3})
+
+    def test_updates_and_removals_via_delta(self):
+        engine = engine_for(DOCS)
+        engine.update(4, "Werk", "brood halen na de planning")
+        engine.remove(2)
+        engine.update(5, "Brood", "")
+
+        ranked = [pk for pk, _ in engine.search("brood", 10)]
+        self.assertNotIn(2, ranked)
+        self.assertEqual(ranked[0], 5)
+        self.assertIn(4, ranked)
+        self.assertEqual(engine.doc_count, 4)
+
+    def test_compact_keeps_results(self):
+        engine = engine_for(DOCS)
+        engine.update(4, "Werk", "brood halen")
+        engine.remove(1)
+        before = engine.search("brood planning", 10)
+
+        engine.compact()
+        self.assertEqual(engine.delta, {})
+        after = engine.search("brood planning", 10)
+        self.assertEqual([pk for pk, _ in after], [pk for pk, _ in before])
+        for (_, a), (_, b) in zip(before, after):
+            self.assertAlmostEqual(a, b, places=4)
+
+    def test_save_and_mmap_load(self):
+        engine = engine_for(DOCS)
+        engine.update(5, "Nieuw brood", "")
+        engine.synced_at = timezone.now()
+        with tempfile.TemporaryDirectory() as tmp:
+            engine.save(Path(tmp))
+            loaded = SearchEngine.load(Path(tmp))
+            self.assertEqual(loaded.search("brood", 10), engine.search("brood", 10))
+            self.assertEqual(loaded.synced_at, engine.synced_at)
+
+    def test_candidates_match_parts_of_terms(self):
+        engine = engine_for(DOCS)
+        engine.update(5, "Broodje", "")
+        self.assertEqual(engine.candidates("rood"), {1, 2, 3, 5})
+        self.assertEqual(engine.candidates("brood voor"), {3})
+        self.assertEqual(engine.candidates("brood thee"), set())
+        self.assertIsNone(engine.candidates("++"))
+
+    def test_index_in_other_format_is_rebuilt(self):
+        engine = engine_for(DOCS)
+        engine.synced_at = timezone.now()
+        with tempfile.TemporaryDirectory() as tmp:
+            engine.save(Path(tmp))
+            with mock.patch.object(search, "INDEX_FORMAT", search.INDEX_FORMAT + 1):
+                self.assertIsNone(SearchEngine.load(Path(tmp)))
+
+    def test_setup_does_not_load_numpy(self):
+        # signals importeren deze module; numpy pas bij het eerste gebruik
+        code = (
+            "import sys, django; django.setup(); "
+            "import notes.search; print('numpy' in sys.modules)"
+        )
+        out = subprocess.run(
+            [sys.executable, "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            env={**os.environ, "DJANGO_SETTINGS_MODULE": "siteproject.settings.dev"},
+            cwd=settings.BASE_DIR,
+        )
+        self.assertEqual(out.stdout.strip(), "False")
+
+    def test_unknown_terms_and_empty_query(self):
+        engine = engine_for(DOCS)
+        self.assertEqual(engine.search("onbekend", 10), [])
+        self.assertEqual(engine.search("  ", 10), [])
+
+
+class SearchViewTests(TestCase):
+    def setUp(self):
+        self.body_hit = Note.objects.create(title="Lijst", body="koffie kopen")
+        self.title_hit = Note.objects.create(title="Koffie", body="bonen malen")
+        Note.objects.create(title="Thee", body="groen")
+
+    def test_list_orders_by_relevance(self):
+        resp = self.client.get(reverse("notes:list"), {"q": "koffie"})
+        self.assertEqual(
+            [n.pk for n in resp.context["notes"]],
+            [self.title_hit.pk, self.body_hit.pk],
+        )
+
+    def test_api_list_search(self):
+        resp = self.client.get(reverse("notes:api_list"), {"q": "koffie"})
+        self.assertEqual(
+            [n["id"] for n in resp.json()], [self.title_hit.pk, self.body_hit.pk]
+        )
+
+    def test_index_follows_saves_and_deletes(self):
+        search.get_engine()
+        with self.captureOnCommitCallbacks(execute=True):
+            Note.objects.create(title="Nieuw", body="koffie koffie koffie")
+            self.title_hit.delete()
+
+        engine = search.get_engine()
+        engine.maybe_sync()
+        ranked = [pk for pk, _ in engine.search("koffie", 10)]
+        self.assertNotIn(self.title_hit.pk, ranked)
+        self.assertEqual(len(ranked), 2)
+
+    def test_sync_catches_changes_without_signals(self):
+        engine = search.get_engine()
+        Note.objects.filter(pk=self.title_hit.pk).delete()
+        Note.objects.bulk_create([Note(title="Koffie import")])
+
+        engine.sync()
+        ranked = [pk for pk, _ in engine.search("koffie", 10)]
+        titles = set(Note.objects.filter(pk__in=ranked).values_list("title", flat=True))
+        self.assertEqual(titles, {"Lijst", "Koffie import"})
+
+    def test_list_matches_like_the_db_backend(self):
+        Note.objects.create(title="Koffiezet", body="ontkalken")
+        Note.objects.create(title="Boodschappen", body="kopen: koffie")
+        Note.objects.create(title="Opmaak", body="verse **kof**fie")
+        cases = {
+            "koff": 5,  # ook delen van woorden
+            "koffie kopen": 1,  # de hele zoekterm, niet één van de woorden
+            "KOFFIE": 5,  # ook "**kof**fie": de index heeft de platte tekst
+            "thee koffie": 0,
+            "e kof": 1,
+            "++": 0,
+        }
+        for query, expected in cases.items():
+            with self.subTest(query):
+                bm25 = self.client.get(reverse("notes:list"), {"q": query})
+                with self.settings(NOTES_SEARCH_BACKEND="db"):
+                    db = self.client.get(reverse("notes:list"), {"q": query})
+                self.assertEqual(len(bm25.context["notes"]), expected)
+                self.assertEqual(
+                    {n.pk for n in bm25.context["notes"]},
+                    {n.pk for n in db.context["notes"]},
+                )
+
+    def test_partial_word_hits_come_after_ranked_hits(self):
+        partial = Note.objects.create(title="Koffiezet", body="")
+        resp = self.client.get(reverse("notes:list"), {"q": "koffie"})
+        self.assertEqual(
+            [n.pk for n in resp.context["notes"]],
+            [self.title_hit.pk, self.body_hit.pk, partial.pk],
+        )
+
+    def test_single_word_needs_no_like(self):
+        qs, _ranked = search.search_notes(Note.objects.all(), "koff")
+        sql = str(qs.query)
+        self.assertNotIn("LIKE", sql.upper())
+        self.assertEqual(
+            set(qs.values_list("pk", flat=True)), {self.title_hit.pk, self.body_hit.pk}
+        )
+
+    def test_results_are_not_capped(self):
+        # meer treffers dan SQLite query-parameters aanvaardt
+        Note.objects.bulk_create(
+            [Note(title=f"Bonen {i}", body="koffie") for i in range(1200)]
+        )
+        resp = self.client.get(reverse("notes:api_list"), {"q": "koffie"})
+        self.assertEqual(len(resp.json()), 1202)
+
+    @override_settings(NOTES_SEARCH_BACKEND="db")
+    def test_db_backend_uses_substring_filter(self):
+        qs, ranked = search.search_notes(Note.objects.all(), "koff")
+        self.assertIsNone(ranked)
+        resp = self.client.get(reverse("notes:list"), {"q": "koff"})
+        self.assertEqual(len(resp.context["notes"]), 2)
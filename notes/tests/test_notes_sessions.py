@@ -0,0 +1,75 @@
+"""
+Tests voor sessies en berichten (siteproject.sessions): cookies in plaats
+van de database, en niets van beide op de publieke en API-routes.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from notes.models import Note
+
+
+class SessionAndMessageTests(TestCase):
+    def setUp(self):
+        self.note = Note.objects.create(title="Publiek", body="tekst")
+
+    def test_messages_survive_redirect_without_session_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            resp = self.client.post(
+                reverse("notes:new"), {"title": "Nieuw", "body": "x"}
+            )
+        self.assertEqual(resp.status_code, 302)
+        self.assertIn("messages", resp.cookies)
+        self.assertFalse(
+            any("django_session" in q["sql"] for q in ctx.captured_queries)
+        )
+
+        page = self.client.get(resp["Location"])
+        self.assertContains(page, "Notitie is toegevoegd.")
+
+    @override_settings(
+        # de oude opzet: sessie in de database, berichten in de sessie
+        SESSION_ENGINE="django.contrib.sessions.backends.db",
+        MESSAGE_STORAGE="django.contrib.messages.storage.session.SessionStorage",
+    )
+    def test_public_and_api_routes_skip_session_and_user(self):
+        user = get_user_model().objects.create_user("jan", password="geheim")
+        self.client.force_login(user)
+        self.assertIn(settings.SESSION_COOKIE_NAME, self.client.cookies)
+        # openstaand bericht in de sessie
+        self.client.post(reverse("notes:new"), {"title": "Nieuw", "body": "x"})
+
+        for url in (
+            reverse("notes:public_list"),
+            reverse("notes:public_detail", args=[self.note.pk]),
+            reverse("notes:api_list"),
+        ):
+            with self.subTest(url=url):
+                with CaptureQueriesContext(connection) as ctx:
+                    resp = self.client.get(url)
+                self.assertEqual(resp.status_code, 200)
+                tables = " ".join(q["sql"] for q in ctx.captured_queries)
+                self.assertNotIn("django_session", tables)
+                self.assertNotIn("auth_user", tables)
+                self.assertNotIn("Cookie", resp.get("Vary", ""))
+                self.assertFalse(resp.cookies)
+
+    def test_pending_message_waits_for_a_session_page(self):
+        self.client.post(reverse("notes:new"), {"title": "Nieuw", "body": "x"})
+        public = self.client.get(reverse("notes:public_list"))
+        self.assertNotContains(public, "Notitie is toegevoegd.")
+        self.assertContains(self.client.get(reverse("notes:list")), "toegevoegd")
+
+    def test_login_uses_signed_cookie(self):
+        user = get_user_model().objects.create_user("an", password="geheim")
+        self.assertTrue(self.client.login(username="an", password="geheim"))
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(reverse("notes:list"))
+        self.assertFalse(
+            any("django_session" in q["sql"] for q in ctx.captured_queries)
+        )
+        self.assertEqual(self.client.session["_auth_user_id"], str(user.pk))
@@ -0,0 +1,55 @@
+"""
+Tests voor zoekfragmenten (platte tekst + <mark>) in list_notes.
+"""
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes.models import Note, NoteText
+from notes.snippets import highlight, plain_text, snippets_for
+
+
+class PlainTextTests(TestCase):
+    def test_markdown_is_stripped(self):
+        text = plain_text("# Titel\n\nHier is **vet** en een [link](http://x.y).")
+        self.assertEqual(text, "Titel Hier is vet en een link.")
+
+    def test_saved_and_bulk_created_notes_get_plain_text(self):
+        note = Note.objects.create(title="A", body="*schuin*")
+        (bulk,) = Note.objects.bulk_create([Note(title="B", body="`code`")])
+        self.assertEqual(NoteText.objects.get(note=note).text, "schuin")
+        self.assertEqual(NoteText.objects.get(note=bulk).text, "code")
+
+        note.body = "anders"
+        note.save()
+        self.assertEqual(NoteText.objects.get(note=note).text, "anders")
+
+
+@override_settings(NOTES_SNIPPET_CHARS=40)
+class SnippetTests(TestCase):
+    def test_snippet_is_capped_and_centered_on_match(self):
+        body = "begin " + "vulling " * 30 + "hier staat koffie in " + "einde " * 30
+        note = Note.objects.create(title="Lang", body=body)
+
+        with self.assertNumQueries(1):
+            snippet = snippets_for([note.pk], "koffie")[note.pk]
+        self.assertIn("<mark>koffie</mark>", snippet)
+        self.assertTrue(snippet.startswith("… "))
+        self.assertTrue(snippet.endswith(" …"))
+        self.assertLessEqual(len(snippet), 40 + len("<mark></mark>") + 4)
+
+    def test_highlight_escapes_html(self):
+        self.assertEqual(
+            highlight("<b>Koffie</b> & thee", ["koffie"]),
+            "&lt;b&gt;<mark>Koffie</mark>&lt;/b&gt; &amp; thee",
+        )
+
+    def test_list_shows_snippets_only_when_searching(self):
+        Note.objects.create(title="Boodschappen", body="Vergeet de **koffie** niet")
+
+        resp = self.client.get(reverse("notes:list"), {"q": "koffie"})
+        self.assertContains(resp, 'class="snippet"')
+        self.assertContains(resp, "<mark>koffie</mark>")
+
+        resp = self.client.get(reverse("notes:list"))
+        self.assertNotContains(resp, 'class="snippet"')
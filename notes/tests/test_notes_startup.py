@@ -0,0 +1,53 @@
+"""
+Tests voor de opstartkosten: lazy imports in de renderlaag en
+`manage.py warmup` (notes.warmup).
+"""
+
+import subprocess
+import sys
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase
+
+from notes.models import Note
+from notes.templatetags import markdown_extras
+
+RENDER_DEPS = ("markdown", "bleach", "pygments")
+
+STARTUP = f"""
+import os, sys, django
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", {settings.SETTINGS_MODULE!r})
+django.setup()
+import siteproject.urls
+from django.template import engines
+engines["django"].engine.template_libraries
+print(",".join(m for m in {RENDER_DEPS!r} if m in sys.modules))
+"""
+
+
+class StartupTests(TestCase):
+    def test_startup_does_not_import_render_dependencies(self):
+        proc = subprocess.run(
+            [sys.executable, "-c", STARTUP],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(proc.stdout.strip(), "")
+
+    def test_warmup_loads_render_dependencies(self):
+        Note.objects.create(title="Een", body="tekst")
+        out = StringIO()
+        call_command("warmup", stdout=out)
+        for step in ("urls", "templates", "markdown", "search", "totaal"):
+            self.assertIn(f"{step}: ", out.getvalue())
+        for module in RENDER_DEPS:
+            self.assertIn(module, sys.modules)
+
+    def test_preload_renders_code_and_wikilinks(self):
+        html = markdown_extras._render(markdown_extras.PRELOAD_SAMPLE, "", {})
+        self.assertIn('<span class="nb">print</span>', html)  # pygments
+        self.assertIn('<span class="wikilink missing">Wiki</span>', html)
@@ -0,0 +1,117 @@
+"""
+Tests voor bulkbewerkingen op tags (merge/rename/delete).
+"""
+
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from notes import tag_ops
+from notes.jobs import run_pending
+from notes.models import Job, Note, Tag
+
+
+class TagOpsTests(TestCase):
+    def setUp(self):
+        self.werk = Tag.objects.create(name="werk")
+        self.werk_hoofd = Tag.objects.create(name="Werk")
+        self.werk_caps = Tag.objects.create(name="WERK")
+        self.prive = Tag.objects.create(name="privé")
+
+        self.n1 = Note.objects.create(title="Alleen Werk")
+        self.n1.tags.set([self.werk_hoofd])
+        self.n2 = Note.objects.create(title="Werk en werk")
+        self.n2.tags.set([self.werk, self.werk_hoofd])
+        self.n3 = Note.objects.create(title="Werk en WERK")
+        self.n3.tags.set([self.werk_hoofd, self.werk_caps, self.prive])
+
+    def names(self, note):
+        return sorted(note.tags.values_list("name", flat=True))
+
+    def test_merge_repoints_and_dedupes(self):
+        # vast aantal statements, onafhankelijk van het aantal notes
+        # (incl. SAVEPOINT/RELEASE van de transactie)
+        with self.assertNumQueries(8):
+            tag_ops.merge_tags([self.werk_hoofd, self.werk_caps], self.werk)
+
+        self.assertEqual(self.names(self.n1), ["werk"])
+        self.assertEqual(self.names(self.n2), ["werk"])
+        self.assertEqual(self.names(self.n3), ["privé", "werk"])
+        self.assertFalse(Tag.objects.filter(name__in=["Werk", "WERK"]).exists())
+
+    def test_rename_to_existing_name_merges(self):
+        result = tag_ops.rename_tag(self.werk_hoofd, "werk")
+        self.assertEqual(result.pk, self.werk.pk)
+        self.assertEqual(self.names(self.n1), ["werk"])
+        self.assertEqual(self.werk.notes.count(), 3)
+
+    def test_rename_to_new_name(self):
+        tag_ops.rename_tag(self.prive, "thuis")
+        self.assertEqual(self.names(self.n3), ["WERK", "Werk", "thuis"])
+
+    def test_delete_removes_links(self):
+        removed = tag_ops.delete_tags([self.werk_hoofd])
+        self.assertEqual(removed, 3)
+        self.assertEqual(self.names(self.n1), [])
+        self.assertEqual(Note.objects.count(), 3)
+
+    def test_command_merge(self):
+        out = StringIO()
+        call_command("tags", "merge", "Werk", "WERK", "--into", "werk", stdout=out)
+        self.assertIn("Samengevoegd", out.getvalue())
+        self.assertEqual(Tag.objects.filter(name__iexact="werk").count(), 1)
+
+    def test_admin_delete_action_asks_for_confirmation(self):
+        User.objects.create_superuser("admin", "a@example.com", "pw")
+        self.client.login(username="admin", password="pw")
+        data = {"action": "delete_tags", "_selected_action": [self.werk_caps.pk]}
+        resp = self.client.post(reverse("admin:notes_tag_changelist"), data)
+        self.assertEqual(resp.status_code, 200)
+        self.assertContains(resp, "Tags verwijderen")
+        self.assertContains(resp, 'name="apply"')
+        self.assertTrue(Tag.objects.filter(pk=self.werk_caps.pk).exists())
+
+        resp = self.client.post(
+            reverse("admin:notes_tag_changelist"), {**data, "apply": "1"}
+        )
+        self.assertEqual(resp.status_code, 302)
+        self.assertFalse(Tag.objects.filter(pk=self.werk_caps.pk).exists())
+
+    @override_settings(NOTES_JOBS_EAGER=False)
+    def test_admin_merge_runs_as_job(self):
+        User.objects.create_superuser("admin", "a@example.com", "pw")
+        self.client.login(username="admin", password="pw")
+        resp = self.client.post(
+            reverse("admin:notes_tag_changelist"),
+            {
+                "action": "merge_tags",
+                "apply": "1",
+                "_selected_action": [self.werk.pk, self.werk_caps.pk],
+                "target": self.werk.pk,
+            },
+        )
+        self.assertEqual(resp.status_code, 302)
+        job = Job.objects.get(name="tags.merge")
+        self.assertEqual(
+            job.payload,
+            {
+                "source_ids": sorted([self.werk.pk, self.werk_caps.pk]),
+                "target_id": self.werk.pk,
+            },
+        )
+        self.assertTrue(Tag.objects.filter(pk=self.werk_caps.pk).exists())
+
+        run_pending()
+        self.assertFalse(Tag.objects.filter(pk=self.werk_caps.pk).exists())
+
+    @override_settings(NOTES_JOBS_EAGER=False)
+    def test_command_queue(self):
+        out = StringIO()
+        call_command("tags", "delete", "WERK", "--queue", stdout=out)
+        self.assertIn("ingepland", out.getvalue())
+        self.assertTrue(Tag.objects.filter(name="WERK").exists())
+        run_pending()
+        self.assertFalse(Tag.objects.filter(name="WERK").exists())
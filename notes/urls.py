@@ -1,4 +1,6 @@
+from django.conf import settings
 from django.urls import path
+from . import async_views
 from .views import (
     list_notes,
     create_note,
@@ -6,20 +8,34 @@ from .views import (
     edit_note,
     delete_note,
     duplicate_note,
+    saved_search_notes,
+    bulk_notes,
+    download_notes,
     public_list_notes,
     public_detail_note,
     api_list_notes,
     api_new_note,
 )
 
+# API en publieke views: sync of native async (zie notes.async_views)
+if settings.NOTES_ASYNC_VIEWS:
+    public_list_notes = async_views.public_list_notes
+    public_detail_note = async_views.public_detail_note
+    api_list_notes = async_views.api_list_notes
+    api_new_note = async_views.api_new_note
+
 app_name = "notes"
 urlpatterns = [
     path("", list_notes, name="list"),
     path("new/", create_note, name="new"),
+    path("bulk/", bulk_notes, name="bulk"),
+    path("export/", download_notes, name="export"),
+    path("events/", async_views.note_events, name="events"),
     path("<int:pk>/", detail_note, name="detail"),
     path("<int:pk>/edit/", edit_note, name="edit"),
     path("<int:pk>/delete/", delete_note, name="delete"),
     path("<int:pk>/duplicate/", duplicate_note, name="duplicate"),
+    path("saved/<slug:slug>/", saved_search_notes, name="saved_search"),
     # publieke read-only routes
     path("pub/", public_list_notes, name="public_list"),
     path("pub/<int:pk>/", public_detail_note, name="public_detail"),
@@ -11,21 +11,26 @@ import json
 from typing import List
 
 from django.shortcuts import get_object_or_404, redirect, render
-from django.db.models import Prefetch, Q
+from django.db.models import Prefetch
 from django.contrib import messages
 from django.views.decorators.csrf import csrf_exempt
-from django.conf import settings
 from django.http import (
     HttpRequest,
     HttpResponse,
     JsonResponse,
     HttpResponseBadRequest,
-    HttpResponseForbidden,
+    StreamingHttpResponse,
 )
+from django.utils import timezone
 
+from . import bulk, search
+from .api_auth import api_endpoint
+from .snippets import snippets_for
+from .archive import ARCHIVE_FORMATS, iter_archive
 from .forms import NoteForm
-from .models import Note, Tag
-
+from .links import backlinks
+from .related import related_for
+from .models import Note, SavedSearch, Tag
 
 # let op: voeg Q toe bij je imports bovenin het bestand als dat er nog niet stond
 
@@ -90,13 +95,8 @@ def duplicate_note(request: HttpRequest, pk: int) -> HttpResponse:
     original = get_object_or_404(Note, pk=pk)
 
     if request.method == "POST":
-        # Maak nieuwe note met prefix "Kopie van ..."
-        new_note = Note.objects.create(
-            title=f"Kopie van {original.title}",
-            body=original.body,
-        )
-        # Kopieer tags mee
-        new_note.tags.set(original.tags.all())
+        # Maak nieuwe note met prefix "Kopie van ..." (tags gaan mee)
+        (new_note,) = bulk.duplicate_notes([original.pk])
 
         messages.success(
             request,
@@ -118,26 +118,37 @@ def list_notes(request: HttpRequest) -> HttpResponse:
     """
     Toon een lijst met notities, met optionele filters:
     - ?tag=werk   -> filter op tagnaam
-    - ?q=tekst    -> filter op titel/body (case-insensitive)
+    - ?q=tekst    -> notes met "tekst" in titel/body (substring, zie
+                     notes.search.search_notes), meest relevant eerst (BM25),
+                     met per resultaat een fragment rond de zoekterm
     Ze mogen gecombineerd worden.
     """
     tag_filter = request.GET.get("tag")
     query = request.GET.get("q")
 
-    base_qs = Note.objects.all().prefetch_related(
-        Prefetch("tags", queryset=Tag.objects.order_by("name"))
-    )
+    # tags enkel voor items die niet in de fragmentcache staan (notes.fragments)
+    base_qs = Note.objects.defer("body")
 
-    # filter op tag
+    # filter op tag: eerst de tag-id's (kleine tabel), dan via de index op
+    # notes_note_tags.tag_id; een join op naam scant de hele koppeltabel
     if tag_filter:
-        base_qs = base_qs.filter(tags__name__iexact=tag_filter)
+        tag_ids = Tag.objects.filter(name__iexact=tag_filter).values("pk")
+        base_qs = base_qs.filter(tags__in=tag_ids)
 
     # filter op zoekterm q (in titel of body)
+    ranked = None
     if query:
-        base_qs = base_qs.filter(Q(title__icontains=query) | Q(body__icontains=query))
+        base_qs, ranked = search.search_notes(base_qs, query)
 
     # distinct() is belangrijk als meerdere filters overlappen dezelfde note
     notes = base_qs.distinct()
+    if ranked is not None:
+        notes = in_rank_order(notes, ranked)
+    if query:
+        notes = list(notes)
+        snippets = snippets_for([n.pk for n in notes], query)
+        for n in notes:
+            n.snippet = snippets.get(n.pk, "")
 
     all_tags = Tag.objects.order_by("name")
 
@@ -150,6 +161,58 @@ def list_notes(request: HttpRequest) -> HttpResponse:
     return render(request, "notes/list.html", context)
 
 
+BULK_ACTIONS = ("delete", "tag", "untag", "duplicate")
+
+
+def bulk_notes(request: HttpRequest) -> HttpResponse:
+    """
+    Voer een bulkactie uit op de aangevinkte notities in `list_notes`.
+    POST-velden:
+    - action: delete | tag | untag | duplicate
+    - note:   (meerdere) note-id's
+    - tag:    tagnaam, verplicht voor tag/untag
+    """
+    if request.method != "POST":
+        return HttpResponseBadRequest("Use POST")
+
+    action = request.POST.get("action")
+    if action not in BULK_ACTIONS:
+        return HttpResponseBadRequest("Unknown action")
+
+    try:
+        note_ids = sorted({int(pk) for pk in request.POST.getlist("note")})
+    except ValueError:
+        return HttpResponseBadRequest("Invalid note id")
+
+    if not note_ids:
+        messages.warning(request, "Geen notities geselecteerd.")
+        return redirect("notes:list")
+
+    if action == "delete":
+        count = bulk.delete_notes(note_ids)
+        messages.success(request, f"{count} notitie(s) verwijderd.")
+    elif action == "duplicate":
+        copies = bulk.duplicate_notes(note_ids)
+        messages.success(request, f"{len(copies)} notitie(s) gedupliceerd.")
+    else:
+        tag = Tag.objects.filter(name=request.POST.get("tag", "")).first()
+        if tag is None:
+            messages.warning(request, "Kies een bestaande tag.")
+            return redirect("notes:list")
+        if action == "tag":
+            tagged = bulk.tag_notes(note_ids, tag)
+            messages.success(
+                request, f'Tag "{tag.name}" toegevoegd aan {tagged} notitie(s).'
+            )
+        else:
+            removed = bulk.untag_notes(note_ids, tag)
+            messages.success(
+                request, f'Tag "{tag.name}" verwijderd van {removed} notitie(s).'
+            )
+
+    return redirect("notes:list")
+
+
 def create_note(request: HttpRequest) -> HttpResponse:
     """
     Maak een nieuwe notitie aan via een ModelForm.
@@ -170,31 +233,131 @@ def detail_note(request: HttpRequest, pk: int) -> HttpResponse:
     Detailpagina voor één notitie.
     """
     note = get_object_or_404(Note.objects.prefetch_related("tags"), pk=pk)
-    return render(request, "notes/detail.html", {"note": note})
+    return render(
+        request,
+        "notes/detail.html",
+        {
+            "note": note,
+            "backlinks": list(backlinks(note)),
+            "related": list(related_for(note)),
+        },
+    )
+
+
+def saved_search_notes(request: HttpRequest, slug: str) -> HttpResponse:
+    """
+    Dashboard voor één saved search: leest de bewaarde leden (join op
+    `SavedSearchMember`), zonder de zoekopdracht opnieuw te draaien.
+    """
+    saved = get_object_or_404(SavedSearch, slug=slug)
+    notes = (
+        Note.objects.filter(saved_search_memberships__search=saved)
+        .defer("body")
+        .prefetch_related("tags")
+        .order_by("-created_at")
+    )
+    return render(request, "notes/saved_search.html", {"search": saved, "notes": notes})
+
+
+def note_summary(n: Note) -> dict:
+    """JSON-weergave van een note zoals in api_list_notes (tags geprefetcht)."""
+    return {
+        "id": n.id,
+        "title": n.title,
+        "created_at": n.created_at.isoformat() if n.created_at else None,
+        "tags": [t.name for t in n.tags.all()],
+    }
 
 
+def in_rank_order(notes, ranked: List[int]) -> List[Note]:
+    """
+    Zet de notes in de volgorde van `ranked` (zoekresultaten); notes
+    zonder score daarna, in hun oorspronkelijke volgorde.
+    """
+    position = {pk: i for i, pk in enumerate(ranked)}
+    return sorted(notes, key=lambda n: position.get(n.pk, len(position)))
+
+
+def api_list_queryset(query: str = ""):
+    """
+    Notes voor api_list_notes (gedeeld met de async variant).
+    Geeft (queryset, ranking) terug; ranking is None tenzij er met BM25
+    gezocht werd, en herstelt dan de volgorde via `in_rank_order`.
+    """
+    qs = Note.objects.defer("body").prefetch_related("tags")
+    if not query:
+        return qs, None
+    return search.search_notes(qs, query)
+
+
+@api_endpoint()
 def api_list_notes(request: HttpRequest) -> JsonResponse:
     """
     JSON-endpoint met id, title, created_at en tags per note.
+    - ?q=tekst -> enkel zoekresultaten, meest relevant eerst
+    Zonder X-API-KEY begrensd per IP-adres (zie `notes.api_auth`).
     """
-    qs = Note.objects.all().prefetch_related("tags")
-    data: List[dict] = [
-        {
-            "id": n.id,
-            "title": n.title,
-            "created_at": n.created_at.isoformat() if n.created_at else None,
-            "tags": [t.name for t in n.tags.all()],
-        }
-        for n in qs
-    ]
+    qs, ranked = api_list_queryset(request.GET.get("q", ""))
+    notes = in_rank_order(qs, ranked) if ranked is not None else qs
+    data: List[dict] = [note_summary(n) for n in notes]
     return JsonResponse(data, safe=False)
 
 
+def download_notes(request: HttpRequest) -> HttpResponse:
+    """
+    Download alle notities als archief met één .md-bestand per note.
+    - ?format=zip (standaard) of ?format=tar.gz
+    Het archief wordt streamend opgebouwd terwijl de notes uit de
+    database komen; de eerste bytes gaan al weg voor de laatste note
+    gelezen is.
+    """
+    fmt = request.GET.get("format", "zip")
+    if fmt not in ARCHIVE_FORMATS:
+        return HttpResponseBadRequest("Unknown format")
+    content_type, extension = ARCHIVE_FORMATS[fmt]
+
+    notes_iter = (
+        Note.objects.order_by("pk")
+        .select_related("body_blob")
+        .prefetch_related(Prefetch("tags", queryset=Tag.objects.only("name")))
+        .iterator(chunk_size=500)
+    )
+    response = StreamingHttpResponse(
+        iter_archive(notes_iter, fmt), content_type=content_type
+    )
+    filename = f"notities-{timezone.localdate():%Y%m%d}.{extension}"
+    response["Content-Disposition"] = f'attachment; filename="{filename}"'
+    return response
+
+
+def parse_new_note_request(request: HttpRequest):
+    """
+    Gedeelde validatie voor api_new_note (sync en async): parse de
+    JSON-body. De API-sleutel is dan al gecontroleerd (`api_endpoint`).
+    Returns:
+        (title, body, tagnamen) of een HttpResponse (400) bij fouten
+    """
+    try:
+        payload = json.loads(request.body.decode("utf-8"))
+    except json.JSONDecodeError:
+        return HttpResponseBadRequest("Invalid JSON")
+
+    title = payload.get("title", "").strip()
+    body = payload.get("body", "").strip()
+    if not title:
+        return HttpResponseBadRequest("Missing title")
+
+    tag_names = [str(t).strip() for t in payload.get("tags", [])]
+    return title, body, [t for t in dict.fromkeys(tag_names) if t]
+
+
 @csrf_exempt
+@api_endpoint(require_key=True)
 def api_new_note(request: HttpRequest) -> JsonResponse:
     """
     Simpele JSON API endpoint om een Note + tags aan te maken.
-    Authenticatie: header X-API-KEY moet overeenkomen met settings.API_KEY.
+    Authenticatie: header X-API-KEY met een geldige sleutel (`ApiKey` of
+    settings.API_KEY), zie `notes.api_auth`.
     Body (JSON):
     {
       "title": "...",
@@ -205,28 +368,17 @@ def api_new_note(request: HttpRequest) -> JsonResponse:
       201 + {"id": ..., "title": ..., "tags": [...]} bij succes
       400 bij invalid input
       403 bij ontbrekende/verkeerde key
+      429 (+ Retry-After) boven de rate limit van de sleutel
     """
     # alleen POST toegestaan
     if request.method != "POST":
         return HttpResponseBadRequest("Use POST")
 
-    # check API key
-    client_key = request.headers.get("X-API-KEY", "")
-    if client_key != settings.API_KEY:
-        return HttpResponseForbidden("Invalid API key")
-
     # parse JSON
-    try:
-        payload = json.loads(request.body.decode("utf-8"))
-    except json.JSONDecodeError:
-        return HttpResponseBadRequest("Invalid JSON")
-
-    title = payload.get("title", "").strip()
-    body = payload.get("body", "").strip()
-    tags_in = payload.get("tags", [])
-
-    if not title:
-        return HttpResponseBadRequest("Missing title")
+    parsed = parse_new_note_request(request)
+    if isinstance(parsed, HttpResponse):
+        return parsed
+    title, body, tags_in = parsed
 
     # maak Note
     note = Note.objects.create(title=title, body=body)
@@ -236,9 +388,6 @@ def api_new_note(request: HttpRequest) -> JsonResponse:
     #   - haal bestaande Tag op of maak nieuwe
     tag_objs = []
     for tag_name in tags_in:
-        tag_name = str(tag_name).strip()
-        if not tag_name:
-            continue
         tag_obj, _created = Tag.objects.get_or_create(name=tag_name)
         tag_objs.append(tag_obj)
     if tag_objs:
@@ -252,17 +401,19 @@ def api_new_note(request: HttpRequest) -> JsonResponse:
     return JsonResponse(data, status=201)
 
 
+def public_list_queryset():
+    """Queryset van public_list_notes (gedeeld met de async variant)."""
+    # tags enkel voor items die niet in de fragmentcache staan (notes.fragments)
+    return Note.objects.defer("body").order_by("-updated_at", "-created_at", "title")
+
+
 def public_list_notes(request: HttpRequest) -> HttpResponse:
     """
     Publieke read-only lijst.
     Geen zoekveld, geen edit-acties.
     Toont alle notes gesorteerd op -updated_at (laatst bijgewerkt eerst).
     """
-    notes_qs = (
-        Note.objects.all()
-        .prefetch_related("tags")
-        .order_by("-updated_at", "-created_at", "title")
-    )
+    notes_qs = public_list_queryset()
 
     return render(
         request,
@@ -287,5 +438,6 @@ def public_detail_note(request: HttpRequest, pk: int) -> HttpResponse:
         "notes/public_detail.html",
         {
             "note": note,
+            "backlinks": list(backlinks(note)),
         },
     )
@@ -0,0 +1,75 @@
+"""
+notes.warmup
+============
+
+Een worker opwarmen vóór het eerste request, zodat niet de eerste
+bezoeker de opstartkosten betaalt:
+
+- `urls`: de URLconf (en dus alle views) importeren
+- `templates`: de template-engine met alle templatetag-bibliotheken en de
+  gecompileerde hoofdtemplates (gecachet door de cached loader)
+- `markdown`: markdown, bleach en pygments importeren en een
+  voorbeeld renderen (zie `markdown_extras.preload`)
+- `search`: de BM25-index laden (van schijf of uit de database)
+
+Gebruik: `manage.py warmup` of de gunicorn-hook in `gunicorn.conf.py`.
+"""
+
+import time
+from typing import Dict
+
+from django.template.loader import get_template
+from django.urls import get_resolver
+
+TEMPLATES = (
+    "base.html",
+    "home/home.html",
+    "notes/list.html",
+    "notes/_list_item.html",
+    "notes/detail.html",
+    "notes/public_list.html",
+    "notes/_public_list_item.html",
+    "notes/public_detail.html",
+)
+
+
+def _urls() -> None:
+    get_resolver().url_patterns
+
+
+def _templates() -> None:
+    for name in TEMPLATES:
+        get_template(name)
+
+
+def _markdown() -> None:
+    from .templatetags.markdown_extras import preload
+
+    preload()
+
+
+def _search() -> None:
+    from . import search
+
+    if search.backend() == "bm25":
+        search.get_engine()
+
+
+STEPS = {
+    "urls": _urls,
+    "templates": _templates,
+    "markdown": _markdown,
+    "search": _search,
+}
+
+
+def warmup(skip=()) -> Dict[str, float]:
+    """Voer de stappen uit; geeft de duur per stap in ms."""
+    timings = {}
+    for name, step in STEPS.items():
+        if name in skip:
+            continue
+        started = time.perf_counter()
+        step()
+        timings[name] = (time.perf_counter() - started) * 1000
+    return timings
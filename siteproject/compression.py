@@ -0,0 +1,124 @@
+"""
+Compressie van dynamische responses (gzip en brotli).
+
+WhiteNoise comprimeert enkel statische bestanden; deze middleware doet
+hetzelfde voor HTML en JSON uit de views:
+
+- `Accept-Encoding` bepaalt de codering (q-waarden gerespecteerd); bij
+  gelijke voorkeur wint brotli (kleiner), als het pakket `brotli`
+  geïnstalleerd is
+- niet bij kleine bodies (< `NOTES_COMPRESS_MIN_BYTES`), streaming
+  responses (SSE, downloads), al gecodeerde responses of types die niet
+  goed comprimeren
+- responses die per gebruiker verschillen (`Set-Cookie`, `Vary: Cookie`,
+  `Cache-Control: private`) krijgen gzip met willekeurige padding, zoals
+  Django's GZipMiddleware (BREACH)
+
+Elke response wordt opnieuw gecomprimeerd, zonder cache van de
+gecomprimeerde bytes: de sleutel vroeg een hash van de hele body en een
+extra cache-lookup per response, en dat woog in de loadtests niet op
+tegen gzip niveau 6 / brotli kwaliteit 5 zelf.
+"""
+
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+from django.utils.text import compress_string
+
+try:  # optioneel: brotli is ~15-25% kleiner dan gzip voor HTML/JSON
+    import brotli
+except ImportError:  # pragma: no cover - afhankelijk van de omgeving
+    brotli = None
+
+DEFAULT_MIN_BYTES = 1024
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+# zelfde bovengrens als GZipMiddleware
+MAX_RANDOM_BYTES = 100
+
+_ACCEPT_RE = re.compile(r"\s*([^\s;,]+)\s*(?:;\s*q=([0-9.]+))?")
+
+
+def supported_encodings():
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def choose_encoding(accept_encoding: str, encodings=None):
+    """Beste ondersteunde codering voor deze `Accept-Encoding`, of None."""
+    weights = {}
+    for part in accept_encoding.lower().split(","):
+        match = _ACCEPT_RE.match(part)
+        if not match:
+            continue
+        try:
+            weights[match.group(1)] = float(match.group(2) or 1)
+        except ValueError:
+            continue
+    best, best_q = None, 0.0
+    for encoding in encodings or supported_encodings():  # voorkeursvolgorde
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(content, quality=5)
+    return gzip.compress(content, compresslevel=6, mtime=0)
+
+
+def is_personal(response) -> bool:
+    vary = response.get("Vary", "").lower()
+    return (
+        bool(response.cookies)
+        or "cookie" in vary
+        or "private" in response.get("Cache-Control", "").lower()
+    )
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding"):
+            return response
+        content_type = response.get("Content-Type", "").lower()
+        if not content_type.startswith(COMPRESSIBLE_TYPES):
+            return response
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        min_bytes = getattr(settings, "NOTES_COMPRESS_MIN_BYTES", DEFAULT_MIN_BYTES)
+        if len(response.content) < min_bytes:
+            return response
+        personal = is_personal(response)
+        encoding = choose_encoding(
+            request.headers.get("Accept-Encoding", ""),
+            ("gzip",) if personal else None,
+        )
+        if encoding is None:
+            return response
+
+        if personal:
+            compressed = compress_string(
+                response.content, max_random_bytes=MAX_RANDOM_BYTES
+            )
+        else:
+            compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = encoding
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            # andere bytes dan de ongecomprimeerde variant
+            response["ETag"] = "W/" + etag
+        return response
@@ -0,0 +1,65 @@
+"""
+Witruimte uit gerenderde HTML halen (optioneel, `NOTES_MINIFY_HTML`).
+
+De templates zijn ingesprongen voor de leesbaarheid; bij lange lijsten
+is die inspringing een groot deel van de bytes. Deze middleware vervangt
+in tekst tussen tags elke reeks witruimte door één teken (een newline als
+er een in zat, anders een spatie). Voor de browser verandert er niets:
+die voegt witruimte buiten `<pre>` ook samen.
+
+Ongemoeid blijven:
+- alles binnen een tag (attribuutwaarden zoals `value="..."`)
+- de inhoud van `<pre>`, `<textarea>`, `<script>` en `<style>`
+- streaming responses en alles wat geen text/html is
+
+Staat vóór de compressie in `MIDDLEWARE` (draait dus eerder op de
+response), zodat er minder te comprimeren valt.
+"""
+
+import re
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.deprecation import MiddlewareMixin
+
+# beschermde blokken, tags en tekst daartussen
+_TOKEN_RE = re.compile(
+    r"(<(pre|textarea|script|style)\b.*?</\2\s*>|<!--.*?-->|<[^>]*>)",
+    re.IGNORECASE | re.DOTALL,
+)
+_SPACE_RE = re.compile(r"\s+")
+
+
+def _collapse(match) -> str:
+    return "\n" if "\n" in match.group(0) else " "
+
+
+def minify_html(html: str) -> str:
+    out = []
+    pos = 0
+    for match in _TOKEN_RE.finditer(html):
+        out.append(_SPACE_RE.sub(_collapse, html[pos : match.start()]))
+        out.append(match.group(0))
+        pos = match.end()
+    out.append(_SPACE_RE.sub(_collapse, html[pos:]))
+    return "".join(out).strip()
+
+
+class HtmlMinifyMiddleware(MiddlewareMixin):
+    def __init__(self, get_response):
+        if not getattr(settings, "NOTES_MINIFY_HTML", False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.has_header("Content-Encoding")
+            or not response.get("Content-Type", "").startswith("text/html")
+        ):
+            return response
+        charset = response.charset
+        response.content = minify_html(response.content.decode(charset)).encode(charset)
+        if response.has_header("Content-Length"):
+            response["Content-Length"] = str(len(response.content))
+        return response
@@ -0,0 +1,50 @@
+"""
+Sessies en berichten, maar enkel waar ze nodig zijn.
+
+- sessies zitten standaard in een ondertekende cookie
+  (`SESSION_ENGINE`, zie de settings) en berichten ook
+  (`MESSAGE_STORAGE`): een redirect met `messages.success` kost dan geen
+  sessie-query's meer
+- de publieke wiki en de JSON API (`NOTES_SESSIONLESS_PATHS`) gebruiken
+  geen sessie en geen berichten: deze middlewares slaan die routes
+  volledig over. `request.session` is daar een lege sessie zonder sleutel
+  (`request.user` wordt zo `AnonymousUser` zonder query), er wordt geen
+  sessie- of berichtencookie gelezen of gezet en er komt geen
+  `Vary: Cookie` bij, zodat de response voor iedereen dezelfde is
+  (en de gecomprimeerde bytes gedeeld kunnen worden, zie
+  `siteproject.compression`)
+
+Beide klassen vervangen Django's eigen middleware in `MIDDLEWARE`.
+"""
+
+from django.conf import settings
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+
+DEFAULT_SESSIONLESS_PATHS = ("/notes/pub/", "/notes/api/")
+
+
+def is_sessionless(request) -> bool:
+    paths = getattr(settings, "NOTES_SESSIONLESS_PATHS", DEFAULT_SESSIONLESS_PATHS)
+    return request.path_info.startswith(tuple(paths))
+
+
+class SelectiveSessionMiddleware(SessionMiddleware):
+    def process_request(self, request):
+        if is_sessionless(request):
+            # AuthenticationMiddleware verwacht een sessie; deze is leeg
+            request.session = self.SessionStore(None)
+            request._sessionless = True
+        else:
+            super().process_request(request)
+
+    def process_response(self, request, response):
+        if getattr(request, "_sessionless", False):
+            return response
+        return super().process_response(request, response)
+
+
+class SelectiveMessageMiddleware(MessageMiddleware):
+    def process_request(self, request):
+        if not getattr(request, "_sessionless", False):
+            super().process_request(request)
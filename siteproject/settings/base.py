@@ -35,12 +35,18 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
+    # gzip/brotli voor HTML en JSON (zie siteproject.compression)
+    "siteproject.compression.CompressionMiddleware",
+    # witruimte uit HTML, enkel als NOTES_MINIFY_HTML aan staat
+    "siteproject.html_minify.HtmlMinifyMiddleware",
+    # sessies/berichten, niet voor de publieke wiki en de API
+    # (zie siteproject.sessions)
+    "siteproject.sessions.SelectiveSessionMiddleware",
     "django.middleware.locale.LocaleMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
+    "siteproject.sessions.SelectiveMessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
@@ -48,6 +54,55 @@ ROOT_URLCONF = "siteproject.urls"
 WSGI_APPLICATION = "siteproject.wsgi.application"
 ASGI_APPLICATION = "siteproject.asgi.application"
 
+# API/publieke notes-views als native async views routeren (zinvol onder ASGI,
+# bv. `uvicorn siteproject.asgi:application`); standaard de sync views
+NOTES_ASYNC_VIEWS = os.getenv("NOTES_ASYNC_VIEWS", "false").lower() == "true"
+
+# Zoeken in notes (zie notes.search): "bm25" (in-memory index) of "db"
+NOTES_SEARCH_BACKEND = os.getenv("NOTES_SEARCH_BACKEND", "bm25")
+# index op schijf (mmap), op te bouwen met `manage.py build_search_index`
+NOTES_SEARCH_INDEX_DIR = os.getenv(
+    "NOTES_SEARCH_INDEX_DIR", BASE_DIR / "var" / "search"
+)
+
+# Achtergrondjobs (zie notes.jobs): uitvoeren met `manage.py run_worker`;
+# "eager" voert ze meteen uit in het proces dat ze inplant
+NOTES_JOBS_EAGER = os.getenv("NOTES_JOBS_EAGER", "false").lower() == "true"
+
+# JSON API (zie notes.api_auth): token bucket per sleutel, gedeeld tussen
+# workers via de cache; sleutels aanmaken met `manage.py api_keys`
+NOTES_API_RATE = float(os.getenv("NOTES_API_RATE", "5"))
+NOTES_API_BURST = int(os.getenv("NOTES_API_BURST", "20"))
+# zonder sleutel: onbegrensd, tenzij een rate per IP-adres gezet is; achter
+# een reverse proxy het aantal proxies dat X-Forwarded-For aanvult
+NOTES_API_ANON_RATE = float(os.getenv("NOTES_API_ANON_RATE", "0"))
+NOTES_API_ANON_BURST = int(os.getenv("NOTES_API_ANON_BURST", "20"))
+NOTES_API_TRUSTED_PROXIES = int(os.getenv("NOTES_API_TRUSTED_PROXIES", "0"))
+
+# Cache: één SQLite-bestand gedeeld door alle workers op deze machine (zie
+# siteproject.sqlite_cache en notes.caching); overleeft een herstart
+CACHES = {
+    "default": {
+        "BACKEND": "siteproject.sqlite_cache.SQLiteCache",
+        "LOCATION": os.getenv("NOTES_CACHE_PATH", BASE_DIR / "var" / "cache.sqlite3"),
+        "TIMEOUT": 300,
+        "OPTIONS": {"MAX_ENTRIES": 50000},
+    }
+}
+
+# Sessies in een ondertekende cookie (geen query's per request); bv.
+# "django.contrib.sessions.backends.cache" om ze server-side te kunnen
+# intrekken. Berichten ("Notitie is toegevoegd.") ook in een cookie.
+SESSION_ENGINE = os.getenv(
+    "NOTES_SESSION_ENGINE", "django.contrib.sessions.backends.signed_cookies"
+)
+MESSAGE_STORAGE = "django.contrib.messages.storage.cookie.CookieStorage"
+# routes zonder sessie en berichten (zie siteproject.sessions)
+NOTES_SESSIONLESS_PATHS = ("/notes/pub/", "/notes/api/")
+
+# Gerenderde HTML zonder inspringing (zie siteproject.html_minify)
+NOTES_MINIFY_HTML = os.getenv("NOTES_MINIFY_HTML", "false").lower() == "true"
+
 # Templates
 TEMPLATES = [
     {
@@ -66,13 +121,25 @@ TEMPLATES = [
     },
 ]
 
-# DB (SQLite default), override via DATABASE_URL in prod
+# DB (SQLite default), override via DATABASE_URL in prod; NOTES_DB_PATH
+# voor een aparte SQLite-database (bv. loadtests, benchmarks/site_load.py)
 DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "NAME": os.getenv("NOTES_DB_PATH", BASE_DIR / "db.sqlite3"),
+        # seconden wachten op de schrijflock van een andere worker
+        "OPTIONS": {"timeout": float(os.getenv("NOTES_DB_TIMEOUT", "5"))},
     }
 }
+# Meerdere workers die schrijven (benchmarks/site_load.py): met WAL blokkeren
+# lezers en schrijver elkaar niet, en IMMEDIATE-transacties nemen de
+# schrijflock meteen (wachtend tot de timeout) i.p.v. halverwege met
+# "database is locked" te falen
+if os.getenv("NOTES_DB_WAL", "false").lower() == "true":
+    DATABASES["default"]["OPTIONS"].update(
+        init_command="PRAGMA journal_mode=WAL; PRAGMA synchronous=NORMAL",
+        transaction_mode="IMMEDIATE",
+    )
 
 # Locale
 LANGUAGE_CODE = "nl"
@@ -1,5 +1,9 @@
 # ruff: noqa: F403, F405
 from .base import *
+import os
 
 DEBUG = True
 ALLOWED_HOSTS = ["127.0.0.1", "localhost"]
+
+# jobs meteen uitvoeren: lokaal (en in de tests) geen worker nodig
+NOTES_JOBS_EAGER = os.getenv("NOTES_JOBS_EAGER", "true").lower() == "true"
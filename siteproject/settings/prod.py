@@ -16,9 +16,19 @@ if DATABASE_URL:
 
 # --- WhiteNoise voor static files in productie ---
 MIDDLEWARE.insert(1, "whitenoise.middleware.WhiteNoiseMiddleware")
-STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
+# gehashte bestandsnamen (css/main.3f2a….css): WhiteNoise serveert die met
+# "Cache-Control: max-age=315360000, immutable"; na een wijziging verandert
+# de naam, dus browsers en proxies mogen ze onbeperkt bewaren
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {
+        "BACKEND": "whitenoise.storage.CompressedManifestStaticFilesStorage"
+    },
+}
 # -------------------------------------------------
 
+NOTES_MINIFY_HTML = os.getenv("NOTES_MINIFY_HTML", "true").lower() == "true"
+
 # Security aanscherpen
 CSRF_COOKIE_SECURE = True
 SESSION_COOKIE_SECURE = True
@@ -0,0 +1,216 @@
+"""
+Gedeelde cache-backend op één SQLite-bestand.
+
+Alle workers op dezelfde machine delen zo één cache, zonder externe
+dienst (memcached/redis), en de cache overleeft een herstart:
+
+    CACHES = {
+        "default": {
+            "BACKEND": "siteproject.sqlite_cache.SQLiteCache",
+            "LOCATION": "/var/lib/notes/cache.sqlite3",
+        }
+    }
+
+- WAL-modus: lezers wachten niet op een schrijver
+- één verbinding per thread (sqlite3-verbindingen zijn niet thread-safe)
+- `add` en `incr` zijn atomair over processen heen (upsert resp.
+  `BEGIN IMMEDIATE`), zodat ze als lock/teller bruikbaar zijn
+- `get_many`/`set_many` kosten één statement resp. één transactie
+- boven `MAX_ENTRIES` worden eerst verlopen en daarna de vroegst
+  verlopende entries opgeruimd (`CULL_FREQUENCY`, zoals bij Django's
+  eigen backends)
+
+Voor meerdere machines blijft een netwerkcache (bv. Redis) nodig; de
+rest van de code gebruikt enkel de gewone cache-API.
+"""
+
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    expires REAL
+);
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires);
+"""
+
+# zoveel sets tussen twee tellingen van het aantal entries
+CULL_CHECK_EVERY = 100
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._path = str(location)
+        self._local = threading.local()
+        self._sets = 0
+
+    # --- verbinding -------------------------------------------------
+
+    @property
+    def _db(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            if self._path != ":memory:":
+                Path(self._path).parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self._path, timeout=5, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def close(self, **kwargs):
+        # Django roept dit na elke request aan; de verbinding blijft open
+        pass
+
+    # --- helpers ----------------------------------------------------
+
+    def _expiry(self, timeout):
+        # absoluut tijdstip (time.time()) of None voor "nooit"
+        return self.get_backend_timeout(timeout)
+
+    @staticmethod
+    def _dump(value) -> bytes:
+        return pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+
+    def _maybe_cull(self):
+        self._sets += 1
+        if self._sets % CULL_CHECK_EVERY:
+            return
+        db = self._db
+        (count,) = db.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if count <= self._max_entries:
+            return
+        db.execute("DELETE FROM cache WHERE expires < ?", (time.time(),))
+        (count,) = db.execute("SELECT COUNT(*) FROM cache").fetchone()
+        if count > self._max_entries and self._cull_frequency:
+            # NULL (nooit verlopen) sorteert eerst; die gaan als laatste weg
+            db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache "
+                "ORDER BY expires IS NULL, expires LIMIT ?)",
+                (max(1, count // self._cull_frequency),),
+            )
+
+    # --- cache-API --------------------------------------------------
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._db.execute(
+            "SELECT value FROM cache WHERE key = ? AND "
+            "(expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return default if row is None else pickle.loads(row[0])
+
+    def get_many(self, keys, version=None):
+        by_cache_key = {self.make_and_validate_key(k, version=version): k for k in keys}
+        if not by_cache_key:
+            return {}
+        placeholders = ",".join("?" * len(by_cache_key))
+        rows = self._db.execute(
+            f"SELECT key, value FROM cache WHERE key IN ({placeholders}) AND "
+            "(expires IS NULL OR expires > ?)",
+            (*by_cache_key, time.time()),
+        )
+        return {by_cache_key[k]: pickle.loads(v) for k, v in rows}
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        self._db.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+            (key, self._dump(value), self._expiry(timeout)),
+        )
+        self._maybe_cull()
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self._expiry(timeout)
+        rows = [
+            (self.make_and_validate_key(k, version=version), self._dump(v), expires)
+            for k, v in data.items()
+        ]
+        db = self._db
+        db.execute("BEGIN")
+        try:
+            db.executemany(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                rows,
+            )
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        self._maybe_cull()
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._db.execute(
+            "INSERT INTO cache (key, value, expires) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, "
+            "expires = excluded.expires "
+            "WHERE cache.expires IS NOT NULL AND cache.expires <= ?",
+            (key, self._dump(value), self._expiry(timeout), time.time()),
+        )
+        if cursor.rowcount:
+            self._maybe_cull()
+        return cursor.rowcount == 1
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        cursor = self._db.execute(
+            "UPDATE cache SET expires = ? WHERE key = ? AND "
+            "(expires IS NULL OR expires > ?)",
+            (self._expiry(timeout), key, time.time()),
+        )
+        return cursor.rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        db = self._db
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute(
+                "SELECT value FROM cache WHERE key = ? AND "
+                "(expires IS NULL OR expires > ?)",
+                (key, time.time()),
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = pickle.loads(row[0]) + delta
+            db.execute(
+                "UPDATE cache SET value = ? WHERE key = ?", (self._dump(value), key)
+            )
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        db.execute("COMMIT")
+        return value
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._db.execute("DELETE FROM cache WHERE key = ?", (key,)).rowcount == 1
+
+    def delete_many(self, keys, version=None):
+        keys = [self.make_and_validate_key(k, version=version) for k in keys]
+        if keys:
+            placeholders = ",".join("?" * len(keys))
+            self._db.execute(f"DELETE FROM cache WHERE key IN ({placeholders})", keys)
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._db.execute(
+            "SELECT 1 FROM cache WHERE key = ? AND (expires IS NULL OR expires > ?)",
+            (key, time.time()),
+        ).fetchone()
+        return row is not None
+
+    def clear(self):
+        self._db.execute("DELETE FROM cache")
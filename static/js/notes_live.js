@@ -0,0 +1,92 @@
+/*
+ * Live updates voor de notitielijst (notes:list) via Server-Sent Events.
+ * Verwacht een <ul data-live-url="..." data-detail-url="/notes/0/"> met
+ * <li data-note-id="..."> per notitie. Events: created / updated /
+ * deleted / resync (zie notes.events).
+ */
+(function () {
+  "use strict";
+
+  var list = document.querySelector("ul[data-live-url]");
+  if (!list || !window.EventSource) {
+    return;
+  }
+
+  var filtered = list.dataset.filtered === "true";
+
+  function detailUrl(id) {
+    return list.dataset.detailUrl.replace(/\/0\/$/, "/" + id + "/");
+  }
+
+  function findItem(id) {
+    return list.querySelector('li[data-note-id="' + id + '"]');
+  }
+
+  function renderTags(item, tags) {
+    item.querySelectorAll(".tag-chip").forEach(function (chip) {
+      chip.remove();
+    });
+    tags.forEach(function (name) {
+      var chip = document.createElement("span");
+      chip.className = "tag-chip";
+      chip.textContent = name;
+      item.appendChild(chip);
+    });
+  }
+
+  function newItem(event) {
+    var item = document.createElement("li");
+    item.dataset.noteId = event.id;
+    var box = document.createElement("input");
+    box.type = "checkbox";
+    box.name = "note";
+    box.value = event.id;
+    var link = document.createElement("a");
+    link.href = detailUrl(event.id);
+    link.textContent = event.title;
+    item.appendChild(box);
+    item.appendChild(document.createTextNode(" "));
+    item.appendChild(link);
+    return item;
+  }
+
+  var source = new EventSource(list.dataset.liveUrl);
+
+  source.addEventListener("created", function (e) {
+    var event = JSON.parse(e.data);
+    // met een actieve filter weten we niet of de nieuwe note erbij hoort
+    if (filtered || findItem(event.id)) {
+      return;
+    }
+    var empty = list.querySelector("li.empty");
+    if (empty) {
+      empty.remove();
+    }
+    list.insertBefore(newItem(event), list.firstChild);
+  });
+
+  source.addEventListener("updated", function (e) {
+    var event = JSON.parse(e.data);
+    var item = findItem(event.id);
+    if (!item) {
+      return;
+    }
+    if (event.title !== undefined) {
+      item.querySelector("a").textContent = event.title;
+    }
+    if (event.tags !== undefined) {
+      renderTags(item, event.tags);
+    }
+  });
+
+  source.addEventListener("deleted", function (e) {
+    var item = findItem(JSON.parse(e.data).id);
+    if (item) {
+      item.remove();
+    }
+  });
+
+  source.addEventListener("resync", function () {
+    window.location.reload();
+  });
+})();